@@ -0,0 +1,258 @@
+"""
+Response archive for RecruitifyAI
+Appends raw JSearch responses and Gemini analyses to compressed segments for replay and analytics
+"""
+
+import gzip
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from cache import CACHE_DIR
+
+
+ARCHIVE_DIR = os.getenv("RECRUITIFY_ARCHIVE_DIR", os.path.join(CACHE_DIR, "archive"))
+ARCHIVE_ENABLED = os.getenv("RECRUITIFY_ARCHIVE", "1") != "0"
+ARCHIVE_MAX_BYTES = int(os.getenv("RECRUITIFY_ARCHIVE_MAX_BYTES", 1024 * 1024 * 1024))
+SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+ARCHIVE_QUEUE_SIZE = 10000
+ARCHIVE_BATCH_RECORDS = 500
+ARCHIVE_FLUSH_SECONDS = 1.0
+
+JSEARCH = "jsearch"
+GEMINI = "gemini"
+
+
+class ResponseArchive:
+    """Append-only gzip JSONL segments of upstream responses, indexed by kind, query and time
+
+    record() only queues the response. A writer thread serializes queued
+    responses in batches and appends each batch to the current segment as
+    one gzip member, which it indexes in SQLite. Each member is a complete
+    gzip stream, so a crash never damages earlier batches and any batch can
+    be read by seeking straight to it. When the queue is full, responses are
+    dropped and counted instead of slowing the request down. Segments roll
+    over at segment_max_bytes, and the oldest are deleted once the archive
+    grows past max_bytes.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, segment_max_bytes=SEGMENT_MAX_BYTES, max_bytes=ARCHIVE_MAX_BYTES,
+                 queue_size=ARCHIVE_QUEUE_SIZE, flush_seconds=ARCHIVE_FLUSH_SECONDS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_bytes = max_bytes
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                bytes INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                query TEXT NOT NULL,
+                ts REAL NOT NULL,
+                segment_id INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                line INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_kind_ts ON records (kind, ts);
+            CREATE INDEX IF NOT EXISTS records_query_ts ON records (query, ts);
+        """)
+        conn.commit()
+        self._thread = threading.Thread(target=self._run, name="response-archive", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, kind, query, payload, now=None):
+        """Queue one response for archiving without blocking; returns False if it was dropped
+
+        payload must be JSON-serializable and must not be mutated afterwards,
+        since it is serialized later on the writer thread.
+        """
+        try:
+            self._queue.put_nowait((kind, query or "", time.time() if now is None else now, payload))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def flush(self):
+        """Wait until every queued response has been written"""
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            flush_at = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < ARCHIVE_BATCH_RECORDS:
+                try:
+                    item = self._queue.get(timeout=max(flush_at - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            except (OSError, sqlite3.Error, TypeError, ValueError):
+                # Archiving is best effort and must never take the app down
+                pass
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _segment(self, conn, size):
+        row = conn.execute("SELECT id, name, bytes FROM segments ORDER BY id DESC LIMIT 1").fetchone()
+        if row is not None and (row[2] == 0 or row[2] + size <= self.segment_max_bytes):
+            return row[0], row[1]
+        name = f"segment-{time.time_ns()}.jsonl.gz"
+        cursor = conn.execute("INSERT INTO segments (name) VALUES (?)", (name,))
+        return cursor.lastrowid, name
+
+    def _write(self, batch):
+        lines = "".join(
+            json.dumps({"kind": kind, "query": query, "ts": ts, "data": payload}, separators=(",", ":"), default=str) + "\n"
+            for kind, query, ts, payload in batch
+        )
+        member = gzip.compress(lines.encode("utf-8"))
+        conn = self._connect()
+        with conn:
+            segment_id, name = self._segment(conn, len(member))
+            with open(os.path.join(self.directory, name), "ab") as segment:
+                offset = segment.seek(0, os.SEEK_END)
+                segment.write(member)
+            conn.execute("UPDATE segments SET bytes = bytes + ? WHERE id = ?", (len(member), segment_id))
+            conn.executemany(
+                "INSERT INTO records (kind, query, ts, segment_id, offset, length, line) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(kind, query, ts, segment_id, offset, len(member), line)
+                 for line, (kind, query, ts, _) in enumerate(batch)]
+            )
+            self._prune(conn)
+
+    def _prune(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM segments").fetchone()[0]
+        oldest = conn.execute("SELECT id, name, bytes FROM segments ORDER BY id").fetchall()
+        # The newest segment is the one being written, so it is always kept
+        for segment_id, name, size in oldest[:-1]:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM records WHERE segment_id = ?", (segment_id,))
+            conn.execute("DELETE FROM segments WHERE id = ?", (segment_id,))
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _entries(self, kind, query, since, until, newest_first, limit):
+        where, args = [], []
+        for clause, value in (("kind = ?", kind), ("query = ?", query), ("ts >= ?", since), ("ts < ?", until)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        sql = (
+            "SELECT segments.name, records.offset, records.length, records.line FROM records "
+            "JOIN segments ON segments.id = records.segment_id"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + f" ORDER BY records.ts {'DESC' if newest_first else 'ASC'}, records.id"
+            + (" LIMIT ?" if limit is not None else "")
+        )
+        return self._connect().execute(sql, args + ([limit] if limit is not None else [])).fetchall()
+
+    def _load(self, entries):
+        members = {}
+        for name, offset, length, line in entries:
+            lines = members.get((name, offset))
+            if lines is None:
+                try:
+                    with open(os.path.join(self.directory, name), "rb") as segment:
+                        segment.seek(offset)
+                        lines = gzip.decompress(segment.read(length)).decode("utf-8").splitlines()
+                except (OSError, EOFError):
+                    # Pruned since the index was read
+                    lines = []
+                members[(name, offset)] = lines
+            if line < len(lines):
+                yield json.loads(lines[line])
+
+    def find(self, kind=None, query=None, since=None, until=None, limit=100):
+        """Archived records matching the filters, newest first, as dicts with kind, query, ts and data"""
+        return list(self._load(self._entries(kind, query, since, until, True, limit)))
+
+    def replay(self, kind=None, since=None, until=None):
+        """Yield archived records oldest first, for replaying traffic through local code"""
+        return self._load(self._entries(kind, None, since, until, False, None))
+
+    def query_counts(self, kind=JSEARCH, since=None, limit=20):
+        """Most frequent archived queries as (query, count) pairs, answered from the index alone"""
+        return self._connect().execute("""
+            SELECT query, COUNT(*) FROM records
+            WHERE kind = ? AND ts >= ?
+            GROUP BY query ORDER BY COUNT(*) DESC, query LIMIT ?
+        """, (kind, since or 0, limit)).fetchall()
+
+    def size_bytes(self):
+        return self._connect().execute("SELECT COALESCE(SUM(bytes), 0) FROM segments").fetchone()[0]
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """Return the process-wide response archive, creating it on first use"""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = ResponseArchive()
+    return _archive
+
+
+def set_archive(archive):
+    """Replace the process-wide response archive and return the previous one"""
+    global _archive
+    with _archive_lock:
+        previous, _archive = _archive, archive
+    return previous
+
+
+def archive_response(kind, query, payload):
+    """Archive an upstream response in the background unless RECRUITIFY_ARCHIVE=0"""
+    if ARCHIVE_ENABLED:
+        get_archive().record(kind, query, payload)
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for RecruitifyAI
+Measures memory and latency of the data paths that run on every rerun
+"""
+
+import sys
+import argparse
+import gc
+import json
+import os
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from unittest.mock import Mock, patch
+
+
+def generate_raw_jsearch_job(index):
+    """Build a job dict shaped like a full JSearch search result"""
+    return {
+        "job_id": f"job-{index}",
+        "employer_name": f"Company {index % 50}",
+        "employer_logo": f"https://logos.example.com/{index % 50}.png",
+        "employer_website": f"https://company{index % 50}.example.com",
+        "employer_company_type": "Information",
+        "employer_linkedin": None,
+        "job_publisher": "LinkedIn",
+        "job_employment_type": "FULLTIME",
+        "job_employment_types": ["FULLTIME"],
+        "job_employment_type_text": "Full-time",
+        "job_title": f"Senior Python Developer {index}",
+        "job_apply_link": f"https://example.com/apply/{index}",
+        "job_apply_is_direct": False,
+        "job_apply_quality_score": 0.65,
+        "apply_options": [
+            {"publisher": "LinkedIn", "apply_link": f"https://linkedin.example.com/{index}", "is_direct": False},
+            {"publisher": "Indeed", "apply_link": f"https://indeed.example.com/{index}", "is_direct": False},
+        ],
+        "job_description": "We are looking for an experienced Python developer. " * 40,
+        "job_is_remote": index % 3 == 0,
+        "job_posted_human_readable": "3 days ago",
+        "job_posted_at_timestamp": 1705744800,
+        "job_posted_at_datetime_utc": "2024-01-20T10:00:00.000Z",
+        "job_location": "San Francisco, CA",
+        "job_city": "San Francisco",
+        "job_state": "CA",
+        "job_country": "US",
+        "job_latitude": 37.7749,
+        "job_longitude": -122.4194,
+        "job_benefits": ["health_insurance", "dental_coverage"],
+        "job_google_link": f"https://www.google.com/search?q=job-{index}",
+        "job_offer_expiration_datetime_utc": None,
+        "job_offer_expiration_timestamp": None,
+        "job_required_experience": {
+            "no_experience_required": False,
+            "required_experience_in_months": 60,
+            "experience_mentioned": True,
+            "experience_preferred": False,
+        },
+        "job_required_skills": None,
+        "job_required_education": {
+            "postgraduate_degree": False,
+            "professional_certification": False,
+            "high_school": False,
+            "associates_degree": False,
+            "bachelors_degree": True,
+            "degree_mentioned": True,
+            "degree_preferred": False,
+            "professional_certification_mentioned": False,
+        },
+        "job_experience_in_place_of_education": False,
+        "job_min_salary": 120000 + index,
+        "job_max_salary": 180000 + index,
+        "job_salary_currency": "USD",
+        "job_salary_period": "YEAR",
+        "job_highlights": {
+            "Qualifications": ["5+ years of Python experience", "Experience with AWS", "Strong SQL skills"],
+            "Responsibilities": ["Design services", "Review code", "Mentor engineers"],
+            "Benefits": ["Health insurance", "401k matching"],
+        },
+        "job_job_title": None,
+        "job_posting_language": "en",
+        "job_onet_soc": "15113200",
+        "job_onet_job_zone": "4",
+        "job_naics_code": "541511",
+        "job_naics_name": "Custom Computer Programming Services",
+    }
+
+
+def measure_allocation(build):
+    """Return (result, bytes still allocated) for the object graph built by build()"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def bench_job_memory(count=1000):
+    """Compare memory held by raw JSearch dicts and slim Job records"""
+    from models import normalize_jobs
+
+    payload = json.dumps([generate_raw_jsearch_job(i) for i in range(count)])
+
+    _, raw_bytes = measure_allocation(lambda: json.loads(payload))
+    raw_jobs = json.loads(payload)
+    _, slim_bytes = measure_allocation(lambda: normalize_jobs(raw_jobs))
+
+    print(f"Raw JSearch dicts: {raw_bytes / 1024:,.1f} KiB per {count:,} jobs")
+    print(f"Slim Job records:  {slim_bytes / 1024:,.1f} KiB per {count:,} jobs")
+    print(f"Reduction:         {100 * (1 - slim_bytes / raw_bytes):.1f}%")
+    return raw_bytes, slim_bytes
+
+
+def bench_card_payload(count=10):
+    """Compare description markdown sent per rerun with eager and lazy card details"""
+    from cards import card_details_payload, details_key
+    from models import normalize_jobs
+
+    jobs = normalize_jobs([generate_raw_jsearch_job(i) for i in range(count)])
+    eager = card_details_payload(jobs, expanded={details_key(job) for job in jobs})
+    lazy = card_details_payload(jobs)
+    one_open = card_details_payload(jobs, expanded={details_key(jobs[0])})
+
+    print(f"Eager details ({count} cards):  {eager / 1024:,.1f} KiB per rerun")
+    print(f"Lazy, all closed:          {lazy / 1024:,.1f} KiB per rerun")
+    print(f"Lazy, one card open:       {one_open / 1024:,.1f} KiB per rerun")
+    print(f"Reduction (all closed):    {100 * (1 - lazy / eager):.1f}%")
+    return eager, lazy
+
+
+def bench_facets(count=1000, runs=200):
+    """Time local re-sorting and re-faceting of a fetched result set"""
+    from facets import FacetIndex
+    from models import normalize_jobs
+
+    raw_jobs = [generate_raw_jsearch_job(i) for i in range(count)]
+    for index, raw in enumerate(raw_jobs):
+        raw["job_city"] = ("Austin", "Boston", "Denver", "Seattle")[index % 4]
+        raw["job_min_salary"] = None if index % 5 == 0 else 40000 + 97 * index
+        raw["job_posted_at_datetime_utc"] = f"2024-01-{index % 28 + 1:02d}T10:00:00.000Z"
+    jobs = normalize_jobs(raw_jobs)
+    fits = {job.job_id: (index * 37 % 100) / 100 for index, job in enumerate(jobs)}
+
+    start = time.perf_counter()
+    index = FacetIndex()
+    index.extend(jobs, fits)
+    build = time.perf_counter() - start
+    for sort in ("Best fit", "Highest salary", "Newest"):
+        index.view(sort)
+
+    selection = {"employment_type": None, "remote": "Remote", "city": "Austin", "salary_band": None}
+    start = time.perf_counter()
+    for _ in range(runs):
+        index.counts(**selection)
+    counts = (time.perf_counter() - start) / runs
+    start = time.perf_counter()
+    for _ in range(runs):
+        index.view("Highest salary", **selection)
+    view = (time.perf_counter() - start) / runs
+
+    print(f"Index build:        {build * 1000:.2f} ms per {len(jobs):,} jobs")
+    print(f"Facet counts:       {counts * 1000:.3f} ms")
+    print(f"Filtered sort:      {view * 1000:.3f} ms")
+    return counts, view
+
+
+def bench_archive(responses=200, jobs_per_response=10):
+    """Time queueing JSearch responses for the archive, then replay them through normalization"""
+    import tempfile
+    from archive import JSEARCH, ResponseArchive
+    from models import normalize_jobs
+
+    payloads = [
+        {"status": "OK", "data": [generate_raw_jsearch_job(i * jobs_per_response + j) for j in range(jobs_per_response)]}
+        for i in range(responses)
+    ]
+    raw_bytes = sum(len(json.dumps(payload)) for payload in payloads)
+    with tempfile.TemporaryDirectory() as directory:
+        archive = ResponseArchive(directory, flush_seconds=0.05)
+        start = time.perf_counter()
+        for index, payload in enumerate(payloads):
+            archive.record(JSEARCH, f"role {index % 20} in Austin", {"response": payload})
+        record = (time.perf_counter() - start) / responses
+        start = time.perf_counter()
+        archive.flush()
+        write = time.perf_counter() - start
+        stored = archive.size_bytes()
+
+        start = time.perf_counter()
+        replayed = sum(len(normalize_jobs(item["data"]["response"]["data"])) for item in archive.replay(JSEARCH))
+        replay = time.perf_counter() - start
+        archive.close()
+
+    print(f"Request-path cost:  {record * 1e6:.1f} us per response")
+    print(f"Background write:   {write * 1000:.0f} ms for {responses} responses")
+    print(f"Compression:        {raw_bytes / 1024:,.0f} KiB -> {stored / 1024:,.0f} KiB ({raw_bytes / stored:.1f}x)")
+    print(f"Replay:             {replayed:,} jobs normalized in {replay * 1000:.0f} ms")
+    return record, raw_bytes / stored
+
+
+BENCHMARK_RESUMES = (
+    "Alex Kim\nSkills\nPython, Go, SQL, Docker\nExperience\n"
+    "Senior Software Engineer | Acme Corp | Jan 2021 - Present\n- Reduced API latency by 40%\n",
+    "Sam Lee\nTechnical Skills\nJava; Spring; AWS; Terraform\nWork Experience\n"
+    "Backend Developer at Globex (2017 - 2023)\n- Built the payments service\n",
+    "Jordan Park\nI am a curious person who loves building things with computers and "
+    "has worked on many teams over the years.\n",
+)
+
+
+def bench_resume_fast_path(runs=200):
+    """Time the heuristic resume parser and count how many sample resumes it handles alone"""
+    from resume_heuristics import FAST_PATH_CONFIDENCE, parse_resume_heuristically
+
+    fast = sum(parse_resume_heuristically(text)[1] >= FAST_PATH_CONFIDENCE for text in BENCHMARK_RESUMES)
+    start = time.perf_counter()
+    for _ in range(runs):
+        for text in BENCHMARK_RESUMES:
+            parse_resume_heuristically(text)
+    per_resume = (time.perf_counter() - start) / (runs * len(BENCHMARK_RESUMES))
+
+    print(f"Heuristic parse:  {per_resume * 1000:.2f} ms per resume")
+    print(f"Fast path taken:  {fast} of {len(BENCHMARK_RESUMES)} sample resumes")
+    return per_resume, fast
+
+
+def write_large_pdf(path, size_bytes):
+    """Write a one-page text PDF padded with an image-sized stream to roughly size_bytes"""
+    text = b"BT /F1 12 Tf 72 720 Td (Python developer with AWS experience) Tj ET"
+    padding = size_bytes - 1024
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> /XObject << /Im1 6 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(text), text),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        None,
+    ]
+    offsets = []
+    with open(path, "wb") as pdf:
+        pdf.write(b"%PDF-1.4\n")
+        for number, body in enumerate(objects, 1):
+            offsets.append(pdf.tell())
+            pdf.write(b"%d 0 obj\n" % number)
+            if body is None:
+                pdf.write(b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+                          b"/BitsPerComponent 8 /Length %d >>\nstream\n" % padding)
+                chunk = os.urandom(1024 * 1024)
+                for start in range(0, padding, len(chunk)):
+                    pdf.write(chunk[:padding - start])
+                pdf.write(b"\nendstream")
+            else:
+                pdf.write(body)
+            pdf.write(b"\nendobj\n")
+        xref = pdf.tell()
+        pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            pdf.write(b"%010d 00000 n \n" % offset)
+        pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def _upload_peak_rss(path, spooled, results):
+    """Child process body: parse one upload and report the peak RSS it added in MiB and the time taken"""
+    import hashlib
+    import io
+    import resource
+
+    import PyPDF2
+    from uploads import check_upload, pdf_source, upload_digest
+
+    with open(path, "rb") as pdf:
+        stored = pdf.read()
+    # Streamlit's UploadedFile is a BytesIO over bytes its file manager also keeps
+    upload = io.BytesIO(stored)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if spooled:
+        check_upload(upload)
+        upload_digest(upload)
+        with pdf_source(upload) as source:
+            text = "".join(page.extract_text() for page in PyPDF2.PdfReader(source).pages)
+    else:
+        hashlib.sha256(upload.getvalue())
+        text = "".join(page.extract_text() for page in PyPDF2.PdfReader(upload).pages)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put(((after - before) / 1024, elapsed, len(text)))
+    del stored
+
+
+def bench_upload_rss(size_mb=50):
+    """Compare peak RSS and time for parsing a large upload in place and from a memory-mapped spool
+
+    Each variant runs in a fresh process so peaks do not mask each other.
+    The in-place variant hashes getvalue() and hands the BytesIO to PyPDF2,
+    as the app did before uploads were checked and spooled.
+    """
+    import multiprocessing
+    import tempfile
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.pdf")
+        write_large_pdf(path, size_mb * 1024 * 1024)
+        measured = {}
+        for label, spooled in (("in place", False), ("spooled", True)):
+            results = context.Queue()
+            process = context.Process(target=_upload_peak_rss, args=(path, spooled, results))
+            process.start()
+            measured[label] = results.get(timeout=300)[:2]
+            process.join()
+
+    for label, (peak, elapsed) in measured.items():
+        print(f"{size_mb} MB PDF, {label + ':':10} peak RSS +{peak:,.1f} MiB, {elapsed * 1000:,.0f} ms")
+    return measured
+
+
+BENCHMARK_RESUME_ANALYSIS = {
+    "Primary job role": "Software Engineer",
+    "Key skills": ["Python", "AWS", "Docker", "React"],
+    "Years of experience": "5 years",
+    "Key achievements": ["Led migration to microservices"],
+    "Preferred job titles": ["Backend Engineer", "Platform Engineer"],
+}
+
+
+@contextmanager
+def patched_upstreams():
+    """Replace PDF parsing, Gemini, JSearch and the uploader with fast local fakes"""
+    def fake_search(url, headers=None, params=None, **kwargs):
+        response = Mock()
+        response.json.return_value = {"data": [
+            dict(generate_raw_jsearch_job(i), job_id=f"{params['query']}-{params['page']}-{i}",
+                 job_title=f"{params['query']} {params['page']}-{i}", employer_logo=None)
+            for i in range(10)
+        ]}
+        return response
+
+    model = Mock()
+    model.generate_content.return_value = Mock(text=json.dumps(BENCHMARK_RESUME_ANALYSIS))
+    page = Mock()
+    page.extract_text.return_value = "Python developer with AWS experience. " * 200
+    uploaded = Mock(file_id="benchmark-resume", size=200_000)
+    uploaded.name = "resume.pdf"
+    uploaded.getvalue.return_value = b"%PDF-1.4 benchmark resume"
+
+    with ExitStack() as stack:
+        stack.enter_context(patch("requests.get", side_effect=fake_search))
+        stack.enter_context(patch("google.generativeai.configure"))
+        stack.enter_context(patch("google.generativeai.GenerativeModel", return_value=model))
+        reader = stack.enter_context(patch("PyPDF2.PdfReader"))
+        reader.return_value.pages = [page] * 5
+        stack.enter_context(patch("streamlit.file_uploader", return_value=uploaded))
+        yield
+
+
+def _results_fragment_script():
+    import streamlit as st
+    from main import render_job_results
+
+    render_job_results(st.session_state.resume_analysis, st.session_state.get("location_filter", ""))
+
+
+def _new_app_test(script=None):
+    from streamlit.testing.v1 import AppTest
+
+    if script is None:
+        at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"), default_timeout=60)
+    else:
+        at = AppTest.from_function(script, default_timeout=60)
+    at.secrets["RAPIDAPI_KEY"] = "benchmark-rapidapi-key"
+    at.secrets["GEMINI_API_KEY"] = "benchmark-gemini-key"
+    return at
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def bench_page_rerun(runs=5):
+    """Compare a full-script rerun with running only the results section for a page change
+
+    AppTest always reruns whole scripts and cannot trigger a fragment-scoped
+    rerun, so the second timing runs render_job_results as its own script.
+    That approximates the work a fragment rerun does; it does not include
+    Streamlit's fragment bookkeeping.
+    """
+    from cache import MemoryCache, set_cache
+
+    previous_cache = set_cache(MemoryCache())
+    try:
+        with patched_upstreams():
+            at = _new_app_test()
+            at.run()
+            next(b for b in at.button if "Find Matching" in b.label).click().run()
+
+            full_runs = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                next(b for b in at.button if "Next" in b.label).click().run()
+                full_runs.append(time.perf_counter() - start)
+
+            fragment = _new_app_test(_results_fragment_script)
+            for key in ("resume_analysis", "all_jobs", "search_initiated", "employment_type_filter",
+                        "location_filter", "date_posted_filter", "work_from_home_filter"):
+                fragment.session_state[key] = at.session_state[key]
+            fragment.session_state["current_page"] = 1
+            fragment.run()
+
+            fragment_runs = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                next(b for b in fragment.button if "Next" in b.label).click().run()
+                fragment_runs.append(time.perf_counter() - start)
+    finally:
+        set_cache(previous_cache)
+
+    full, partial = _median(full_runs), _median(fragment_runs)
+    print(f"Full script rerun per page change:  {full * 1000:,.1f} ms (median of {runs})")
+    print(f"Results section alone (approx.):    {partial * 1000:,.1f} ms (median of {runs})")
+    print(f"Reduction:                          {100 * (1 - partial / full):.1f}%")
+    return full, partial
+
+
+BENCHMARKS = {
+    "archive": bench_archive,
+    "job-memory": bench_job_memory,
+    "card-payload": bench_card_payload,
+    "facets": bench_facets,
+    "page-rerun": bench_page_rerun,
+    "resume-fast-path": bench_resume_fast_path,
+    "upload-rss": bench_upload_rss,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run RecruitifyAI benchmarks")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all): {', '.join(sorted(BENCHMARKS))}")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or sorted(BENCHMARKS):
+        print(f"\n{'='*60}")
+        print(f"Benchmark: {name}")
+        print(f"{'='*60}\n")
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
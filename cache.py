@@ -0,0 +1,227 @@
+"""
+Shared cache backends for RecruitifyAI
+Lets several Streamlit worker processes reuse resume analyses and job pages
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+CACHE_DIR = os.getenv("RECRUITIFY_CACHE_DIR", os.path.join(tempfile.gettempdir(), "recruitifyai"))
+
+
+def make_key(namespace, payload):
+    """Build a stable cache key from a namespace and any JSON-serializable payload"""
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"recruitify:{namespace}:{digest}"
+
+
+class CacheBackend:
+    """Base class for cache backends holding JSON-serializable values"""
+
+    name = "base"
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """Per-process cache, the default for a single Streamlit worker"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            raw, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        raw = json.dumps(value)
+        with self._lock:
+            self._data[key] = (raw, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """File-backed cache shared by every worker process on one host"""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        # A locked or unreadable database is treated as a cache miss
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            raw, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            return json.loads(raw)
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def delete(self, key):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        conn.commit()
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache")
+        conn.commit()
+
+
+def _redis_errors():
+    try:
+        import redis
+    except ImportError:
+        return (OSError,)
+    return (redis.exceptions.RedisError, OSError)
+
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis or any server speaking the Redis protocol"""
+
+    name = "redis"
+
+    def __init__(self, url=None, client=None, prefix="recruitify:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("The redis cache backend requires the 'redis' package") from e
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.prefix = prefix
+        self.errors = _redis_errors()
+
+    def get(self, key):
+        # An unreachable Redis server is treated as a cache miss
+        try:
+            raw = self.client.get(key)
+            if raw is None:
+                return None
+            if isinstance(raw, bytes):
+                raw = raw.decode("utf-8")
+            return json.loads(raw)
+        except self.errors + (ValueError,):
+            return None
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.client.set(key, json.dumps(value), ex=int(ttl) if ttl else None)
+        except self.errors:
+            pass
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache(backend=None):
+    """Create a cache backend by name, defaulting to RECRUITIFY_CACHE_BACKEND"""
+    backend = (backend or os.getenv("RECRUITIFY_CACHE_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "sqlite":
+        path = os.getenv("RECRUITIFY_CACHE_PATH", os.path.join(CACHE_DIR, "cache.sqlite3"))
+        return SQLiteCache(path)
+    if backend == "redis":
+        return RedisCache(url=os.getenv("RECRUITIFY_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache backend, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
+
+
+def set_cache(backend):
+    """Replace the process-wide cache backend and return the previous one"""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, backend
+    return previous
@@ -0,0 +1,68 @@
+"""
+Job card content helpers
+Builds the markdown a job card sends to the browser, kept free of Streamlit calls
+"""
+
+import time
+
+
+DESCRIPTION_PREVIEW_CHARS = 280
+
+
+def details_key(job):
+    """Session-state key for a card's "show details" toggle"""
+    return f"details_{job.job_id or job.fuzzy_key}"
+
+
+def truncate_preview(text, limit=DESCRIPTION_PREVIEW_CHARS):
+    """Shorten text to at most limit characters, cutting on a word boundary"""
+    text = " ".join((text or "").split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:") + "…"
+
+
+def format_age(timestamp, now=None):
+    """Human-readable age of a UNIX timestamp, like 3 hours ago"""
+    if not timestamp:
+        return "earlier"
+    seconds = max((now or time.time()) - timestamp, 0)
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "just now"
+
+
+def format_posted(posted_at, now=None):
+    """Relative posting date of a UNIX timestamp, like Today, Yesterday or 5 days ago"""
+    if posted_at is None:
+        return ""
+    days = int(max((time.time() if now is None else now) - posted_at, 0) // 86400)
+    return "Today" if days == 0 else ("Yesterday" if days == 1 else f"{days} days ago")
+
+
+def job_details_markdown(job):
+    """Markdown blocks for the full description, qualifications and benefits of a job"""
+    parts = []
+    if job.employer_website:
+        parts.append(f"**Company Website:** [{job.employer_website}]({job.employer_website})")
+    parts.append("---")
+    parts.append(job.job_description or "No description available")
+    if job.qualifications:
+        parts.append("### 🎓 Required Qualifications\n" + "\n".join(f"- {qual}" for qual in job.qualifications))
+    if job.benefits:
+        parts.append("### 🎁 Benefits\n" + "\n".join(f"- {benefit}" for benefit in job.benefits))
+    return parts
+
+
+def card_details_payload(jobs, expanded=()):
+    """Bytes of description markdown sent per rerun when only the expanded cards render details"""
+    total = 0
+    for job in jobs:
+        if details_key(job) in expanded:
+            total += sum(len(part.encode("utf-8")) for part in job_details_markdown(job))
+        else:
+            total += len(truncate_preview(job.job_description).encode("utf-8"))
+    return total
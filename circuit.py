@@ -0,0 +1,179 @@
+"""
+Circuit breakers for RecruitifyAI upstreams
+Fails fast while JSearch or Gemini is degraded and caps in-flight requests per upstream
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised instead of calling an upstream whose breaker is open or whose request slots are full"""
+
+    def __init__(self, upstream, reason):
+        super().__init__(f"{upstream} is temporarily unavailable ({reason})")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with half-open probing and an in-flight request cap
+
+    The breaker opens once at least min_calls calls finished within window
+    seconds and failure_rate of them failed. After open_seconds it lets
+    half_open_probes calls through; one success closes it, one failure
+    re-opens it.
+    """
+
+    def __init__(self, name, failure_rate=0.5, min_calls=5, window=60, open_seconds=30,
+                 half_open_probes=1, max_in_flight=4, acquire_timeout=5):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.max_in_flight = max_in_flight
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._outcomes = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def _prune(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _trip(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+
+    def before_call(self):
+        """Reserve permission for one call, raising UpstreamUnavailableError if the breaker is open"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == OPEN:
+                raise UpstreamUnavailableError(self.name, "circuit open")
+            if state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    raise UpstreamUnavailableError(self.name, "circuit half-open, probe in flight")
+                self._probes += 1
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._prune(now)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._trip(now)
+                return
+            self._outcomes.append((now, False))
+            self._prune(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip(now)
+
+    def call(self, fn, *args, failure_types=(Exception,), **kwargs):
+        """Call fn through the breaker; only exceptions in failure_types count as upstream failures"""
+        self.before_call()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self._release_probe()
+            raise UpstreamUnavailableError(self.name, f"{self.max_in_flight} requests already in flight")
+        try:
+            result = fn(*args, **kwargs)
+        except failure_types:
+            self.record_failure()
+            raise
+        except BaseException:
+            self._release_probe()
+            raise
+        finally:
+            self._slots.release()
+        self.record_success()
+        return result
+
+    def _release_probe(self):
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._probes = 0
+
+
+def _env_number(name, default, cast):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        return default
+
+
+def breaker_from_env(name, **defaults):
+    """Create a breaker whose limits can be overridden with RECRUITIFY_<NAME>_* environment variables"""
+    prefix = f"RECRUITIFY_{name.upper()}_"
+    settings = {
+        "failure_rate": float, "min_calls": int, "window": float, "open_seconds": float,
+        "half_open_probes": int, "max_in_flight": int, "acquire_timeout": float,
+    }
+    kwargs = {}
+    for setting, cast in settings.items():
+        default = defaults.get(setting)
+        value = _env_number(prefix + setting.upper(), default, cast)
+        if value is not None:
+            kwargs[setting] = value
+    return CircuitBreaker(name, **kwargs)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, **defaults):
+    """Return the process-wide breaker for an upstream, shared by every Streamlit session"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = breaker_from_env(name, **defaults)
+    return breaker
+
+
+def reset_breakers():
+    """Forget every breaker so the next get_breaker() starts closed with fresh limits, e.g. between tests"""
+    with _breakers_lock:
+        _breakers.clear()
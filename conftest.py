@@ -25,6 +25,118 @@ def pytest_configure(config):
         print("   Create a .env file with GEMINI_API_KEY and RAPIDAPI_KEY for testing.")
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache():
+    """
+    Fixture that gives every test a fresh in-memory cache backend
+    Keeps cached analyses and job pages from leaking between tests
+    """
+    from cache import MemoryCache, set_cache
+
+    backend = MemoryCache()
+    previous = set_cache(backend)
+    yield backend
+    set_cache(previous)
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    """
+    Fixture that closes every upstream circuit breaker around each test
+    Keeps failures simulated by one test from tripping breakers for the next
+    """
+    from circuit import reset_breakers
+
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture(autouse=True)
+def isolated_revalidator():
+    """
+    Fixture that gives every test its own background revalidator
+    Keeps refreshes started by one test from being deduplicated in the next
+    """
+    from revalidate import Revalidator, set_revalidator
+
+    revalidator = Revalidator()
+    previous = set_revalidator(revalidator)
+    yield revalidator
+    set_revalidator(previous)
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_corpus(tmp_path):
+    """
+    Fixture that gives every test an empty job corpus in a temporary directory
+    Keeps jobs written by search_jobs out of the real corpus and other tests
+    """
+    from job_corpus import JobCorpus, set_job_corpus
+
+    corpus = JobCorpus(str(tmp_path / "jobs.sqlite3"))
+    previous = set_job_corpus(corpus)
+    yield corpus
+    set_job_corpus(previous)
+
+
+@pytest.fixture(autouse=True)
+def isolated_session_memory(tmp_path):
+    """
+    Fixture that gives every test its own session memory manager
+    Keeps spill files in a temporary directory and sessions from leaking between tests
+    """
+    from session_memory import SessionMemoryManager, set_session_memory
+
+    manager = SessionMemoryManager(spill_dir=str(tmp_path / "sessions"))
+    previous = set_session_memory(manager)
+    yield manager
+    set_session_memory(previous)
+
+
+@pytest.fixture(autouse=True)
+def isolated_query_tracker():
+    """
+    Fixture that gives every test an empty popular-query tracker
+    Keeps searches counted by one test from ranking in the next
+    """
+    from warmer import QueryTracker, set_query_tracker
+
+    tracker = QueryTracker()
+    previous = set_query_tracker(tracker)
+    yield tracker
+    set_query_tracker(previous)
+
+
+@pytest.fixture(autouse=True)
+def isolated_archive(tmp_path):
+    """
+    Fixture that gives every test an empty response archive in a temporary directory
+    Keeps responses archived by tests out of the real archive
+    """
+    from archive import ResponseArchive, set_archive
+
+    archive = ResponseArchive(str(tmp_path / "archive"), flush_seconds=0.01)
+    previous = set_archive(archive)
+    yield archive
+    set_archive(previous)
+    archive.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_gemini_metrics():
+    """
+    Fixture that gives every test empty Gemini call metrics
+    Keeps calls made by one test out of the next test's histograms
+    """
+    from gemini_metrics import GeminiMetrics, set_gemini_metrics
+
+    metrics = GeminiMetrics()
+    previous = set_gemini_metrics(metrics)
+    yield metrics
+    set_gemini_metrics(previous)
+
+
 @pytest.fixture
 def mock_streamlit_secrets():
     """
@@ -0,0 +1,51 @@
+"""
+Per-rerun time budgets for RecruitifyAI
+Splits one script run's time limit between its stages and records what was skipped to meet it
+"""
+
+import os
+import time
+
+
+RERUN_BUDGET_SECONDS = float(os.getenv("RECRUITIFY_RERUN_BUDGET", 25))
+# Shares of the budget; the results fragment reruns on its own, so it gets a fresh search share
+EXTRACT_SHARE = 0.2
+ANALYZE_SHARE = 0.4
+SEARCH_SHARE = 0.4
+
+
+class Deadline:
+    """A time budget that stages draw shares from
+
+    stage() hands out a child deadline limited to a share of the original
+    budget and to whatever is left of it, so stages that overrun eat into
+    later ones but never past the overall limit. skip() records work dropped
+    to stay within budget; children record into their parent's list.
+    """
+
+    def __init__(self, budget, clock=time.monotonic, _skipped=None):
+        self.budget = budget
+        self._clock = clock
+        self.expires_at = clock() + budget
+        self.skipped = [] if _skipped is None else _skipped
+
+    def remaining(self):
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def stage(self, share):
+        return Deadline(min(self.budget * share, self.remaining()), self._clock, self.skipped)
+
+    def skip(self, what):
+        self.skipped.append(what)
+
+
+def remaining(deadline, default=None):
+    """Seconds left on an optional deadline, or default when there is none"""
+    if deadline is None:
+        return default
+    left = deadline.remaining()
+    return left if default is None else min(left, default)
@@ -0,0 +1,134 @@
+"""
+Local sorting and facets for RecruitifyAI results
+Keeps fetched jobs in column arrays so re-sorting and re-counting them never calls the API
+"""
+
+import math
+from array import array
+
+
+RELEVANCE = "Relevance"
+SORTS = (RELEVANCE, "Best fit", "Highest salary", "Newest")
+FACETS = ("employment_type", "remote", "city", "salary_band")
+
+# (upper bound, label); a job falls in the first band above the middle of its salary range
+SALARY_BANDS = (
+    (50000, "Under $50k"),
+    (100000, "$50k-$100k"),
+    (150000, "$100k-$150k"),
+    (math.inf, "$150k+"),
+)
+NO_SALARY = "Not listed"
+REMOTE = "Remote"
+ON_SITE = "On-site"
+
+
+def salary_value(min_salary, max_salary):
+    """Middle of a salary range, or whichever end is known, or None"""
+    ends = [value for value in (min_salary, max_salary) if value]
+    return sum(ends) / len(ends) if ends else None
+
+
+def salary_band(value):
+    if value is None:
+        return NO_SALARY
+    return next(label for bound, label in SALARY_BANDS if value < bound)
+
+
+class FacetIndex:
+    """Fetched jobs stored column by column for fast local sorting and facet counts
+
+    Sort keys live in typed arrays and every facet value keeps a bitmap of
+    the rows that have it, held in a Python int. Filtering ANDs bitmaps,
+    counting is a popcount, and each sort order is computed once per growth
+    of the index and then filtered, so none of them loop over Job objects.
+    Rows are identified by job key (job_id or fuzzy key); the index holds no
+    Job objects, so the jobs themselves can stay in the session's JobStore.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self._rows = {}
+        self._columns = {
+            "Best fit": array("d"),
+            "Highest salary": array("d"),
+            "Newest": array("d"),
+        }
+        self._bitmaps = {facet: {} for facet in FACETS}
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _mark(self, facet, label, row):
+        bitmaps = self._bitmaps[facet]
+        bitmaps[label] = bitmaps.get(label, 0) | (1 << row)
+
+    def extend(self, jobs, fits=None):
+        """Add jobs not yet indexed; fits maps job keys to resume match ratios"""
+        fits = fits or {}
+        for job in jobs:
+            key = job.job_id or job.fuzzy_key
+            if key in self._rows:
+                continue
+            row = len(self.keys)
+            self._rows[key] = row
+            self.keys.append(key)
+
+            # Unknown values sort after every known one
+            fit = fits.get(key)
+            salary = salary_value(job.job_min_salary, job.job_max_salary)
+            self._columns["Best fit"].append(-math.inf if fit is None else fit)
+            self._columns["Highest salary"].append(-math.inf if salary is None else salary)
+            self._columns["Newest"].append(-math.inf if job.posted_at is None else job.posted_at)
+
+            for employment_type in job.job_employment_types:
+                self._mark("employment_type", employment_type, row)
+            self._mark("remote", REMOTE if job.job_is_remote else ON_SITE, row)
+            if job.job_city:
+                self._mark("city", job.job_city, row)
+            self._mark("salary_band", salary_band(salary), row)
+        self._orders.clear()
+
+    def mask(self, exclude=None, **selection):
+        """Bitmap of the rows matching every selected facet value except the excluded facet"""
+        mask = (1 << len(self.keys)) - 1
+        for facet, label in selection.items():
+            if label is not None and facet != exclude:
+                mask &= self._bitmaps[facet].get(label, 0)
+        return mask
+
+    def counts(self, **selection):
+        """{facet: {label: count}} for the jobs matching the other facets' selections
+
+        Each facet ignores its own selection, so its counts show what picking
+        another value would return. Labels are ordered by count, salary bands
+        by salary.
+        """
+        result = {}
+        for facet in FACETS:
+            mask = self.mask(exclude=facet, **selection)
+            counts = {label: bin(bitmap & mask).count("1") for label, bitmap in self._bitmaps[facet].items()}
+            if facet == "salary_band":
+                order = [label for _, label in SALARY_BANDS] + [NO_SALARY]
+                result[facet] = {label: counts[label] for label in order if label in counts}
+            else:
+                result[facet] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+        return result
+
+    def _order(self, sort):
+        if sort == RELEVANCE:
+            return range(len(self.keys))
+        order = self._orders.get(sort)
+        if order is None:
+            column = self._columns[sort]
+            # sorted() is stable, so ties keep relevance order
+            order = self._orders[sort] = sorted(range(len(column)), key=column.__getitem__, reverse=True)
+        return order
+
+    def view(self, sort=RELEVANCE, **selection):
+        """Job keys matching the selection, in the requested sort order"""
+        mask = self.mask(**selection)
+        # One bit per row, lowest row first
+        bits = format(mask, "b").zfill(len(self.keys))[::-1]
+        return [self.keys[row] for row in self._order(sort) if bits[row] == "1"]
@@ -0,0 +1,244 @@
+"""
+Gemini call metrics for RecruitifyAI
+Measures prompt and response sizes, latency, retries and JSON parse outcomes per generate_content call
+"""
+
+import heapq
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from circuit import UpstreamUnavailableError
+
+
+INPUT_CHARS_BUCKETS = (1000, 2000, 4000, 8000, 16000, 32000, 64000, math.inf)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, math.inf)
+LATENCY_BUCKETS = (0.5, 1, 2, 4, 8, 16, 32, math.inf)
+RETRY_BUCKETS = (0, 1, 2, 3, 5, math.inf)
+SLOWEST_CALLS = 5
+
+# Mirrors the SDK's default generate_content retry, which passing request_options would otherwise replace
+GEMINI_RETRY_INITIAL = 1.0
+GEMINI_RETRY_MAXIMUM = 10.0
+GEMINI_RETRY_MULTIPLIER = 1.3
+GEMINI_RETRY_TIMEOUT = 600.0
+
+
+class Histogram:
+    """Fixed-bucket histogram; bounds are inclusive upper edges ending with infinity"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def observe(self, value):
+        self.counts[next(index for index, bound in enumerate(self.bounds) if value <= bound)] += 1
+        self.count += 1
+        self.total += value
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the q-th observation, capped at the largest value seen"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def report(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": {("+Inf" if bound == math.inf else f"{bound:g}"): count for bound, count in zip(self.bounds, self.counts)},
+        }
+
+
+class GeminiCall:
+    """Measurements of one generate_content call, filled in as the call proceeds
+
+    count_retry is handed to the request's Retry as its on_error callback.
+    parsed stays None when the call failed before there was a response to parse.
+    """
+
+    __slots__ = ("input_chars", "input_tokens", "output_tokens", "latency", "retries", "parsed", "error", "_started")
+
+    def __init__(self, prompt):
+        self.input_chars = len(prompt)
+        self.input_tokens = None
+        self.output_tokens = None
+        self.latency = None
+        self.retries = 0
+        self.parsed = None
+        self.error = None
+        self._started = time.perf_counter()
+
+    def count_retry(self, error):
+        self.retries += 1
+
+    def responded(self, response):
+        """Stop the clock and read token counts from the response's usage metadata"""
+        self.latency = time.perf_counter() - self._started
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", None)
+        output_tokens = getattr(usage, "candidates_token_count", None)
+        self.input_tokens = prompt_tokens if isinstance(prompt_tokens, int) else None
+        self.output_tokens = output_tokens if isinstance(output_tokens, int) else None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith("_")}
+
+
+class GeminiMetrics:
+    """Process-wide histograms and outcome counts over every Gemini call"""
+
+    def __init__(self, slowest=SLOWEST_CALLS):
+        self._lock = threading.Lock()
+        self._histograms = {
+            "input_chars": Histogram(INPUT_CHARS_BUCKETS),
+            "input_tokens": Histogram(TOKEN_BUCKETS),
+            "output_tokens": Histogram(TOKEN_BUCKETS),
+            "latency_seconds": Histogram(LATENCY_BUCKETS),
+            "retries": Histogram(RETRY_BUCKETS),
+        }
+        self._outcomes = {"parsed": 0, "parse_failed": 0, "error": 0, "rejected": 0}
+        self._slowest_size = slowest
+        self._slowest = []
+        self._sequence = 0
+
+    def record(self, call):
+        values = {
+            "input_chars": call.input_chars,
+            "input_tokens": call.input_tokens,
+            "output_tokens": call.output_tokens,
+            "latency_seconds": call.latency,
+            "retries": call.retries,
+        }
+        outcome = "error" if call.parsed is None else ("parsed" if call.parsed else "parse_failed")
+        with self._lock:
+            for name, value in values.items():
+                if value is not None:
+                    self._histograms[name].observe(value)
+            self._outcomes[outcome] += 1
+            if call.latency is not None:
+                # The sequence number breaks latency ties so calls are never compared
+                self._sequence += 1
+                entry = (call.latency, self._sequence, call.to_dict())
+                if len(self._slowest) < self._slowest_size:
+                    heapq.heappush(self._slowest, entry)
+                else:
+                    heapq.heappushpop(self._slowest, entry)
+
+    def record_rejected(self):
+        """Count a call the circuit breaker refused, which never reached Gemini"""
+        with self._lock:
+            self._outcomes["rejected"] += 1
+
+    def report(self):
+        """Histograms, outcome counts and the slowest calls as a JSON-serializable dict"""
+        with self._lock:
+            responses = self._outcomes["parsed"] + self._outcomes["parse_failed"]
+            return {
+                "calls": sum(self._outcomes.values()),
+                "outcomes": dict(self._outcomes),
+                "parse_success_rate": self._outcomes["parsed"] / responses if responses else None,
+                "histograms": {name: histogram.report() for name, histogram in self._histograms.items()},
+                "slowest": [call for _, _, call in sorted(self._slowest, reverse=True)],
+            }
+
+    def to_json(self):
+        return json.dumps(self.report(), indent=2)
+
+    def to_prometheus(self, prefix="recruitify_gemini"):
+        """The metrics in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append(f"# TYPE {prefix}_calls_total counter")
+            for outcome, count in self._outcomes.items():
+                lines.append(f'{prefix}_calls_total{{outcome="{outcome}"}} {count}')
+            for name, histogram in self._histograms.items():
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else f"{bound:g}"
+                    lines.append(f'{prefix}_{name}_bucket{{le="{le}"}} {cumulative}')
+                lines.append(f"{prefix}_{name}_sum {histogram.total:g}")
+                lines.append(f"{prefix}_{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def gemini_retry(call, timeout=None):
+    """The SDK's default generate_content retry, counting each retry on call"""
+    from google.api_core import exceptions, retry
+
+    return retry.Retry(
+        initial=GEMINI_RETRY_INITIAL,
+        maximum=GEMINI_RETRY_MAXIMUM,
+        multiplier=GEMINI_RETRY_MULTIPLIER,
+        predicate=retry.if_exception_type(exceptions.ServiceUnavailable),
+        timeout=GEMINI_RETRY_TIMEOUT if timeout is None else timeout,
+        on_error=call.count_retry,
+    )
+
+
+@contextmanager
+def measure_gemini_call(prompt):
+    """Measure one Gemini call made inside the block and record it when the block exits
+
+    The block calls call.responded(response) once generate_content returns
+    and sets call.parsed = True after the response is parsed; an exception
+    after a response counts as a parse failure, one before it as an error.
+    Calls the circuit breaker refused are only counted, since they never
+    reached Gemini.
+    """
+    call = GeminiCall(prompt)
+    try:
+        yield call
+    except UpstreamUnavailableError:
+        get_gemini_metrics().record_rejected()
+        raise
+    except Exception as e:
+        call.error = type(e).__name__
+        if call.latency is not None:
+            call.parsed = False
+        else:
+            call.latency = time.perf_counter() - call._started
+        get_gemini_metrics().record(call)
+        raise
+    if call.latency is not None and call.parsed is None:
+        call.parsed = False
+    get_gemini_metrics().record(call)
+
+
+_gemini_metrics = None
+_gemini_metrics_lock = threading.Lock()
+
+
+def get_gemini_metrics():
+    """Return the process-wide Gemini metrics, creating them on first use"""
+    global _gemini_metrics
+    if _gemini_metrics is None:
+        with _gemini_metrics_lock:
+            if _gemini_metrics is None:
+                _gemini_metrics = GeminiMetrics()
+    return _gemini_metrics
+
+
+def set_gemini_metrics(metrics):
+    """Replace the process-wide Gemini metrics and return the previous one"""
+    global _gemini_metrics
+    with _gemini_metrics_lock:
+        previous, _gemini_metrics = _gemini_metrics, metrics
+    return previous
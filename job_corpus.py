@@ -0,0 +1,161 @@
+"""
+Local job corpus for RecruitifyAI
+Keeps every fetched job in SQLite with FTS5 full-text search for offline queries
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from cache import CACHE_DIR
+from models import JOB_SCHEMA_VERSION, Job
+
+
+JOB_CORPUS_PATH = os.getenv("RECRUITIFY_JOB_CORPUS_PATH", os.path.join(CACHE_DIR, "jobs.sqlite3"))
+JOB_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+_QUERY_TOKEN = re.compile(r"[\w+#]+")
+
+
+def _location_text(job):
+    parts = [job.job_city, job.job_state, job.job_country]
+    if job.job_is_remote:
+        parts.append("Remote")
+    return " ".join(part for part in parts if part)
+
+
+def match_expression(text, column=None):
+    """Turn free text into an FTS5 expression that requires every word, optionally in one column"""
+    tokens = _QUERY_TOKEN.findall((text or "").lower())
+    if not tokens:
+        return ""
+    phrase = " ".join(f'"{token}"' for token in tokens)
+    return f"{column} : ({phrase})" if column else phrase
+
+
+class JobCorpus:
+    """Every job ever fetched, upserted by job_id and expired by posting date"""
+
+    def __init__(self, path=JOB_CORPUS_PATH, max_age=JOB_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age = max_age
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                job_key TEXT NOT NULL UNIQUE,
+                schema_version INTEGER NOT NULL,
+                row TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5 (
+                job_title, employer_name, location, job_description, qualifications,
+                tokenize = "unicode61 tokenchars '+#'"
+            );
+        """)
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, jobs, now=None):
+        """Insert or refresh jobs keyed by job_id, then drop postings past their expiry"""
+        now = now or time.time()
+        conn = self._connect()
+        with conn:
+            for job in jobs:
+                posted = job.posted_at
+                expires_at = (posted if posted is not None else now) + self.max_age
+                if expires_at <= now:
+                    continue
+                row_id = conn.execute("""
+                    INSERT INTO jobs (job_key, schema_version, row, fetched_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (job_key) DO UPDATE SET
+                        schema_version = excluded.schema_version, row = excluded.row,
+                        fetched_at = excluded.fetched_at, expires_at = excluded.expires_at
+                    RETURNING id
+                """, (
+                    job.job_id or job.fuzzy_key, JOB_SCHEMA_VERSION,
+                    json.dumps(job.to_cache()), now, expires_at
+                )).fetchone()[0]
+                conn.execute("DELETE FROM jobs_fts WHERE rowid = ?", (row_id,))
+                conn.execute(
+                    "INSERT INTO jobs_fts (rowid, job_title, employer_name, location, job_description, qualifications) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (row_id, job.job_title, job.employer_name, _location_text(job),
+                     job.job_description, "\n".join(job.qualifications))
+                )
+            self._expire(conn, now)
+
+    def expire(self, now=None):
+        """Remove jobs whose posting is older than max_age"""
+        conn = self._connect()
+        with conn:
+            return self._expire(conn, now or time.time())
+
+    @staticmethod
+    def _expire(conn, now):
+        conn.execute("DELETE FROM jobs_fts WHERE rowid IN (SELECT id FROM jobs WHERE expires_at <= ?)", (now,))
+        return conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,)).rowcount
+
+    def search(self, query, location=None, limit=10, offset=0, now=None):
+        """Keyword search over every stored job, best matches first
+
+        Title hits weigh the most, then employer and qualifications. location,
+        when given, must match the job's city, state, country or "Remote".
+        """
+        expression = match_expression(query)
+        if location:
+            location_expression = match_expression(location, column="location")
+            expression = f"{expression} AND {location_expression}" if expression else location_expression
+        if not expression:
+            return []
+        rows = self._connect().execute("""
+            SELECT jobs.row FROM jobs_fts
+            JOIN jobs ON jobs.id = jobs_fts.rowid
+            WHERE jobs_fts MATCH ? AND jobs.expires_at > ? AND jobs.schema_version = ?
+            ORDER BY bm25(jobs_fts, 10.0, 3.0, 1.0, 1.0, 3.0), jobs.fetched_at DESC
+            LIMIT ? OFFSET ?
+        """, (expression, now or time.time(), JOB_SCHEMA_VERSION, limit, offset)).fetchall()
+        return [Job.from_cache(json.loads(row)) for (row,) in rows]
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+_job_corpus = None
+_job_corpus_lock = threading.Lock()
+
+
+def get_job_corpus():
+    """Return the process-wide job corpus, creating it on first use"""
+    global _job_corpus
+    if _job_corpus is None:
+        with _job_corpus_lock:
+            if _job_corpus is None:
+                _job_corpus = JobCorpus()
+    return _job_corpus
+
+
+def set_job_corpus(corpus):
+    """Replace the process-wide job corpus and return the previous one"""
+    global _job_corpus
+    with _job_corpus_lock:
+        previous, _job_corpus = _job_corpus, corpus
+    return previous
@@ -0,0 +1,156 @@
+"""
+Job search orchestration for RecruitifyAI
+Fans a results page out into several upstream searches and streams them back
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from datetime import datetime, timezone
+
+from deadline import remaining
+from models import JobStore
+
+
+SEARCH_TITLE_LIMIT = 3
+MAX_FANOUT_SEARCHES = 8
+MAX_SEARCH_WORKERS = 8
+REMOTE_LOCATION = "Remote"
+
+_STATE_CODE = re.compile(r"^[A-Z]{2}$")
+
+
+def search_titles(profile, limit=SEARCH_TITLE_LIMIT):
+    """Job titles to search for: the primary role first, then distinct preferred titles"""
+    titles = []
+    seen = set()
+    for title in (profile.search_title,) + tuple(profile.preferred_titles):
+        key = title.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            titles.append(title.strip())
+        if len(titles) >= limit:
+            break
+    return titles
+
+
+def parse_locations(text):
+    """Split a location input like "New York, NY, Remote; Austin" into distinct locations
+
+    Commas separate locations except before a two-letter state code, which stays
+    attached to its city. Semicolons and "|" always separate.
+    """
+    locations = []
+    for part in re.split(r"[;|]", text or ""):
+        for token in part.split(","):
+            token = token.strip()
+            if not token:
+                continue
+            if locations and _STATE_CODE.match(token) and "," not in locations[-1]:
+                locations[-1] = f"{locations[-1]}, {token}"
+            else:
+                locations.append(token)
+    distinct = []
+    seen = set()
+    for location in locations:
+        if location.lower() == REMOTE_LOCATION.lower():
+            location = REMOTE_LOCATION
+        if location.lower() not in seen:
+            seen.add(location.lower())
+            distinct.append(location)
+    return distinct
+
+
+def build_searches(profile, location=None, page=1, date_posted=None, work_from_home=None, extra_titles=False):
+    """Build the keyword arguments for every upstream search behind one results page
+
+    Fans out over every comma-separated location, and with extra_titles also
+    over up to SEARCH_TITLE_LIMIT resume titles. Every location gets the
+    primary title before any location gets a second title. Each search is one
+    JSearch call, so the total is capped at MAX_FANOUT_SEARCHES; see
+    dropped_locations() for the locations that do not fit.
+    "Remote" becomes a remote-only search without a location.
+    """
+    locations = parse_locations(location) or [None]
+    searches = []
+    for title in search_titles(profile, limit=SEARCH_TITLE_LIMIT if extra_titles else 1):
+        for place in locations:
+            remote = place == REMOTE_LOCATION
+            if remote and work_from_home is False:
+                continue
+            searches.append({
+                "job_title": title,
+                "location": None if remote else place,
+                "page": page,
+                "date_posted": date_posted,
+                "work_from_home": True if remote else work_from_home,
+            })
+    return searches[:MAX_FANOUT_SEARCHES]
+
+
+def dropped_locations(location, work_from_home=None):
+    """Locations build_searches leaves out because every search slot went to earlier ones"""
+    locations = parse_locations(location)
+    if work_from_home is False:
+        locations = [place for place in locations if place != REMOTE_LOCATION]
+    return locations[MAX_FANOUT_SEARCHES:]
+
+
+def rank_jobs(jobs, skill_gaps=None, now=None):
+    """Order merged results by resume fit first and posting recency second"""
+    now = now or datetime.now(timezone.utc)
+    # Posting times are UTC, so a naive now is read as UTC too
+    now = (now if now.tzinfo else now.replace(tzinfo=timezone.utc)).timestamp()
+    skill_gaps = skill_gaps or {}
+
+    def score(job):
+        gap = skill_gaps.get(job.job_id or job.fuzzy_key)
+        fit = gap.match_ratio if gap is not None and gap.match_ratio is not None else 0.5
+        recency = 0.0
+        if job.posted_at is not None:
+            recency = 1 / (1 + max(now - job.posted_at, 0) // 86400 / 7)
+        return 0.7 * fit + 0.3 * recency
+
+    return sorted(jobs, key=score, reverse=True)
+
+
+def iter_job_batches(fetch, searches, max_workers=MAX_SEARCH_WORKERS, deadline=None):
+    """Run searches concurrently and yield (search, jobs, error) as each one finishes
+
+    fetch is called as fetch(**search) from worker threads, so it must not touch
+    Streamlit; errors are handed back to the caller instead of being raised.
+    Searches still running when deadline expires are yielded with a
+    TimeoutError and recorded as skipped on the deadline.
+    """
+    if not searches:
+        return
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(searches)))
+    try:
+        futures = {executor.submit(fetch, **search): search for search in searches}
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=remaining(deadline)):
+                pending.discard(future)
+                search = futures[future]
+                try:
+                    yield search, future.result(), None
+                except Exception as e:
+                    yield search, [], e
+        except FuturesTimeoutError:
+            deadline.skip(f"{len(pending)} of {len(searches)} job searches that were still running")
+            for future in pending:
+                yield futures[future], [], TimeoutError("search ran past the page deadline")
+    finally:
+        # Searches past the deadline finish in the background instead of holding the page
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def search_offline(corpus, searches, limit=10):
+    """Answer the same searches from the local job corpus, e.g. while JSearch is unreachable"""
+    found = JobStore()
+    for search in searches:
+        location = search.get("location")
+        if location is None and search.get("work_from_home"):
+            location = REMOTE_LOCATION
+        offset = (search.get("page", 1) - 1) * limit
+        found.extend(corpus.search(search["job_title"], location, limit=limit, offset=offset))
+    return list(found)
@@ -0,0 +1,165 @@
+"""
+Job sources for RecruitifyAI
+Queries every enabled job source concurrently and merges their results under per-source deadlines
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from circuit import UpstreamUnavailableError
+from deadline import remaining
+from job_search import MAX_FANOUT_SEARCHES
+from models import JobPage, JobStore, normalize_jobs
+
+
+SOURCE_TIMEOUT_SECONDS = 15
+FILE_SOURCE_PAGE_SIZE = 10
+JOB_SOURCES = os.getenv("RECRUITIFY_JOB_SOURCES", "jsearch")
+JOB_FIXTURE_PATH = os.getenv("RECRUITIFY_JOB_FIXTURE", "")
+
+_WORD = re.compile(r"[\w+#]+")
+
+
+class JobSource:
+    """Base class for job sources; search() returns Job records and raises on failure
+
+    search() runs in worker threads, so it must not touch Streamlit.
+    """
+
+    name = "base"
+
+    def __init__(self, timeout=SOURCE_TIMEOUT_SECONDS):
+        self.timeout = timeout
+
+    def search(self, job_title, location=None, page=1, date_posted=None, work_from_home=None):
+        raise NotImplementedError
+
+
+class JSearchSource(JobSource):
+    """RapidAPI JSearch, called through the app's cached search function"""
+
+    name = "jsearch"
+
+    def __init__(self, search_jobs, timeout=SOURCE_TIMEOUT_SECONDS):
+        super().__init__(timeout)
+        self._search_jobs = search_jobs
+
+    def search(self, job_title, location=None, page=1, date_posted=None, work_from_home=None):
+        return self._search_jobs(job_title, location, page, date_posted, work_from_home)
+
+
+def _words(text):
+    return set(_WORD.findall((text or "").lower()))
+
+
+class FileJobSource(JobSource):
+    """Raw JSearch job dicts from a JSON file, for tests, demos and offline development
+
+    The file holds a list of jobs or a JSearch response with a "data" list.
+    A job matches when its title contains every word of job_title and, if a
+    location is given, its city, state or country shares a word with it.
+    """
+
+    name = "file"
+
+    def __init__(self, path, timeout=SOURCE_TIMEOUT_SECONDS, page_size=FILE_SOURCE_PAGE_SIZE):
+        super().__init__(timeout)
+        self.path = path
+        self.page_size = page_size
+        self._jobs = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._jobs is None:
+                with open(self.path, encoding="utf-8") as fixture:
+                    raw = json.load(fixture)
+                self._jobs = normalize_jobs(raw.get("data") if isinstance(raw, dict) else raw)
+            return self._jobs
+
+    def search(self, job_title, location=None, page=1, date_posted=None, work_from_home=None):
+        title_words = _words(job_title)
+        location_words = _words(location)
+        matches = []
+        for job in self._load():
+            if not title_words <= _words(job.job_title):
+                continue
+            if work_from_home is not None and job.job_is_remote != work_from_home:
+                continue
+            if location_words and not location_words & _words(f"{job.job_city} {job.job_state} {job.job_country}"):
+                continue
+            matches.append(job)
+        start = (page - 1) * self.page_size
+        return JobPage(matches[start:start + self.page_size], fetched_at=time.time())
+
+
+class JobAggregator:
+    """Query several job sources at once and merge their answers into one deduplicated page
+
+    Each source gets its own timeout, measured from the start of the search;
+    a source that has not answered by then is left out of the page, so one
+    slow source never holds the page past its deadline. A Deadline passed
+    to search() shortens every source's timeout to what is left of it. If
+    every source fails, the error of the first configured source is raised.
+    """
+
+    def __init__(self, sources, max_workers=None):
+        self.sources = list(sources)
+        workers = max_workers or max(len(self.sources), 1) * MAX_FANOUT_SEARCHES
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-source")
+
+    def search(self, job_title, location=None, page=1, date_posted=None, work_from_home=None, deadline=None):
+        if not self.sources:
+            return JobPage()
+        started = time.monotonic()
+        left = remaining(deadline)
+        futures = [
+            (source, self._executor.submit(source.search, job_title, location, page, date_posted, work_from_home))
+            for source in self.sources
+        ]
+        answered = {}
+        errors = {}
+        # Waiting on the shortest timeouts first keeps every wait inside its own source's deadline
+        for index, (source, future) in sorted(enumerate(futures), key=lambda item: item[1][0].timeout):
+            timeout = source.timeout if left is None else min(source.timeout, left)
+            wait([future], timeout=max(started + timeout - time.monotonic(), 0))
+            if not future.done():
+                errors[index] = UpstreamUnavailableError(source.name, f"no answer within {timeout:g}s")
+                continue
+            try:
+                answered[index] = future.result()
+            except Exception as e:
+                errors[index] = e
+        if not answered:
+            raise errors[min(errors)]
+
+        # Sources are merged in their configured order, so the first source wins duplicates
+        pages = [answered[index] for index in sorted(answered)]
+        merged = JobStore()
+        result = JobPage()
+        for jobs in pages:
+            result.extend(merged.extend(jobs))
+        fetched = [jobs.fetched_at for jobs in pages if getattr(jobs, "fetched_at", None)]
+        result.fetched_at = min(fetched) if fetched else None
+        result.stale = any(getattr(jobs, "stale", False) for jobs in pages)
+        result.revalidating = next((jobs.revalidating for jobs in pages if getattr(jobs, "revalidating", None)), None)
+        return result
+
+
+def sources_from_env(search_jobs, names=JOB_SOURCES, fixture_path=JOB_FIXTURE_PATH, jsearch_timeout=SOURCE_TIMEOUT_SECONDS):
+    """Build the enabled sources from a comma-separated list such as "jsearch,file" """
+    sources = []
+    for name in (part.strip().lower() for part in names.split(",")):
+        if name == JSearchSource.name:
+            sources.append(JSearchSource(search_jobs, timeout=jsearch_timeout))
+        elif name == FileJobSource.name:
+            if not fixture_path:
+                raise ValueError("The file job source needs RECRUITIFY_JOB_FIXTURE")
+            sources.append(FileJobSource(fixture_path))
+        elif name:
+            raise ValueError(f"Unknown job source: {name}")
+    return sources
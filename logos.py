@@ -0,0 +1,168 @@
+"""
+Employer logo proxy for RecruitifyAI
+Downloads each logo once, stores a small thumbnail on disk and serves it to cards
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from cache import CACHE_DIR
+
+
+LOGO_CACHE_DIR = os.path.join(CACHE_DIR, "logos")
+LOGO_SIZE = 120
+LOGO_CACHE_MAX_BYTES = 20 * 1024 * 1024
+LOGO_MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+LOGO_TIMEOUT = 5
+LOGO_RETRY_AFTER = 600
+LOGO_WORKERS = 4
+
+
+class LogoCache:
+    """On-disk thumbnail cache keyed by URL hash with least-recently-used eviction"""
+
+    def __init__(self, directory=LOGO_CACHE_DIR, size=LOGO_SIZE, max_bytes=LOGO_CACHE_MAX_BYTES,
+                 retry_after=LOGO_RETRY_AFTER):
+        self.directory = directory
+        self.size = size
+        self.max_bytes = max_bytes
+        self.retry_after = retry_after
+        self._failed = {}
+        self._downloading = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=LOGO_WORKERS, thread_name_prefix="logos")
+        os.makedirs(directory, exist_ok=True)
+
+    def _recently_failed(self, url):
+        failed_at = self._failed.get(url)
+        return failed_at is not None and time.monotonic() - failed_at < self.retry_after
+
+    def path_for(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.png")
+
+    def get(self, url, wait=True):
+        """Return the local thumbnail path for a logo URL, downloading it on first use
+
+        With wait=False a missing logo is downloaded in the background and
+        None is returned straight away.
+        """
+        if not url or self._recently_failed(url):
+            return None
+        path = self.path_for(url)
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        if not wait:
+            self.prefetch([url])
+            return None
+        try:
+            thumbnail = self._download_thumbnail(url)
+        except Exception:
+            with self._lock:
+                self._failed[url] = time.monotonic()
+            return None
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(thumbnail)
+        os.replace(tmp_path, path)
+        self._evict()
+        return path
+
+    def data_uri(self, url, wait=True):
+        """Return the cached thumbnail as a data: URI suitable for an <img> tag"""
+        path = self.get(url, wait=wait)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                encoded = base64.b64encode(f.read()).decode("ascii")
+        except OSError:
+            return None
+        return f"data:image/png;base64,{encoded}"
+
+    def prefetch(self, urls):
+        """Download missing logos in the background without waiting for them"""
+        for url in set(urls):
+            if not url or self._recently_failed(url) or os.path.exists(self.path_for(url)):
+                continue
+            with self._lock:
+                if url in self._downloading:
+                    continue
+                self._downloading.add(url)
+            self._executor.submit(self._background_get, url)
+
+    def _background_get(self, url):
+        try:
+            self.get(url)
+        finally:
+            with self._lock:
+                self._downloading.discard(url)
+
+    def _download_thumbnail(self, url):
+        from PIL import Image
+
+        response = requests.get(url, timeout=LOGO_TIMEOUT, stream=True)
+        response.raise_for_status()
+        content = io.BytesIO()
+        for chunk in response.iter_content(64 * 1024):
+            content.write(chunk)
+            if content.tell() > LOGO_MAX_DOWNLOAD_BYTES:
+                raise ValueError(f"Logo exceeds {LOGO_MAX_DOWNLOAD_BYTES} bytes: {url}")
+        content.seek(0)
+
+        with Image.open(content) as image:
+            image.thumbnail((self.size, self.size))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            output = io.BytesIO()
+            image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+
+_logo_cache = None
+_logo_cache_lock = threading.Lock()
+
+
+def get_logo_cache():
+    """Return the process-wide logo cache, creating it on first use"""
+    global _logo_cache
+    if _logo_cache is None:
+        with _logo_cache_lock:
+            if _logo_cache is None:
+                _logo_cache = LogoCache()
+    return _logo_cache
@@ -4,10 +4,56 @@ import PyPDF2
 import openai
 import requests
 import json
-from datetime import datetime
+import os
+import sqlite3
+import time
+from functools import partial
+
+from archive import GEMINI, JSEARCH, archive_response
+from cache import get_cache, make_key
+from cards import details_key, format_age, format_posted, job_details_markdown, truncate_preview
+from circuit import UpstreamUnavailableError, get_breaker
+from deadline import ANALYZE_SHARE, EXTRACT_SHARE, RERUN_BUDGET_SECONDS, SEARCH_SHARE, Deadline, remaining
+from facets import FACETS, RELEVANCE, SORTS, FacetIndex
+from gemini_metrics import gemini_retry, get_gemini_metrics, measure_gemini_call
+from job_corpus import get_job_corpus
+from job_search import MAX_FANOUT_SEARCHES, build_searches, dropped_locations, iter_job_batches, parse_locations, rank_jobs, search_offline
+from job_sources import JobAggregator, sources_from_env
+from logos import get_logo_cache
+from models import JobPage, JobStore, ResumeProfile, jobs_from_cache, jobs_to_cache, normalize_jobs
+from ocr import needs_ocr, ocr_fallback
+from resume_chunks import CHUNK_THRESHOLD_CHARS, analyze_chunks, chunk_resume
+from resume_heuristics import FAST_PATH_CONFIDENCE, get_fast_path_stats, parse_resume_heuristically
+from revalidate import get_revalidator
+from saved_searches import SavedSearchScheduler, SavedSearchStore
+from session_memory import get_session_memory
+from skills import SkillGapEngine
+from uploads import UploadRejectedError, check_upload, pdf_source, upload_digest
+from warmer import WARM_INTERVAL_SECONDS, CacheWarmer, get_query_tracker
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 RAPIDAPI_KEY = st.secrets["RAPIDAPI_KEY"]
 
+ANALYSIS_CACHE_TTL = 7 * 24 * 3600
+JOBS_CACHE_TTL = 3600
+JOBS_REVALIDATE_TTL = 6 * 3600
+JOBS_STALE_TTL = 24 * 3600
+REVALIDATE_POLL_SECONDS = 2
+JSEARCH_TIMEOUT = 10
+# Room for two users' full fan-out at once; further searches queue for a slot
+JSEARCH_MAX_IN_FLIGHT = 2 * MAX_FANOUT_SEARCHES
+JSEARCH_QUEUE_TIMEOUT = 3 * JSEARCH_TIMEOUT
+MIN_GEMINI_SECONDS = 3
+# Popular first pages are refreshed this long before they would expire
+WARM_AHEAD_SECONDS = 2 * WARM_INTERVAL_SECONDS
+MAX_REFINED_CARDS = 50
+FACET_LABELS = {
+    "employment_type": "📌 Job Type",
+    "remote": "🏠 Remote",
+    "city": "🏙️ City",
+    "salary_band": "💰 Salary",
+}
+
 if 'resume_analysis' not in st.session_state:
     st.session_state.resume_analysis = None
 if 'jobs' not in st.session_state:
@@ -15,27 +61,62 @@ if 'jobs' not in st.session_state:
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 1
 if 'all_jobs' not in st.session_state:
-    st.session_state.all_jobs = []
+    st.session_state.all_jobs = JobStore()
+if 'job_facets' not in st.session_state:
+    st.session_state.job_facets = FacetIndex()
+
+def session_value(key, default_factory=None):
+    """Read a session value that the memory manager may have spilled to disk"""
+    return get_session_memory().load(st.session_state, key, default_factory)
+
+def track_session_memory():
+    """Account for this session's state and let the memory manager enforce its caps"""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_memory().touch(ctx.session_id, ctx.session_state)
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from uploaded PDF file"""
+def render_memory_report():
+    """Per-session and process-wide memory figures, shown when RECRUITIFY_SHOW_MEMORY is set"""
+    ctx = get_script_run_ctx()
+    if not os.getenv("RECRUITIFY_SHOW_MEMORY") or ctx is None:
+        return
+    manager = get_session_memory()
+    with st.expander("🧠 Memory usage"):
+        st.json({"session": manager.session_report(ctx.session_id), "process": manager.report()})
+
+def render_gemini_metrics():
+    """Gemini call histograms with a download of the raw figures, shown when RECRUITIFY_SHOW_METRICS is set"""
+    if not os.getenv("RECRUITIFY_SHOW_METRICS"):
+        return
+    metrics = get_gemini_metrics()
+    with st.expander("📈 Gemini call metrics"):
+        st.json(metrics.report())
+        st.download_button("Download as JSON", metrics.to_json(), file_name="gemini_metrics.json", mime="application/json")
+        st.download_button("Download for Prometheus", metrics.to_prometheus(), file_name="gemini_metrics.prom", mime="text/plain")
+
+def extract_text_from_pdf(pdf_file, deadline=None):
+    """Extract text from uploaded PDF file, stopping early when deadline runs out"""
     pdf_reader = PyPDF2.PdfReader(pdf_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
+    pages = list(pdf_reader.pages)
+    texts = []
+    for page in pages:
+        if deadline is not None and deadline.expired:
+            deadline.skip(f"reading pages {len(texts) + 1}-{len(pages)} of your PDF")
+            break
+        texts.append(page.extract_text())
+    # Scanned pages carry no text layer; read them with OCR instead
+    texts = ocr_fallback(pages[:len(texts)], texts, budget=remaining(deadline))
+    if deadline is not None and deadline.expired and any(needs_ocr(text) for text in texts):
+        deadline.skip("reading scanned pages")
+    return "".join(texts)
 
-def analyze_resume(resume_text):
-    """Analyze resume using Gemini API."""
-    import google.generativeai as genai
-    
-    GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
-    genai.configure(api_key=GEMINI_API_KEY)
-    
-    model = genai.GenerativeModel('models/gemini-2.0-flash')
-    
-    
-    prompt = f"""You must respond with ONLY a valid JSON object, no other text.
+def build_analysis_prompt(resume_text, part=None, total=None):
+    """Gemini prompt for a whole resume, or for one part of a long one"""
+    part_note = ""
+    if part is not None:
+        part_note = f"""This is part {part} of {total} of a long resume. Report only what this part shows.
+    """
+    return f"""You must respond with ONLY a valid JSON object, no other text.
     Analyze this resume and return a JSON object with exactly this structure:
     {{
         "Primary job role": "string" (don't add words like student or studying),
@@ -45,41 +126,134 @@ def analyze_resume(resume_text):
         "Preferred job titles": ["string"]
     }}
 
-    Resume text:
+    {part_note}Resume text:
     {resume_text}
     """
 
+def gemini_options(call, deadline=None):
+    """generate_content keyword arguments that count retries on call and stop when deadline runs out"""
+    if deadline is None:
+        return {"request_options": {"retry": gemini_retry(call)}}
+    return {"request_options": {"timeout": deadline.remaining(), "retry": gemini_retry(call, deadline.remaining())}}
+
+def archive_analysis(cache_key, prompt, response_text, part=None, total=None):
+    """Archive a Gemini answer under the resume's cache key; the resume text itself is never archived"""
+    archive_response(GEMINI, cache_key, {
+        "prompt_chars": len(prompt), "part": part, "total": total, "response": response_text,
+    })
+
+def analyze_resume_chunk(model, chunk, part, total, deadline=None, cache_key=None):
+    """Analyze one chunk of a long resume; runs in worker threads, so it raises instead of calling st"""
+    prompt = build_analysis_prompt(chunk, part, total)
+    with measure_gemini_call(prompt) as call:
+        response = get_breaker("gemini").call(model.generate_content, prompt, **gemini_options(call, deadline))
+        call.responded(response)
+        archive_analysis(cache_key, prompt, response.text, part, total)
+        profile = ResumeProfile.parse(response.text)
+        call.parsed = True
+    return profile
+
+def analyze_resume_profile(resume_text, deadline=None):
+    """Analyze resume using Gemini API and return a ResumeProfile, or None on failure
+
+    With a deadline, the quick local parse is returned instead when too
+    little time is left for Gemini or Gemini runs past it.
+    """
+    if not resume_text.strip():
+        # Nothing was extracted, not even by OCR; a model call would only invent a profile
+        return ResumeProfile()
+
+    cache = get_cache()
+    cache_key = make_key("analysis", resume_text)
+    cached = ResumeProfile.from_cache(cache.get(cache_key))
+    if cached is not None:
+        return cached
+
+    # Resumes with a clear Skills/Experience layout are parsed locally
+    started = time.perf_counter()
+    quick, confidence = parse_resume_heuristically(resume_text)
+    if confidence >= FAST_PATH_CONFIDENCE:
+        get_fast_path_stats().record(True, time.perf_counter() - started)
+        return quick
+    if deadline is not None and deadline.remaining() < MIN_GEMINI_SECONDS:
+        deadline.skip("the full AI resume analysis")
+        return quick
+
+    import google.generativeai as genai
+    
+    GEMINI_API_KEY = st.secrets["GEMINI_API_KEY"]
+    genai.configure(api_key=GEMINI_API_KEY)
+    
+    model = genai.GenerativeModel('models/gemini-2.0-flash')
+
+    response_text = ""
     try:
-        response = model.generate_content(prompt)
-        
-        
-        
-        
-        response_text = response.text.strip()
-        
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-            
-        response_text = response_text.strip()
-        
-        parsed_response = json.loads(response_text)
-        return parsed_response
+        if len(resume_text) > CHUNK_THRESHOLD_CHARS:
+            # Long CVs are analyzed section by section in parallel and merged
+            profile = analyze_chunks(
+                partial(analyze_resume_chunk, model, deadline=deadline, cache_key=cache_key), chunk_resume(resume_text)
+            )
+        else:
+            prompt = build_analysis_prompt(resume_text)
+            with measure_gemini_call(prompt) as call:
+                response = get_breaker("gemini").call(model.generate_content, prompt, **gemini_options(call, deadline))
+                call.responded(response)
+                response_text = response.text
+                archive_analysis(cache_key, prompt, response_text)
+                profile = ResumeProfile.parse(response_text)
+                call.parsed = True
+        get_fast_path_stats().record(False, time.perf_counter() - started)
+        if not profile.is_empty:
+            cache.set(cache_key, profile.to_cache(), ttl=ANALYSIS_CACHE_TTL)
+        return profile
 
+    except UpstreamUnavailableError:
+        st.warning("⚠️ Resume analysis is temporarily unavailable while Gemini recovers. Please try again in a minute.")
+        return None
     except json.JSONDecodeError as e:
         st.error(f"Error parsing JSON response: {str(e)}")
         st.write("Failed to parse response:", response_text)
-        return {}
+        return None
+    except ValueError as e:
+        st.error(f"Unexpected resume analysis format: {str(e)}")
+        return None
     except Exception as e:
+        if deadline is not None and deadline.expired and not quick.is_empty:
+            deadline.skip("the full AI resume analysis")
+            return quick
         st.error(f"Error calling Gemini API: {str(e)}")
-        return {}
+        return None
+
+def analyze_resume(resume_text):
+    """Analyze resume using Gemini API."""
+    profile = analyze_resume_profile(resume_text)
+    return profile.to_dict() if profile is not None else {}
+
+
+def request_jsearch(url, headers, params):
+    response = requests.get(url, headers=headers, params=params, timeout=JSEARCH_TIMEOUT)
+    response.raise_for_status()
+    return response
 
+def refresh_jobs(url, headers, params, cache_key):
+    """Fetch one JSearch page live and store it in the cache and the job corpus"""
+    breaker = get_breaker("jsearch", max_in_flight=JSEARCH_MAX_IN_FLIGHT, acquire_timeout=JSEARCH_QUEUE_TIMEOUT)
+    response = breaker.call(
+        request_jsearch, url, headers, params, failure_types=(requests.exceptions.RequestException,)
+    )
+    payload = response.json()
+    archive_response(JSEARCH, params["query"], {"params": params, "response": payload})
+    jobs = JobPage(normalize_jobs(payload.get("data")), fetched_at=time.time())
+    if jobs:
+        get_cache().set(cache_key, jobs_to_cache(jobs, jobs.fetched_at), ttl=JOBS_STALE_TTL)
+        try:
+            get_job_corpus().upsert(jobs)
+        except sqlite3.Error:
+            pass
+    return jobs
 
-def fetch_jobs_rapidapi(job_title, location=None, page=1, date_posted=None, work_from_home=None):
-    """Fetch jobs using RapidAPI JSearch"""
+def jsearch_request(job_title, location=None, page=1, date_posted=None, work_from_home=None):
+    """URL, headers, query parameters and cache key for one JSearch results page"""
     url = "https://jsearch.p.rapidapi.com/search"
 
     headers = {
@@ -109,13 +283,64 @@ def fetch_jobs_rapidapi(job_title, location=None, page=1, date_posted=None, work
     if work_from_home is not None:
         params["remote"] = "true" if work_from_home else "false"
 
+    return url, headers, params, make_key("jobs", params)
+
+def search_jobs(job_title, location=None, page=1, date_posted=None, work_from_home=None):
+    """Search RapidAPI JSearch and return normalized Job records
+
+    Pages cached past their freshness window are returned at once while a
+    background refresh updates the cache. Raises
+    requests.exceptions.RequestException on failure and never touches
+    Streamlit, so it is safe to call from worker threads.
+    """
+    url, headers, params, cache_key = jsearch_request(job_title, location, page, date_posted, work_from_home)
+    cached = jobs_from_cache(get_cache().get(cache_key))
+    if cached is not None:
+        age = time.time() - cached.fetched_at if cached.fetched_at else 0
+        if age < JOBS_CACHE_TTL:
+            return cached
+        # Stale-while-revalidate: answer from the cache now and refresh it in the background.
+        # A refresh that failed moments ago is not retried, so the page is served as stale.
+        if age < JOBS_REVALIDATE_TTL:
+            if get_revalidator().submit(cache_key, refresh_jobs, url, headers, params, cache_key):
+                cached.revalidating = cache_key
+            else:
+                cached.stale = True
+            return cached
+
+    try:
+        return refresh_jobs(url, headers, params, cache_key)
+    except (requests.exceptions.RequestException, UpstreamUnavailableError):
+        # Serve the last good page for these params while JSearch is failing
+        if cached is not None:
+            cached.stale = True
+            return cached
+        raise
+
+def warm_jobs(job_title, location=None, date_posted=None, work_from_home=None):
+    """Refresh a popular query's first page before it expires; returns True if JSearch was called"""
+    url, headers, params, cache_key = jsearch_request(job_title, location, 1, date_posted, work_from_home)
+    cached = jobs_from_cache(get_cache().get(cache_key))
+    if cached is not None and cached.fetched_at and time.time() - cached.fetched_at < JOBS_CACHE_TTL - WARM_AHEAD_SECONDS:
+        return False
+    refresh_jobs(url, headers, params, cache_key)
+    return True
+
+def fetch_jobs_rapidapi(job_title, location=None, page=1, date_posted=None, work_from_home=None, deadline=None):
+    """Fetch jobs from every enabled job source, JSearch by default, within an optional deadline"""
+    if page == 1:
+        get_query_tracker().record(job_title, location, date_posted, work_from_home)
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
+        jobs = get_job_aggregator().search(job_title, location, page, date_posted, work_from_home, deadline=deadline)
+    except UpstreamUnavailableError:
+        st.warning("⚠️ Job search is temporarily overloaded. Please try again in a minute.")
+        return {"data": []}
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching jobs: {str(e)}")
         return {"data": []}
+    if jobs.stale:
+        st.warning(f"⚠️ Job search is having trouble, showing results from {format_age(jobs.fetched_at)}.")
+    return {"data": jobs}
 
 # def display_job_card(job):
 #     """Display a single job posting in a card format"""
@@ -160,7 +385,7 @@ def fetch_jobs_rapidapi(job_title, location=None, page=1, date_posted=None, work
 #         if job.get('job_apply_link'):
 #             st.markdown(f"[Apply Now]({job['job_apply_link']})")
 
-def display_job_card(job):
+def display_job_card(job, skill_gap=None):
     """Display a single job posting in a modern clean card format"""
     
     st.markdown("""
@@ -259,72 +484,465 @@ def display_job_card(job):
         margin-top: 0.5rem;
         box-shadow: 0 2px 8px rgba(251, 191, 36, 0.3);
     }
+    .skill-badge {
+        font-size: 0.8rem;
+        font-weight: 600;
+        padding: 0.2rem 0.7rem;
+        border-radius: 12px;
+        display: inline-block;
+        margin: 0.2rem 0.3rem 0.2rem 0;
+    }
+    .skill-matched {
+        background: #d1fae5;
+        color: #065f46;
+    }
+    .skill-missing {
+        background: #fee2e2;
+        color: #991b1b;
+    }
     </style>
     """, unsafe_allow_html=True)
 
+    # Cached thumbnails are inlined; a logo not downloaded yet is fetched in the
+    # background and the browser loads the original URL this time
+    logo_cache = get_logo_cache()
+    logo_path = logo_cache.get(job.employer_logo, wait=False)
+    logo_uri = logo_cache.data_uri(job.employer_logo) if logo_path else job.employer_logo
+
     with st.container():
         # st.markdown('<div class="job-card">', unsafe_allow_html=True)
 
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.markdown(f'<div class="job-title">{job["job_title"]}</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="job-title">{job.job_title}</div>', unsafe_allow_html=True)
             
             company_col1, company_col2 = st.columns([0.15, 0.85])
             with company_col1:
-                if job.get("employer_logo"):
-                    st.markdown(f'<img src="{job["employer_logo"]}" class="employer-logo" alt="Company Logo">', unsafe_allow_html=True)
+                if logo_uri:
+                    st.markdown(f'<img src="{logo_uri}" class="employer-logo" alt="Company Logo">', unsafe_allow_html=True)
             with company_col2:
-                st.markdown(f'<div class="job-company">🏢 {job["employer_name"]}</div>', unsafe_allow_html=True)
-                if job.get("employer_website"):
-                    st.markdown(f'<a href="{job["employer_website"]}" target="_blank" class="employer-website">🌐 Visit Company Website</a>', unsafe_allow_html=True)
+                st.markdown(f'<div class="job-company">🏢 {job.employer_name}</div>', unsafe_allow_html=True)
+                if job.employer_website:
+                    st.markdown(f'<a href="{job.employer_website}" target="_blank" class="employer-website">🌐 Visit Company Website</a>', unsafe_allow_html=True)
             
-            location_str = f"{job.get('job_city', '')}, {job.get('job_country', '')}"
-            if location_str.strip(', '):
-                st.markdown(f'<div class="job-detail">📍 {location_str.strip(", ")}</div>', unsafe_allow_html=True)
+            if job.location_text:
+                st.markdown(f'<div class="job-detail">📍 {job.location_text}</div>', unsafe_allow_html=True)
             
-            if job.get("job_min_salary") and job.get("job_max_salary"):
-                st.markdown(f'<div class="salary-badge">💰 ${job["job_min_salary"]:,} - ${job["job_max_salary"]:,}</div>', unsafe_allow_html=True)
+            if job.salary_text:
+                st.markdown(f'<div class="salary-badge">💰 {job.salary_text}</div>', unsafe_allow_html=True)
+
+            if skill_gap is not None and skill_gap.required:
+                badges = "".join(f'<span class="skill-badge skill-matched">✓ {skill}</span>' for skill in skill_gap.matched)
+                badges += "".join(f'<span class="skill-badge skill-missing">✗ {skill}</span>' for skill in skill_gap.missing)
+                st.markdown(f'<div class="job-detail">🧩 Skill match: {len(skill_gap.matched)}/{len(skill_gap.required)}</div>{badges}', unsafe_allow_html=True)
 
         with col2:
-            if job.get("job_employment_type"):
-                st.markdown(f'<div class="job-type">{job["job_employment_type"]}</div>', unsafe_allow_html=True)
-            
-            if job.get("job_posted_at_datetime_utc"):
-                posted_date = datetime.strptime(job["job_posted_at_datetime_utc"][:10], "%Y-%m-%d")
-                days_ago = (datetime.now() - posted_date).days
-                date_text = "Today" if days_ago == 0 else ("Yesterday" if days_ago == 1 else f"{days_ago} days ago")
-                st.markdown(f'<div class="job-detail">🕒 {date_text}</div>', unsafe_allow_html=True)
-
-        with st.expander("📋 View Job Description & Details"):
-            if job.get("employer_logo"):
-                st.image(job["employer_logo"], width=100)
+            if job.job_employment_type:
+                st.markdown(f'<div class="job-type">{job.job_employment_type}</div>', unsafe_allow_html=True)
             
-            if job.get("employer_website"):
-                st.markdown(f"**Company Website:** [{job['employer_website']}]({job['employer_website']})")
-            
-            st.markdown("---")
-            st.markdown(job.get("job_description", "No description available"))
+            if job.posted_at is not None:
+                st.markdown(f'<div class="job-detail">🕒 {format_posted(job.posted_at)}</div>', unsafe_allow_html=True)
 
-            if job.get("job_highlights"):
-                if "Qualifications" in job["job_highlights"]:
-                    st.markdown("### 🎓 Required Qualifications")
-                    for qual in job["job_highlights"]["Qualifications"]:
-                        st.markdown(f"- {qual}")
+        # Full details only render once the user opens them; closed cards send a short preview
+        if st.toggle("📋 View Job Description & Details", key=details_key(job)):
+            with st.container(border=True):
+                if logo_path:
+                    st.image(logo_path, width=100)
+                for part in job_details_markdown(job):
+                    st.markdown(part)
+        elif job.job_description:
+            st.caption(truncate_preview(job.job_description))
 
-                if "Benefits" in job["job_highlights"]:
-                    st.markdown("### 🎁 Benefits")
-                    for benefit in job["job_highlights"]["Benefits"]:
-                        st.markdown(f"- {benefit}")
-
-        if job.get("job_apply_link"):
+        if job.job_apply_link:
             st.markdown(f"""
             <div style="text-align: center;">
-                <a href="{job['job_apply_link']}" target="_blank" class="apply-btn">🚀 Apply Now</a>
+                <a href="{job.job_apply_link}" target="_blank" class="apply-btn">🚀 Apply Now</a>
             </div>
             """, unsafe_allow_html=True)
 
         st.markdown('</div>', unsafe_allow_html=True)
+def render_resume_analysis(profile):
+    """Display the resume analysis summary"""
+    st.markdown('<div class="resume-section">', unsafe_allow_html=True)
+    st.markdown("## 📄 Resume Analysis Results")
+    st.markdown("Here's what our AI discovered about your professional profile:")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
+        st.markdown("### 🧑‍💼 Professional Profile")
+        st.markdown(f"**Primary Role:** {profile.primary_role or 'Not specified'}")
+        st.markdown(f"**Experience Level:** {profile.years_experience or 'Not specified'}")
+        # st.markdown('</div>', unsafe_allow_html=True)
+
+        # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
+        st.markdown("### 🛠️ Core Skills")
+        skills = profile.key_skills
+        if skills:
+            for skill in skills[:6]:  # Limit to top 6 skills
+                st.markdown(f"• {skill}")
+            if len(skills) > 6:
+                st.markdown(f"*...and {len(skills) - 6} more skills*")
+        else:
+            st.markdown("*No key skills extracted*")
+        # st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
+        st.markdown("### 🏆 Key Achievements")
+        achievements = profile.key_achievements
+        if achievements:
+            for achievement in achievements[:4]:  # Limit to top 4 achievements
+                st.markdown(f"• {achievement}")
+            if len(achievements) > 4:
+                st.markdown(f"*...and {len(achievements) - 4} more achievements*")
+        else:
+            st.markdown("*No achievements found*")
+        # st.markdown('</div>', unsafe_allow_html=True)
+
+        # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
+        st.markdown("### 🎯 Recommended Job Titles")
+        job_titles = profile.preferred_titles
+        if job_titles:
+            for title in job_titles[:4]:  # Limit to top 4 titles
+                st.markdown(f"• {title}")
+        else:
+            st.markdown("*Based on your primary role*")
+        # st.markdown('</div>', unsafe_allow_html=True)
+
+    # st.markdown('</div>', unsafe_allow_html=True)
+
+@st.cache_resource
+def get_job_aggregator():
+    """Process-wide aggregator over the job sources enabled by RECRUITIFY_JOB_SOURCES"""
+    # JSearch may wait JSEARCH_QUEUE_TIMEOUT for a request slot before its own timeout starts
+    return JobAggregator(sources_from_env(search_jobs, jsearch_timeout=JSEARCH_QUEUE_TIMEOUT + JSEARCH_TIMEOUT))
+
+@st.cache_resource
+def get_cache_warmer():
+    """Process-wide warmer keeping the most searched first pages fresh in the shared cache"""
+    return CacheWarmer(get_query_tracker(), warm_jobs).start()
+
+@st.cache_resource
+def get_saved_searches():
+    """Process-wide saved search store with its off-peak refresh scheduler running"""
+    store = SavedSearchStore()
+    SavedSearchScheduler(store, get_job_aggregator().search).start()
+    return store
+
+def facet_key(facet):
+    """Session-state key of a facet's selectbox"""
+    return f"facet_{facet}"
+
+def reset_results():
+    """Start a new search: back to page 1 with no fetched jobs, sort or facet selections"""
+    st.session_state.current_page = 1
+    st.session_state.all_jobs = JobStore()
+    st.session_state.job_facets = FacetIndex()
+    for key in ["results_sort"] + [facet_key(facet) for facet in FACETS]:
+        st.session_state.pop(key, None)
+
+def open_saved_search(saved):
+    """Button callback that restores a saved search's filters and runs it"""
+    filters = saved["filters"]
+    reset_results()
+    st.session_state.employment_type_filter = filters.get("employment_type", "All")
+    st.session_state.location_filter = filters.get("location", "")
+    st.session_state.date_posted_filter = filters.get("date_posted", "All")
+    st.session_state.work_from_home_filter = filters.get("work_from_home")
+    st.session_state.extra_titles_filter = filters.get("extra_titles", False)
+    st.session_state.search_initiated = True
+    st.session_state.active_saved_search = saved["id"]
+    st.session_state.record_search = True
+    get_saved_searches().mark_viewed(saved["id"])
+
+def render_saved_searches(owner):
+    """List the user's saved searches with counts of jobs new since their last visit"""
+    saved_searches = get_saved_searches().list(owner)
+    if not saved_searches:
+        return
+    st.markdown("### 📌 Saved Searches")
+    for saved in saved_searches:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            new_badge = f" — 🆕 **{saved['new_count']} new since last visit**" if saved["new_count"] else ""
+            st.markdown(f"{saved['name']}{new_badge}")
+        with col2:
+            st.button("Open", key=f"open_saved_{saved['id']}", use_container_width=True,
+                      on_click=open_saved_search, args=(saved,))
+
+def render_refinements(facets, selection):
+    """Sort and facet controls over every job fetched for this search, with live counts"""
+    counts = facets.counts(**selection)
+    columns = st.columns(len(FACETS) + 1)
+    with columns[0]:
+        st.selectbox("↕️ Sort By", SORTS, key="results_sort")
+    for column, facet in zip(columns[1:], FACETS):
+        options = [None] + list(counts[facet])
+        if selection[facet] not in options:
+            options.append(selection[facet])
+        with column:
+            st.selectbox(
+                FACET_LABELS[facet], options, key=facet_key(facet),
+                format_func=lambda label, counts=counts[facet]: "Any" if label is None else f"{label} ({counts.get(label, 0)})"
+            )
+
+def go_to_page(page):
+    """Button callback that moves the results to another page before the fragment reruns"""
+    st.session_state.current_page = page
+
+@st.fragment(run_every=REVALIDATE_POLL_SECONDS)
+def watch_revalidation(cache_keys):
+    """Poll background refreshes and rerun the app once they finish
+
+    After a successful refresh the rerun renders the fresh pages; after a
+    failed one search_jobs serves the cached pages as stale, so the rerun shows
+    the stale banner and this watcher is no longer rendered.
+    """
+    if not get_revalidator().pending(cache_keys):
+        st.rerun()
+
+@st.fragment
+def render_job_results(profile, location):
+    """Display search filters, streamed job cards and pagination
+
+    Runs as a fragment so paging, filter changes and card toggles only rerun
+    this section instead of the whole script.
+    """
+    # st.markdown('<div class="job-search-section">', unsafe_allow_html=True)
+    st.markdown("## 🔍 Find Your Perfect Job Match")
+    owner = st.session_state.get('resume_owner')
+    if owner:
+        render_saved_searches(owner)
+
+    st.markdown("Customize your job search with the filters below:")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        employment_type = st.selectbox(
+            "📌 Employment Type",
+            ["All", "FULLTIME", "PARTTIME", "CONTRACTOR", "INTERN"]
+        )
+    with col2:
+        date_posted = st.selectbox(
+            "📅 Date Posted",
+            ["All", "Today", "3 days", "Week", "Month"]
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        work_from_home_option = st.selectbox(
+            "🏠 Work From Home",
+            ["No preference", "Yes", "No"]
+        )
+    with col2:
+        extra_titles = st.checkbox(
+            "🎯 Also search my preferred job titles",
+            help="Runs one extra search per preferred title, up to two more per location"
+        )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        search_clicked = st.button("🚀 Find Matching Jobs", use_container_width=True)
+
+    # st.markdown('</div>', unsafe_allow_html=True)
+
+    if search_clicked:
+        reset_results()
+        st.session_state.employment_type_filter = employment_type
+        st.session_state.location_filter = location
+        st.session_state.date_posted_filter = date_posted
+        work_from_home_value = None if work_from_home_option == "No preference" else (work_from_home_option == "Yes")
+        st.session_state.work_from_home_filter = work_from_home_value
+        st.session_state.extra_titles_filter = extra_titles
+        st.session_state.search_initiated = True
+        st.session_state.active_saved_search = None
+        st.session_state.record_search = True
+
+    if st.session_state.get('search_initiated', False):
+        JOBS_PER_PAGE = 10
+        searches = build_searches(
+            profile,
+            st.session_state.get('location_filter', location),
+            page=st.session_state.current_page,
+            date_posted=st.session_state.get('date_posted_filter'),
+            work_from_home=st.session_state.get('work_from_home_filter'),
+            extra_titles=st.session_state.get('extra_titles_filter', False)
+        )
+        if st.session_state.pop('record_search', False):
+            # Counted once per search the user starts, not on every paging or toggle rerun
+            for search in searches:
+                get_query_tracker().record(search["job_title"], search["location"], search["date_posted"], search["work_from_home"])
+        employment_type_filter = st.session_state.get('employment_type_filter', 'All')
+        # Several locations are merged into one ranked list once every location has answered
+        merge_ranked = len(parse_locations(st.session_state.get('location_filter', location))) > 1
+        # A sort or facet other than the defaults shows every job fetched so far instead of this page's stream
+        sort_by = st.session_state.get('results_sort', RELEVANCE)
+        selection = {facet: st.session_state.get(facet_key(facet)) for facet in FACETS}
+        refined = sort_by != RELEVANCE or any(label is not None for label in selection.values())
+
+        skipped_locations = dropped_locations(
+            st.session_state.get('location_filter', location), st.session_state.get('work_from_home_filter')
+        )
+        if skipped_locations:
+            st.warning(f"⚠️ Only {len(searches)} locations can be searched at once. Not searched: {', '.join(skipped_locations)}")
+
+        # The results fragment also reruns on its own, so it takes a fresh search share of the budget
+        deadline = Deadline(RERUN_BUDGET_SECONDS * SEARCH_SHARE)
+        status = st.empty()
+        status.info("🔎 Searching for jobs...")
+        banner = st.empty()
+        refinements = st.container()
+        results = st.container()
+        shown = JobStore()
+        skill_gaps = SkillGapEngine(profile.key_skills)
+        errors = []
+        has_more = False
+        completed = 0
+        gaps = {}
+        fetched_ids = set()
+        stale_since = None
+        revalidating = []
+
+        # Render each upstream batch as soon as it lands instead of waiting for the slowest search
+        for search, jobs, error in iter_job_batches(
+            partial(get_job_aggregator().search, deadline=deadline), searches, deadline=deadline
+        ):
+            completed += 1
+            if error is not None:
+                errors.append(error)
+                continue
+            if jobs.stale:
+                stale_since = min(stale_since or jobs.fetched_at, jobs.fetched_at)
+            if jobs.revalidating:
+                revalidating.append(jobs.revalidating)
+            fetched = session_value('all_jobs', JobStore).extend(jobs)
+            fetched_gaps = skill_gaps.analyze(fetched)
+            gaps.update(fetched_gaps)
+            session_value('job_facets', FacetIndex).extend(
+                fetched, {key: gap.match_ratio for key, gap in fetched_gaps.items()}
+            )
+            fetched_ids.update(job.job_id or job.fuzzy_key for job in jobs)
+
+            if employment_type_filter != "All":
+                jobs = [
+                    job for job in jobs
+                    if employment_type_filter in job.job_employment_types
+                ]
+            has_more = has_more or len(jobs) >= JOBS_PER_PAGE
+
+            new_jobs = shown.extend(jobs[:JOBS_PER_PAGE])
+            gaps.update(skill_gaps.analyze([job for job in new_jobs if (job.job_id or job.fuzzy_key) not in gaps]))
+            get_logo_cache().prefetch(job.employer_logo for job in new_jobs)
+            if merge_ranked or refined:
+                status.info(f"🔎 Searched {completed} of {len(searches)} locations and titles, {len(shown)} jobs so far...")
+                continue
+            with results:
+                for job in new_jobs:
+                    display_job_card(job, gaps.get(job.job_id or job.fuzzy_key))
+            if len(shown):
+                status.info(f"🔎 Found {len(shown)} jobs so far, still searching...")
+
+        # Every upstream search failed: fall back to jobs fetched earlier by any session
+        offline = False
+        if errors and len(errors) == len(searches):
+            offline_jobs = search_offline(get_job_corpus(), searches, limit=JOBS_PER_PAGE)
+            if employment_type_filter != "All":
+                offline_jobs = [job for job in offline_jobs if employment_type_filter in job.job_employment_types]
+            offline = bool(offline_jobs)
+            new_jobs = shown.extend(offline_jobs)
+            gaps.update(skill_gaps.analyze(new_jobs))
+            merge_ranked = merge_ranked or offline
+
+        facets = session_value('job_facets', FacetIndex)
+        if len(facets) and not offline:
+            with refinements:
+                render_refinements(facets, selection)
+        if refined and not offline:
+            all_jobs = session_value('all_jobs', JobStore)
+            keys = facets.view(sort_by, **selection)
+            refined_jobs = [all_jobs.get(key) for key in keys[:MAX_REFINED_CARDS]]
+            gaps.update(skill_gaps.analyze([job for job in refined_jobs if (job.job_id or job.fuzzy_key) not in gaps]))
+            with results:
+                st.caption(f"Showing {len(refined_jobs)} of {len(keys)} matching jobs from the {len(facets)} fetched for this search. Load more pages to widen the list.")
+                for job in refined_jobs:
+                    display_job_card(job, gaps.get(job.job_id or job.fuzzy_key))
+        elif merge_ranked:
+            with results:
+                for job in rank_jobs(shown, gaps):
+                    display_job_card(job, gaps.get(job.job_id or job.fuzzy_key))
+
+        if stale_since is not None:
+            banner.warning(f"⚠️ Job search is having trouble, so some results are from {format_age(stale_since)}.")
+        elif revalidating:
+            banner.caption("🔄 Showing recent results while we check for newer jobs...")
+            watch_revalidation(revalidating)
+        if deadline.skipped:
+            st.caption(f"⏱️ To keep this page fast we skipped {'; '.join(deadline.skipped)}.")
+
+        if offline:
+            status.warning(f"📦 Live job search is unavailable, showing {len(shown)} previously fetched jobs that match your search")
+        elif len(shown):
+            status.success(f"✅ Found {len(shown)} matching jobs on page {st.session_state.current_page}")
+
+            if owner and st.session_state.current_page == 1 and not errors and stale_since is None:
+                saved_store = get_saved_searches()
+                active_saved_search = st.session_state.get('active_saved_search')
+                if active_saved_search:
+                    saved_store.record_results(active_saved_search, fetched_ids)
+                    saved_store.mark_viewed(active_saved_search)
+                elif st.button("💾 Save this search"):
+                    filters = {
+                        "employment_type": employment_type_filter,
+                        "location": st.session_state.get('location_filter', location),
+                        "date_posted": st.session_state.get('date_posted_filter'),
+                        "work_from_home": st.session_state.get('work_from_home_filter'),
+                        "extra_titles": st.session_state.get('extra_titles_filter', False),
+                    }
+                    name = f"{profile.search_title} · {filters['location'] or 'Anywhere'}"
+                    if employment_type_filter != "All":
+                        name += f" · {employment_type_filter}"
+                    saved_id = saved_store.save(owner, name, searches, filters)
+                    saved_store.record_results(saved_id, fetched_ids)
+                    saved_store.mark_viewed(saved_id)
+                    st.session_state.active_saved_search = saved_id
+                    st.toast("💾 Search saved. We'll check it for new jobs overnight.")
+
+            st.markdown("---")
+
+            pagination_col1, pagination_col2, pagination_col3, pagination_col4, pagination_col5 = st.columns([1, 1, 1, 1, 1])
+
+            with pagination_col1:
+                if st.session_state.current_page > 1:
+                    st.button("⏮️ First", use_container_width=True, on_click=go_to_page, args=(1,))
+
+            with pagination_col2:
+                if st.session_state.current_page > 1:
+                    st.button("◀️ Previous", use_container_width=True, on_click=go_to_page, args=(st.session_state.current_page - 1,))
+
+            with pagination_col3:
+                st.markdown(f"<div style='text-align: center; padding: 0.5rem; font-weight: 600; color: #4f46e5;'>Page {st.session_state.current_page}</div>", unsafe_allow_html=True)
+
+            with pagination_col4:
+                if has_more:
+                    st.button("Next ▶️", use_container_width=True, on_click=go_to_page, args=(st.session_state.current_page + 1,))
+
+            with pagination_col5:
+                if has_more:
+                    st.button("Last ⏭️", use_container_width=True, on_click=go_to_page, args=(st.session_state.current_page + 5,))
+        elif errors and all(isinstance(error, UpstreamUnavailableError) for error in errors):
+            status.warning("⚠️ Job search is temporarily overloaded. Please try again in a minute.")
+        elif errors and len(errors) == len(searches):
+            status.error("❌ Unable to find jobs. Please check your internet connection and try again.")
+        else:
+            status.warning("⚠️ No jobs found matching your filters. Try adjusting your search criteria.")
+
+        # Paging reruns only this fragment, and each page grows all_jobs
+        track_session_memory()
+
 def main():
+    get_cache_warmer()
     st.markdown("""
     <style>
     /* Main app styling */
@@ -565,167 +1183,46 @@ def main():
     uploaded_file = st.file_uploader("Choose your resume file", type="pdf", label_visibility="collapsed")
     
     st.markdown("### 📍 Location Preference")
-    location = st.text_input("Enter your preferred job location (optional)", "", placeholder="e.g., New York, NY or Remote")
+    location = st.text_input("Enter your preferred job locations, separated by commas (optional)", "", placeholder="e.g., New York, NY, Austin, Remote")
     # st.markdown('</div>', unsafe_allow_html=True)
 
     if uploaded_file:
-        with st.spinner("📑 Analyzing your resume..."):
-            resume_text = extract_text_from_pdf(uploaded_file)
-            if not st.session_state.resume_analysis:
-                st.session_state.resume_analysis = analyze_resume(resume_text)
-
-            st.markdown('<div class="resume-section">', unsafe_allow_html=True)
-            st.markdown("## 📄 Resume Analysis Results")
-            st.markdown("Here's what our AI discovered about your professional profile:")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
-                st.markdown("### 🧑‍💼 Professional Profile")
-                st.markdown(f"**Primary Role:** {st.session_state.resume_analysis['Primary job role']}")
-                st.markdown(f"**Experience Level:** {st.session_state.resume_analysis['Years of experience']}")
-                # st.markdown('</div>', unsafe_allow_html=True)
-                
-                # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
-                st.markdown("### 🛠️ Core Skills")
-                skills = st.session_state.resume_analysis.get("Key skills", [])
-                if skills:
-                    for skill in skills[:6]:  # Limit to top 6 skills
-                        st.markdown(f"• {skill}")
-                    if len(skills) > 6:
-                        st.markdown(f"*...and {len(skills) - 6} more skills*")
-                else:
-                    st.markdown("*No key skills extracted*")
-                # st.markdown('</div>', unsafe_allow_html=True)
-
-            with col2:
-                # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
-                st.markdown("### 🏆 Key Achievements")
-                achievements = st.session_state.resume_analysis.get("Key achievements", [])
-                if achievements:
-                    for achievement in achievements[:4]:  # Limit to top 4 achievements
-                        st.markdown(f"• {achievement}")
-                    if len(achievements) > 4:
-                        st.markdown(f"*...and {len(achievements) - 4} more achievements*")
-                else:
-                    st.markdown("*No achievements found*")
-                # st.markdown('</div>', unsafe_allow_html=True)
-                
-                # st.markdown('<div class="resume-card">', unsafe_allow_html=True)
-                st.markdown("### 🎯 Recommended Job Titles")
-                job_titles = st.session_state.resume_analysis.get("Preferred job titles", [])
-                if job_titles:
-                    for title in job_titles[:4]:  # Limit to top 4 titles
-                        st.markdown(f"• {title}")
-                else:
-                    st.markdown("*Based on your primary role*")
-                # st.markdown('</div>', unsafe_allow_html=True)
-            
-            # st.markdown('</div>', unsafe_allow_html=True)
-
-            # st.markdown('<div class="job-search-section">', unsafe_allow_html=True)
-            st.markdown("## 🔍 Find Your Perfect Job Match")
-            st.markdown("Customize your job search with the filters below:")
-
-            col1, col2 = st.columns(2)
-            with col1:
-                employment_type = st.selectbox(
-                    "📌 Employment Type",
-                    ["All", "FULLTIME", "PARTTIME", "CONTRACTOR", "INTERN"]
-                )
-            with col2:
-                date_posted = st.selectbox(
-                    "📅 Date Posted",
-                    ["All", "Today", "3 days", "Week", "Month"]
-                )
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                work_from_home_option = st.selectbox(
-                    "🏠 Work From Home",
-                    ["No preference", "Yes", "No"]
-                )
-            with col2:
-                st.empty()
-            
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                search_clicked = st.button("🚀 Find Matching Jobs", use_container_width=True)
-            
-            # st.markdown('</div>', unsafe_allow_html=True)
-
-            if search_clicked:
-                st.session_state.current_page = 1
-                st.session_state.all_jobs = []
-                st.session_state.employment_type_filter = employment_type
-                st.session_state.location_filter = location
-                st.session_state.date_posted_filter = date_posted
-                work_from_home_value = None if work_from_home_option == "No preference" else (work_from_home_option == "Yes")
-                st.session_state.work_from_home_filter = work_from_home_value
-                st.session_state.search_initiated = True
-
-            if st.session_state.get('search_initiated', False):
-                with st.spinner("🔎 Searching for jobs..."):
-                    jobs_response = fetch_jobs_rapidapi(
-                        st.session_state.resume_analysis['Primary job role'],
-                        st.session_state.get('location_filter', location),
-                        page=st.session_state.current_page,
-                        date_posted=st.session_state.get('date_posted_filter'),
-                        work_from_home=st.session_state.get('work_from_home_filter')
-                    )
-
-                    if jobs_response and 'data' in jobs_response:
-                        jobs = jobs_response['data']
-                        
-                        employment_type_filter = st.session_state.get('employment_type_filter', 'All')
-                        if employment_type_filter != "All":
-                            jobs = [
-                                job for job in jobs
-                                if employment_type_filter in job.get('job_employment_types', [])
-                            ]
-
-                        if jobs:
-                            st.success(f"✅ Found {len(jobs)} matching jobs on page {st.session_state.current_page}")
-                            
-                            JOBS_PER_PAGE = 10
-                            for job in jobs[:JOBS_PER_PAGE]:
-                                display_job_card(job)
-
-                            st.markdown("---")
-                            
-                            pagination_col1, pagination_col2, pagination_col3, pagination_col4, pagination_col5 = st.columns([1, 1, 1, 1, 1])
-                            
-                            with pagination_col1:
-                                if st.session_state.current_page > 1:
-                                    if st.button("⏮️ First", use_container_width=True):
-                                        st.session_state.current_page = 1
-                                        st.rerun()
-                            
-                            with pagination_col2:
-                                if st.session_state.current_page > 1:
-                                    if st.button("◀️ Previous", use_container_width=True):
-                                        st.session_state.current_page -= 1
-                                        st.rerun()
-                            
-                            with pagination_col3:
-                                st.markdown(f"<div style='text-align: center; padding: 0.5rem; font-weight: 600; color: #4f46e5;'>Page {st.session_state.current_page}</div>", unsafe_allow_html=True)
-                            
-                            with pagination_col4:
-                                if len(jobs) >= JOBS_PER_PAGE:
-                                    if st.button("Next ▶️", use_container_width=True):
-                                        st.session_state.current_page += 1
-                                        st.rerun()
-                            
-                            with pagination_col5:
-                                if len(jobs) >= JOBS_PER_PAGE:
-                                    if st.button("Last ⏭️", use_container_width=True):
-                                        st.session_state.current_page += 5
-                                        st.rerun()
-                        else:
-                            st.warning("⚠️ No jobs found matching your filters. Try adjusting your search criteria.")
-                    else:
-                        st.error("❌ Unable to find jobs. Please check your internet connection and try again.")
+        file_id = getattr(uploaded_file, "file_id", None) or uploaded_file.name
+        if st.session_state.get('resume_file_id') != file_id:
+            st.session_state.resume_analysis = None
+            st.session_state.resume_file_id = file_id
+
+        rejection = None
+        if not st.session_state.resume_analysis:
+            try:
+                check_upload(uploaded_file)
+            except UploadRejectedError as e:
+                rejection = e
+            else:
+                st.session_state.resume_owner = upload_digest(uploaded_file)[:16]
+                deadline = Deadline(RERUN_BUDGET_SECONDS)
+                with st.spinner("📑 Analyzing your resume..."):
+                    with pdf_source(uploaded_file) as source:
+                        resume_text = extract_text_from_pdf(source, deadline.stage(EXTRACT_SHARE))
+                    if not resume_text.strip():
+                        st.warning("⚠️ We couldn't read any text in this PDF. If it is a scan, try exporting it as a text PDF.")
+                    st.session_state.resume_analysis = analyze_resume_profile(resume_text, deadline.stage(ANALYZE_SHARE))
+                if deadline.skipped:
+                    st.caption(f"⏱️ To keep this page fast we skipped {'; '.join(deadline.skipped)}.")
+
+        profile = st.session_state.resume_analysis
+        if rejection is not None:
+            st.error(f"❌ {rejection}")
+        elif profile is None or profile.is_empty:
+            st.error("❌ We couldn't analyze your resume. Please try again or upload a different file.")
+            st.session_state.resume_analysis = None
+        else:
+            render_resume_analysis(profile)
+            render_job_results(profile, location)
+
+    track_session_memory()
+    render_memory_report()
+    render_gemini_metrics()
 
     # Footer
     st.markdown("""
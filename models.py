@@ -0,0 +1,358 @@
+"""
+Compact data models shared by caching, ranking and rendering
+"""
+
+import json
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+
+RESUME_SCHEMA_VERSION = 1
+
+# (attribute name, key used in the Gemini JSON response)
+RESUME_FIELDS = (
+    ("primary_role", "Primary job role"),
+    ("key_skills", "Key skills"),
+    ("years_experience", "Years of experience"),
+    ("key_achievements", "Key achievements"),
+    ("preferred_titles", "Preferred job titles"),
+)
+
+_LIST_FIELDS = frozenset({"key_skills", "key_achievements", "preferred_titles"})
+
+
+def strip_code_fences(text):
+    """Remove markdown code fences the model sometimes wraps around JSON"""
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def _clean_text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _clean_list(value):
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, (list, tuple)):
+        raise ValueError(f"Expected a list of strings, got {type(value).__name__}")
+    cleaned = []
+    seen = set()
+    for item in value:
+        item = _clean_text(item)
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            cleaned.append(item)
+    return tuple(cleaned)
+
+
+@dataclass(frozen=True, slots=True)
+class ResumeProfile:
+    """Validated resume analysis produced from the Gemini JSON response"""
+
+    primary_role: str = ""
+    key_skills: tuple = ()
+    years_experience: str = ""
+    key_achievements: tuple = ()
+    preferred_titles: tuple = ()
+    schema_version: int = RESUME_SCHEMA_VERSION
+
+    @classmethod
+    def from_model_json(cls, data):
+        """Build a profile from the decoded model JSON, raising ValueError if malformed"""
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+        values = {}
+        for attr, key in RESUME_FIELDS:
+            raw = data.get(key)
+            values[attr] = _clean_list(raw) if attr in _LIST_FIELDS else _clean_text(raw)
+        return cls(**values)
+
+    @classmethod
+    def parse(cls, response_text):
+        """Parse raw model output, tolerating code fences around the JSON"""
+        return cls.from_model_json(json.loads(strip_code_fences(response_text)))
+
+    @classmethod
+    def from_cache(cls, data):
+        """Rebuild a profile from to_cache() output, returning None on schema mismatch"""
+        if not isinstance(data, list) or not data or data[0] != RESUME_SCHEMA_VERSION:
+            return None
+        _, role, skills, years, achievements, titles = data
+        return cls(role, tuple(skills), years, tuple(achievements), tuple(titles))
+
+    def to_cache(self):
+        """Compact positional form used for cache storage"""
+        return [
+            self.schema_version,
+            self.primary_role,
+            list(self.key_skills),
+            self.years_experience,
+            list(self.key_achievements),
+            list(self.preferred_titles),
+        ]
+
+    def to_dict(self):
+        """Legacy dict form keyed like the Gemini response"""
+        result = {}
+        for attr, key in RESUME_FIELDS:
+            value = getattr(self, attr)
+            result[key] = list(value) if attr in _LIST_FIELDS else value
+        return result
+
+    @property
+    def is_empty(self):
+        return not self.primary_role and not self.key_skills
+
+    @property
+    def search_title(self):
+        """Job title to search for, falling back to the first preferred title"""
+        if self.primary_role:
+            return self.primary_role
+        return self.preferred_titles[0] if self.preferred_titles else ""
+
+
+JOB_SCHEMA_VERSION = 2
+
+_JOB_TUPLE_FIELDS = ("job_employment_types", "qualifications", "benefits")
+
+_EMPLOYER_SUFFIXES = frozenset({"inc", "llc", "ltd", "corp", "corporation", "co", "company", "gmbh", "plc", "limited"})
+
+
+def _intern(value):
+    return sys.intern(value) if value else ""
+
+
+def _salary(value):
+    if value in (None, ""):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def parse_posted_at(text):
+    """UTC posting time from JSearch's ISO string as a UNIX timestamp, or None if missing or malformed"""
+    if not text:
+        return None
+    try:
+        posted = datetime.strptime(text[:19], "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        try:
+            posted = datetime.strptime(text[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    return posted.replace(tzinfo=timezone.utc).timestamp()
+
+
+def format_salary(min_salary, max_salary):
+    """Salary badge text such as "$80,000 - $120,000", or "" unless both ends are known"""
+    if not min_salary or not max_salary:
+        return ""
+    return f"${min_salary:,} - ${max_salary:,}"
+
+
+def format_location(*parts):
+    """Join location parts with commas, dropping blanks, repeated parts and stray whitespace"""
+    seen = set()
+    cleaned = []
+    for part in parts:
+        part = " ".join((part or "").split()).strip(", ")
+        if part and part.lower() not in seen:
+            seen.add(part.lower())
+            cleaned.append(part)
+    return ", ".join(cleaned)
+
+
+def _normalize_tokens(text):
+    return re.sub(r"[^a-z0-9+#]+", " ", (text or "").lower()).split()
+
+
+def fuzzy_job_key(job_title, employer_name, job_city="", job_state=""):
+    """Key that matches the same posting syndicated under slightly different titles
+
+    The location is part of the key so one employer's openings for the same
+    role in different cities stay separate.
+    """
+    title = " ".join(sorted(_normalize_tokens(job_title)))
+    employer = " ".join(t for t in _normalize_tokens(employer_name) if t not in _EMPLOYER_SUFFIXES)
+    location = " ".join(_normalize_tokens(job_city) + _normalize_tokens(job_state))
+    return f"{title}|{employer}|{location}"
+
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    """Slim job posting holding only the fields used for rendering, filtering and ranking
+
+    Attribute names mirror the JSearch response so ``job["job_title"]`` and
+    ``job.get("job_city")`` keep working for callers written against raw dicts.
+    posted_at, salary_text and location_text are derived once when the job is
+    built and cached with it, so rendering and ranking never re-parse them.
+    """
+
+    job_id: str = ""
+    job_title: str = ""
+    employer_name: str = ""
+    employer_logo: str = ""
+    employer_website: str = ""
+    job_city: str = ""
+    job_state: str = ""
+    job_country: str = ""
+    job_is_remote: bool = False
+    job_employment_type: str = ""
+    job_employment_types: tuple = ()
+    job_min_salary: object = None
+    job_max_salary: object = None
+    job_posted_at_datetime_utc: str = ""
+    job_description: str = ""
+    qualifications: tuple = ()
+    benefits: tuple = ()
+    job_apply_link: str = ""
+    posted_at: object = None
+    salary_text: str = ""
+    location_text: str = ""
+
+    def __post_init__(self):
+        # Jobs rebuilt from the cache arrive with these already set
+        if self.posted_at is None and self.job_posted_at_datetime_utc:
+            object.__setattr__(self, "posted_at", parse_posted_at(self.job_posted_at_datetime_utc))
+        if not self.salary_text:
+            object.__setattr__(self, "salary_text", format_salary(self.job_min_salary, self.job_max_salary))
+        if not self.location_text:
+            object.__setattr__(self, "location_text", format_location(self.job_city, self.job_state, self.job_country))
+
+    @classmethod
+    def from_api(cls, raw):
+        """Normalize a raw JSearch job dict, dropping every field the app never reads"""
+        highlights = raw.get("job_highlights") or {}
+        employment_type = _intern(_clean_text(raw.get("job_employment_type")))
+        employment_types = tuple(_intern(_clean_text(t)) for t in raw.get("job_employment_types") or () if t)
+        if not employment_types and employment_type:
+            employment_types = (employment_type,)
+        return cls(
+            job_id=_clean_text(raw.get("job_id")),
+            job_title=_clean_text(raw.get("job_title")),
+            employer_name=_clean_text(raw.get("employer_name")),
+            employer_logo=_clean_text(raw.get("employer_logo")),
+            employer_website=_clean_text(raw.get("employer_website")),
+            job_city=_intern(_clean_text(raw.get("job_city"))),
+            job_state=_intern(_clean_text(raw.get("job_state"))),
+            job_country=_intern(_clean_text(raw.get("job_country"))),
+            job_is_remote=bool(raw.get("job_is_remote")),
+            job_employment_type=employment_type,
+            job_employment_types=employment_types,
+            job_min_salary=_salary(raw.get("job_min_salary")),
+            job_max_salary=_salary(raw.get("job_max_salary")),
+            job_posted_at_datetime_utc=_clean_text(raw.get("job_posted_at_datetime_utc")),
+            job_description=_clean_text(raw.get("job_description")),
+            qualifications=tuple(_clean_text(q) for q in highlights.get("Qualifications") or () if q),
+            benefits=tuple(_clean_text(b) for b in highlights.get("Benefits") or () if b),
+            job_apply_link=_clean_text(raw.get("job_apply_link")),
+        )
+
+    @classmethod
+    def from_cache(cls, row):
+        values = dict(zip(cls.__slots__, row))
+        for name in _JOB_TUPLE_FIELDS:
+            values[name] = tuple(values[name])
+        return cls(**values)
+
+    def to_cache(self):
+        """Compact positional form used for cache storage"""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @property
+    def fuzzy_key(self):
+        return fuzzy_job_key(self.job_title, self.employer_name, self.job_city, self.job_state)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in self.__slots__:
+            return default
+        value = getattr(self, key)
+        return default if value in (None, "", ()) else value
+
+
+class JobPage(list):
+    """Jobs returned for one upstream search, noting when they were fetched and whether they are stale
+
+    revalidating holds the cache key of a background refresh started for this
+    page, if any.
+    """
+
+    def __init__(self, jobs=(), fetched_at=None, stale=False, revalidating=None):
+        super().__init__(jobs)
+        self.fetched_at = fetched_at
+        self.stale = stale
+        self.revalidating = revalidating
+
+
+def jobs_to_cache(jobs, fetched_at=None):
+    return {"v": JOB_SCHEMA_VERSION, "fetched_at": fetched_at, "data": [job.to_cache() for job in jobs]}
+
+
+def jobs_from_cache(value):
+    """Rebuild a JobPage from jobs_to_cache() output, returning None on schema mismatch"""
+    if not isinstance(value, dict) or value.get("v") != JOB_SCHEMA_VERSION:
+        return None
+    return JobPage((Job.from_cache(row) for row in value["data"]), fetched_at=value.get("fetched_at"))
+
+
+class JobStore:
+    """Ordered job collection deduplicated by job_id and by a fuzzy title+employer key"""
+
+    def __init__(self, jobs=()):
+        self._jobs = {}
+        self._fuzzy = {}
+        self.extend(jobs)
+
+    def add(self, job):
+        """Add a job, returning False if it duplicates one already stored"""
+        fuzzy_key = job.fuzzy_key
+        if job.job_id and job.job_id in self._jobs:
+            return False
+        if fuzzy_key in self._fuzzy:
+            return False
+        key = job.job_id or fuzzy_key
+        self._jobs[key] = job
+        self._fuzzy[fuzzy_key] = key
+        return True
+
+    def extend(self, jobs):
+        """Add several jobs and return the ones that were new"""
+        return [job for job in jobs if self.add(job)]
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def __contains__(self, job_id):
+        return job_id in self._jobs
+
+    def __iter__(self):
+        return iter(self._jobs.values())
+
+    def __len__(self):
+        return len(self._jobs)
+
+
+def normalize_jobs(raw_jobs):
+    """Convert raw JSearch job dicts to Job records, dropping duplicates"""
+    return list(JobStore(Job.from_api(raw) for raw in raw_jobs or ()))
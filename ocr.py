@@ -0,0 +1,131 @@
+"""
+OCR fallback for scanned resumes in RecruitifyAI
+Runs Tesseract on image-only PDF pages in parallel, caching the text by page image hash
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from cache import get_cache, make_key
+
+
+MIN_PAGE_TEXT_CHARS = 40
+OCR_TIMEOUT_SECONDS = 30
+OCR_WORKERS = min(4, os.cpu_count() or 1)
+OCR_CACHE_TTL = 30 * 24 * 3600
+TESSERACT_COMMAND = os.getenv("RECRUITIFY_TESSERACT", "tesseract")
+
+
+def needs_ocr(text):
+    """True when a page yielded too few letters and digits to be a text page"""
+    return sum(ch.isalnum() for ch in text or "") < MIN_PAGE_TEXT_CHARS
+
+
+def tesseract_available():
+    return shutil.which(TESSERACT_COMMAND) is not None
+
+
+def page_images(page):
+    """Raw bytes of the images embedded in a PDF page; scanned pages are usually one image"""
+    try:
+        return [image.data for image in page.images]
+    except Exception:
+        return []
+
+
+def page_hash(images):
+    digest = hashlib.sha256()
+    for data in images:
+        digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+def ocr_image(data, timeout=OCR_TIMEOUT_SECONDS):
+    """OCR one image with a Tesseract subprocess, returning "" on failure or timeout"""
+    try:
+        result = subprocess.run(
+            [TESSERACT_COMMAND, "stdin", "stdout"], input=data,
+            capture_output=True, timeout=timeout, check=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def _ocr_page(images, timeout):
+    return "\n".join(text.strip() for text in (ocr_image(data, timeout) for data in images) if text.strip())
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Each page runs in its own Tesseract process; these threads only wait on them
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+    return _executor
+
+
+def ocr_pages(pages, timeout=OCR_TIMEOUT_SECONDS, budget=None):
+    """OCR several pages in parallel, each given as a list of image bytes
+
+    Returns one string per page, "" for pages without images or whose OCR
+    failed or ran past timeout. budget, when given, caps the total wait in
+    seconds. Results are cached by the hash of the page images, so
+    re-uploading the same scan never runs Tesseract again.
+    """
+    cache = get_cache()
+    texts = [""] * len(pages)
+    futures = {}
+    for index, images in enumerate(pages):
+        if not images:
+            continue
+        key = make_key("ocr", page_hash(images))
+        cached = cache.get(key)
+        if cached is not None:
+            texts[index] = cached
+        else:
+            futures[index] = (key, _get_executor().submit(_ocr_page, images, timeout))
+
+    # Every image gets its timeout once, spread over the worker threads
+    images = sum(len(pages[index]) for index in futures)
+    wait_seconds = timeout * -(-images // OCR_WORKERS) + 1
+    deadline = time.monotonic() + (wait_seconds if budget is None else min(wait_seconds, budget))
+    for index, (key, future) in futures.items():
+        try:
+            text = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            continue
+        texts[index] = text
+        if text:
+            cache.set(key, text, ttl=OCR_CACHE_TTL)
+    return texts
+
+
+def ocr_fallback(pages, texts, timeout=OCR_TIMEOUT_SECONDS, budget=None):
+    """Replace the text of image-only pages with OCR output where Tesseract finds more
+
+    pages are PyPDF2 pages and texts their extracted text; returns the new
+    list of texts. Without Tesseract installed, or with no budget left, the
+    texts are returned as is.
+    """
+    scanned = [index for index, text in enumerate(texts) if needs_ocr(text)]
+    if not scanned or not tesseract_available() or (budget is not None and budget <= 0):
+        return list(texts)
+    if budget is not None:
+        timeout = min(timeout, budget)
+    texts = list(texts)
+    results = ocr_pages([page_images(pages[index]) for index in scanned], timeout, budget)
+    for index, text in zip(scanned, results):
+        if len(text.strip()) > len((texts[index] or "").strip()):
+            texts[index] = text
+    return texts
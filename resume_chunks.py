@@ -0,0 +1,178 @@
+"""
+Chunked resume analysis for RecruitifyAI
+Splits long CVs by section, analyzes the chunks in parallel and merges the results
+"""
+
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from models import ResumeProfile
+
+
+CHUNK_THRESHOLD_CHARS = 12000
+CHUNK_TARGET_CHARS = 8000
+MAX_CHUNKS = 6
+MAX_CHUNK_WORKERS = 3
+MERGED_SKILLS_LIMIT = 25
+MERGED_ACHIEVEMENTS_LIMIT = 10
+MERGED_TITLES_LIMIT = 5
+
+# Section headings in priority order; unknown sections rank after these and
+# the low-value tail of academic CVs ranks last so it is dropped first
+SECTION_PRIORITY = (
+    ("summary", ("summary", "profile", "objective", "about me")),
+    ("skills", ("skills", "technical skills", "core competencies", "technologies")),
+    ("experience", ("experience", "work experience", "professional experience", "employment", "work history")),
+    ("projects", ("projects", "selected projects")),
+    ("education", ("education", "academic background")),
+    ("certifications", ("certifications", "licenses", "awards", "honors", "achievements")),
+    ("research", ("research", "research experience", "teaching", "teaching experience")),
+    ("publications", ("publications", "papers", "conference papers", "talks", "presentations", "patents")),
+    ("references", ("references", "referees")),
+)
+_LOW_PRIORITY = frozenset({"publications", "references"})
+_HEADINGS = {alias: (rank, name) for rank, (name, aliases) in enumerate(SECTION_PRIORITY) for alias in aliases}
+_HEADING_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{1,40}?)\s*:?\s*$")
+_YEARS = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)", re.IGNORECASE)
+
+
+def _heading(line):
+    match = _HEADING_LINE.match(line)
+    if not match:
+        return None
+    return _HEADINGS.get(match.group(1).strip().lower())
+
+
+def split_sections(text):
+    """Split resume text into (section name, text) pairs at recognised headings
+
+    Text before the first heading is the "header" section (name, contact
+    details, headline).
+    """
+    sections = []
+    name, lines = "header", []
+    for line in text.splitlines():
+        heading = _heading(line)
+        if heading is not None:
+            if any(l.strip() for l in lines):
+                sections.append((name, "\n".join(lines).strip()))
+            name, lines = heading[1], [line]
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((name, "\n".join(lines).strip()))
+    return sections
+
+
+def _section_rank(name):
+    if name == "header":
+        return -1
+    if name in _LOW_PRIORITY:
+        return len(SECTION_PRIORITY) + 1
+    return _HEADINGS.get(name, (len(SECTION_PRIORITY), name))[0]
+
+
+def _split_long(text, limit):
+    """Cut one oversized section on paragraph, then line, boundaries"""
+    pieces = []
+    current = ""
+    for block in re.split(r"(\n\s*\n)", text):
+        for part in ([block] if len(block) <= limit else block.splitlines(keepends=True)):
+            while len(part) > limit:
+                pieces.append(part[:limit])
+                part = part[limit:]
+            if len(current) + len(part) > limit and current.strip():
+                pieces.append(current)
+                current = ""
+            current += part
+    if current.strip():
+        pieces.append(current)
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+def chunk_resume(text, target_chars=CHUNK_TARGET_CHARS, max_chunks=MAX_CHUNKS):
+    """Pack resume sections into at most max_chunks chunks of about target_chars
+
+    Sections are packed in priority order (header, summary, skills,
+    experience, ...) so that when a very long CV needs more than max_chunks
+    chunks, publications and references are the parts left out. Returns the
+    chunks in document order.
+    """
+    sections = split_sections(text)
+    ordered = sorted(range(len(sections)), key=lambda i: (_section_rank(sections[i][0]), i))
+    pieces = []
+    for index in ordered:
+        for piece in _split_long(sections[index][1], target_chars):
+            pieces.append((index, piece))
+
+    chunks = []
+    for index, piece in pieces:
+        if chunks and len(chunks[-1][1]) + len(piece) + 2 <= target_chars:
+            first_index, body = chunks[-1]
+            chunks[-1] = (min(first_index, index), f"{body}\n\n{piece}")
+        elif len(chunks) < max_chunks:
+            chunks.append((index, piece))
+    return [body for _, body in sorted(chunks, key=lambda chunk: chunk[0])]
+
+
+def _years_value(text):
+    match = _YEARS.search(text or "")
+    return float(match.group(1)) if match else None
+
+
+def _merge_lists(lists, limit, by_frequency=False):
+    first_seen = {}
+    counts = Counter()
+    for values in lists:
+        for value in values:
+            key = value.lower()
+            counts[key] += 1
+            first_seen.setdefault(key, (len(first_seen), value))
+    keys = sorted(first_seen, key=lambda k: (-counts[k], first_seen[k][0]) if by_frequency else first_seen[k][0])
+    return tuple(first_seen[key][1] for key in keys[:limit])
+
+
+def merge_profiles(profiles):
+    """Combine per-chunk profiles deterministically
+
+    The primary role is the one most chunks agree on, ties going to the
+    earliest chunk. Skills and achievements keep first-seen order, titles are
+    ordered by how many chunks suggested them, and years of experience is the
+    largest figure any chunk reported.
+    """
+    profiles = [profile for profile in profiles if not profile.is_empty or profile.preferred_titles]
+    if not profiles:
+        return ResumeProfile()
+    roles = _merge_lists([(p.primary_role,) for p in profiles if p.primary_role], 1, by_frequency=True)
+    years = [p.years_experience for p in profiles if p.years_experience]
+    with_numbers = [y for y in years if _years_value(y) is not None]
+    return ResumeProfile(
+        primary_role=roles[0] if roles else "",
+        key_skills=_merge_lists([p.key_skills for p in profiles], MERGED_SKILLS_LIMIT),
+        years_experience=max(with_numbers, key=_years_value) if with_numbers else (years[0] if years else ""),
+        key_achievements=_merge_lists([p.key_achievements for p in profiles], MERGED_ACHIEVEMENTS_LIMIT),
+        preferred_titles=_merge_lists([p.preferred_titles for p in profiles], MERGED_TITLES_LIMIT, by_frequency=True),
+    )
+
+
+def analyze_chunks(analyze, chunks, max_workers=MAX_CHUNK_WORKERS):
+    """Run analyze(chunk, part, total) over chunks in parallel and merge the profiles
+
+    Chunks that fail are left out of the merge; if every chunk fails the first
+    error is raised. analyze runs in worker threads, so it must not touch
+    Streamlit.
+    """
+    if not chunks:
+        return ResumeProfile()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = [executor.submit(analyze, chunk, part, len(chunks)) for part, chunk in enumerate(chunks, 1)]
+        profiles, errors = [], []
+        for future in futures:
+            try:
+                profiles.append(future.result())
+            except Exception as e:
+                errors.append(e)
+    if not profiles:
+        raise errors[0]
+    return merge_profiles(profiles)
@@ -0,0 +1,196 @@
+"""
+Heuristic resume parser for RecruitifyAI
+Reads common resume layouts locally so Gemini is only called for the hard ones
+"""
+
+import re
+import threading
+from datetime import datetime
+
+from models import ResumeProfile, _clean_list
+from resume_chunks import split_sections
+from skills import extract_skills
+
+
+FAST_PATH_CONFIDENCE = 0.8
+HEURISTIC_SKILLS_LIMIT = 25
+HEURISTIC_ACHIEVEMENTS_LIMIT = 5
+HEURISTIC_TITLES_LIMIT = 3
+
+ROLE_WORDS = frozenset({
+    "engineer", "developer", "programmer", "architect", "scientist", "analyst", "manager", "designer",
+    "consultant", "administrator", "specialist", "lead", "director", "researcher", "technician",
+    "accountant", "recruiter", "coordinator", "officer", "associate", "intern", "tester", "devops",
+})
+ACHIEVEMENT_VERBS = frozenset({
+    "led", "improved", "reduced", "increased", "built", "launched", "delivered", "designed", "grew",
+    "saved", "won", "awarded", "optimized", "automated", "migrated", "scaled", "created", "shipped",
+})
+_MONTHS = {m: i for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+_MONTH = r"(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?"
+_DATE_RANGE = re.compile(
+    rf"{_MONTH}((?:19|20)\d\d)\s*(?:-|–|—|to)\s*(?:{_MONTH}((?:19|20)\d\d)|(present|current|now))",
+    re.IGNORECASE,
+)
+_STATED_YEARS = re.compile(
+    r"(\d{1,2})\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:\w+\s+)?experience", re.IGNORECASE
+)
+_BULLET = re.compile(r"^\s*(?:[-•*▪●◦‣]|o\s)\s*")
+_TITLE_SEPARATORS = re.compile(r"\s*(?:\||·|•|—|–|\s-\s|,|@|\bat\b|\()\s*", re.IGNORECASE)
+_SKILL_SEPARATORS = re.compile(r"[,;|•·▪●\n]")
+
+
+def _section(sections, name):
+    return "\n".join(body.split("\n", 1)[1] if "\n" in body else "" for section, body in sections if section == name)
+
+
+def _skills(skills_text, full_text):
+    items = []
+    for item in _SKILL_SEPARATORS.split(skills_text):
+        item = _BULLET.sub("", item)
+        if ":" in item:
+            item = item.split(":", 1)[1]
+        item = item.strip(" .\t")
+        if item and len(item) <= 40 and len(item.split()) <= 4:
+            items.append(item)
+    if not items:
+        items = list(extract_skills(full_text))
+    return _clean_list(items)[:HEURISTIC_SKILLS_LIMIT]
+
+
+def _title_candidates(experience_text):
+    titles = []
+    for line in experience_text.splitlines():
+        if not line.strip() or _BULLET.match(line):
+            continue
+        for segment in _TITLE_SEPARATORS.split(line):
+            segment = segment.strip()
+            words = segment.lower().split()
+            if (segment and len(words) <= 6 and not re.search(r"\d", segment)
+                    and any(word.strip(".,") in ROLE_WORDS for word in words)):
+                titles.append(segment)
+                break
+    return list(_clean_list(titles))
+
+
+def _month_index(month, year):
+    return int(year) * 12 + _MONTHS.get((month or "jan")[:3].lower(), 1)
+
+
+def _years_from_dates(experience_text, now):
+    """Total years covered by the date ranges in an experience section, overlaps counted once"""
+    spans = []
+    for start_month, start_year, end_month, end_year, ongoing in _DATE_RANGE.findall(experience_text):
+        start = _month_index(start_month, start_year)
+        end = now.year * 12 + now.month if ongoing else _month_index(end_month or "dec", end_year)
+        if end > start:
+            spans.append((start, end))
+    months = 0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start
+    return round(months / 12)
+
+
+def _achievements(text):
+    found = []
+    for line in text.splitlines():
+        if not _BULLET.match(line):
+            continue
+        line = _BULLET.sub("", line).strip()
+        first_word = line.split(" ", 1)[0].lower().strip(",.") if line else ""
+        if line and (re.search(r"\d", line) or first_word in ACHIEVEMENT_VERBS):
+            found.append(line)
+    return _clean_list(found)[:HEURISTIC_ACHIEVEMENTS_LIMIT]
+
+
+def parse_resume_heuristically(text, now=None):
+    """Extract a ResumeProfile with rules and regexes, returning (profile, confidence)
+
+    Confidence is between 0 and 1 and reflects how many fields came from
+    explicit resume structure: a Skills section, a role line in an Experience
+    section, stated or dated years of experience and quantified bullets.
+    """
+    now = now or datetime.now()
+    sections = split_sections(text or "")
+    names = {name for name, _ in sections}
+    experience = _section(sections, "experience")
+
+    skills = _skills(_section(sections, "skills"), text or "")
+    titles = _title_candidates(experience)
+    stated = _STATED_YEARS.search(text or "")
+    if stated:
+        years = f"{int(stated.group(1))} years"
+    else:
+        dated = _years_from_dates(experience, now)
+        years = f"{dated} years" if dated else ""
+    achievements = _achievements(experience + "\n" + _section(sections, "projects"))
+
+    profile = ResumeProfile(
+        primary_role=titles[0] if titles else "",
+        key_skills=skills,
+        years_experience=years,
+        key_achievements=achievements,
+        preferred_titles=tuple(titles[1:1 + HEURISTIC_TITLES_LIMIT]),
+    )
+    confidence = (
+        0.25 * ("skills" in names)
+        + 0.2 * (len(skills) >= 3)
+        + 0.3 * bool(titles)
+        + 0.15 * bool(years)
+        + 0.1 * bool(achievements)
+    )
+    return profile, round(confidence, 2)
+
+
+class FastPathStats:
+    """Counts how many analyses skipped Gemini and estimates the latency that saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast = 0
+        self.slow = 0
+        self.fast_seconds = 0.0
+        self.slow_seconds = 0.0
+
+    def record(self, fast, seconds):
+        with self._lock:
+            if fast:
+                self.fast += 1
+                self.fast_seconds += seconds
+            else:
+                self.slow += 1
+                self.slow_seconds += seconds
+
+    def report(self):
+        """Fast-path share, mean latency per path and the estimated time saved"""
+        with self._lock:
+            total = self.fast + self.slow
+            mean_fast = self.fast_seconds / self.fast if self.fast else None
+            mean_slow = self.slow_seconds / self.slow if self.slow else None
+            saved = None
+            if mean_fast is not None and mean_slow is not None:
+                saved = self.fast * max(mean_slow - mean_fast, 0)
+            return {
+                "analyses": total,
+                "fast_path": self.fast,
+                "fast_path_ratio": self.fast / total if total else 0.0,
+                "mean_fast_ms": mean_fast * 1000 if mean_fast is not None else None,
+                "mean_llm_ms": mean_slow * 1000 if mean_slow is not None else None,
+                "estimated_saved_seconds": saved,
+            }
+
+
+_fast_path_stats = FastPathStats()
+
+
+def get_fast_path_stats():
+    """Return the process-wide fast-path statistics"""
+    return _fast_path_stats
@@ -0,0 +1,81 @@
+"""
+Background revalidation for RecruitifyAI
+Refreshes stale cached results off the request path, one refresh per key at a time
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+REVALIDATE_WORKERS = 4
+REVALIDATE_RETRY_AFTER = 60
+
+
+class Revalidator:
+    """Deduplicating background refresher keyed by cache key"""
+
+    def __init__(self, max_workers=REVALIDATE_WORKERS, retry_after=REVALIDATE_RETRY_AFTER):
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="revalidate")
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._finished_at = {}
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Refresh key in the background unless a refresh is running or finished recently
+
+        Returns True when a refresh for key is in flight after the call.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                return True
+            if time.monotonic() - self._finished_at.get(key, float("-inf")) < self.retry_after:
+                return False
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._futures[key] = future
+        # Registered outside the lock: an already finished future runs the callback right here
+        future.add_done_callback(lambda done, key=key: self._finished(key))
+        return True
+
+    def _finished(self, key):
+        with self._lock:
+            self._finished_at[key] = time.monotonic()
+
+    def pending(self, keys):
+        """Keys whose refresh is still running"""
+        with self._lock:
+            return [key for key in keys if key in self._futures and not self._futures[key].done()]
+
+    def wait(self, keys, timeout=None):
+        """Block until the given refreshes finish, mainly for tests and benchmarks"""
+        with self._lock:
+            futures = [self._futures[key] for key in keys if key in self._futures]
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+
+_revalidator = None
+_revalidator_lock = threading.Lock()
+
+
+def get_revalidator():
+    """Return the process-wide revalidator, creating it on first use"""
+    global _revalidator
+    if _revalidator is None:
+        with _revalidator_lock:
+            if _revalidator is None:
+                _revalidator = Revalidator()
+    return _revalidator
+
+
+def set_revalidator(revalidator):
+    """Replace the process-wide revalidator and return the previous one"""
+    global _revalidator
+    with _revalidator_lock:
+        previous, _revalidator = _revalidator, revalidator
+    return previous
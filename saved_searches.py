@@ -0,0 +1,262 @@
+"""
+Saved searches for RecruitifyAI
+Stores searches locally, refreshes them off-peak and tracks which jobs are new
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from cache import CACHE_DIR
+
+
+SAVED_SEARCHES_PATH = os.getenv("RECRUITIFY_SAVED_SEARCHES_PATH", os.path.join(CACHE_DIR, "saved_searches.sqlite3"))
+OFF_PEAK_HOURS = (2, 6)
+DAILY_REFRESH_QUOTA = 100
+REFRESH_AFTER_SECONDS = 20 * 3600
+SCHEDULER_INTERVAL_SECONDS = 600
+
+
+class SavedSearchStore:
+    """SQLite store of saved searches and the job ids each one last returned"""
+
+    def __init__(self, path=SAVED_SEARCHES_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS saved_searches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner TEXT NOT NULL,
+                name TEXT NOT NULL,
+                searches TEXT NOT NULL,
+                filters TEXT NOT NULL DEFAULT '{}',
+                created_at REAL NOT NULL,
+                last_refreshed_at REAL NOT NULL DEFAULT 0,
+                last_viewed_at REAL NOT NULL DEFAULT 0,
+                last_new TEXT NOT NULL DEFAULT '[]',
+                last_removed TEXT NOT NULL DEFAULT '[]',
+                UNIQUE (owner, searches)
+            );
+            CREATE TABLE IF NOT EXISTS saved_search_results (
+                search_id INTEGER NOT NULL,
+                job_id TEXT NOT NULL,
+                first_seen_at REAL NOT NULL,
+                PRIMARY KEY (search_id, job_id)
+            );
+            CREATE TABLE IF NOT EXISTS refresh_quota (
+                day TEXT PRIMARY KEY,
+                used INTEGER NOT NULL
+            );
+        """)
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, owner, name, searches, filters=None):
+        """Save the upstream search kwargs and UI filters for an owner, returning the saved search id"""
+        conn = self._connect()
+        encoded = json.dumps(searches, sort_keys=True)
+        conn.execute(
+            "INSERT OR IGNORE INTO saved_searches (owner, name, searches, filters, created_at) VALUES (?, ?, ?, ?, ?)",
+            (owner, name, encoded, json.dumps(filters or {}), time.time())
+        )
+        conn.commit()
+        row = conn.execute(
+            "SELECT id FROM saved_searches WHERE owner = ? AND searches = ?", (owner, encoded)
+        ).fetchone()
+        return row["id"]
+
+    def delete(self, search_id):
+        conn = self._connect()
+        conn.execute("DELETE FROM saved_searches WHERE id = ?", (search_id,))
+        conn.execute("DELETE FROM saved_search_results WHERE search_id = ?", (search_id,))
+        conn.commit()
+
+    def list(self, owner):
+        """Saved searches for an owner with their "new since last visit" counts"""
+        rows = self._connect().execute("""
+            SELECT s.*, (
+                SELECT COUNT(*) FROM saved_search_results r
+                WHERE r.search_id = s.id AND r.first_seen_at > s.last_viewed_at
+            ) AS new_count
+            FROM saved_searches s WHERE s.owner = ? ORDER BY s.created_at
+        """, (owner,)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def get(self, search_id):
+        row = self._connect().execute("SELECT * FROM saved_searches WHERE id = ?", (search_id,)).fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def job_ids(self, search_id):
+        rows = self._connect().execute(
+            "SELECT job_id FROM saved_search_results WHERE search_id = ?", (search_id,)
+        ).fetchall()
+        return {row["job_id"] for row in rows}
+
+    def record_results(self, search_id, job_ids, now=None):
+        """Replace a search's result set and return (new job ids, removed job ids)"""
+        now = now or time.time()
+        job_ids = set(job_ids)
+        previous = self.job_ids(search_id)
+        new = sorted(job_ids - previous)
+        removed = sorted(previous - job_ids)
+        conn = self._connect()
+        conn.executemany(
+            "INSERT INTO saved_search_results (search_id, job_id, first_seen_at) VALUES (?, ?, ?)",
+            [(search_id, job_id, now) for job_id in new]
+        )
+        conn.executemany(
+            "DELETE FROM saved_search_results WHERE search_id = ? AND job_id = ?",
+            [(search_id, job_id) for job_id in removed]
+        )
+        conn.execute(
+            "UPDATE saved_searches SET last_refreshed_at = ?, last_new = ?, last_removed = ? WHERE id = ?",
+            (now, json.dumps(new), json.dumps(removed), search_id)
+        )
+        conn.commit()
+        return new, removed
+
+    def mark_viewed(self, search_id, now=None):
+        conn = self._connect()
+        conn.execute("UPDATE saved_searches SET last_viewed_at = ? WHERE id = ?", (now or time.time(), search_id))
+        conn.commit()
+
+    def claim_due(self, older_than, limit):
+        """Claim up to limit searches not refreshed since older_than
+
+        The claim bumps last_refreshed_at so other worker processes sharing the
+        database skip the same searches.
+        """
+        conn = self._connect()
+        claimed = []
+        rows = conn.execute(
+            "SELECT id, last_refreshed_at FROM saved_searches WHERE last_refreshed_at < ? "
+            "ORDER BY last_refreshed_at LIMIT ?", (older_than, limit)
+        ).fetchall()
+        for row in rows:
+            cursor = conn.execute(
+                "UPDATE saved_searches SET last_refreshed_at = ? WHERE id = ? AND last_refreshed_at = ?",
+                (time.time(), row["id"], row["last_refreshed_at"])
+            )
+            if cursor.rowcount:
+                saved = self.get(row["id"])
+                saved["claimed_from"] = row["last_refreshed_at"]
+                claimed.append(saved)
+        conn.commit()
+        return claimed
+
+    def release(self, saved):
+        """Undo a claim_due() claim so the search is picked up again on the next run"""
+        conn = self._connect()
+        conn.execute(
+            "UPDATE saved_searches SET last_refreshed_at = ? WHERE id = ?", (saved["claimed_from"], saved["id"])
+        )
+        conn.commit()
+
+    def use_quota(self, day, calls, quota):
+        """Reserve upstream calls from a day's quota, returning False if it would be exceeded"""
+        conn = self._connect()
+        conn.execute("INSERT OR IGNORE INTO refresh_quota (day, used) VALUES (?, 0)", (day,))
+        cursor = conn.execute(
+            "UPDATE refresh_quota SET used = used + ? WHERE day = ? AND used + ? <= ?",
+            (calls, day, calls, quota)
+        )
+        conn.commit()
+        return cursor.rowcount == 1
+
+    @staticmethod
+    def _row_to_dict(row):
+        data = dict(row)
+        data["searches"] = json.loads(data["searches"])
+        data["filters"] = json.loads(data["filters"])
+        data["last_new"] = json.loads(data["last_new"])
+        data["last_removed"] = json.loads(data["last_removed"])
+        return data
+
+
+class SavedSearchScheduler:
+    """Background thread that refreshes saved searches during off-peak hours within a daily quota"""
+
+    def __init__(self, store, fetch, off_peak_hours=OFF_PEAK_HOURS, daily_quota=DAILY_REFRESH_QUOTA,
+                 refresh_after=REFRESH_AFTER_SECONDS, interval=SCHEDULER_INTERVAL_SECONDS):
+        self.store = store
+        self.fetch = fetch
+        self.off_peak_hours = off_peak_hours
+        self.daily_quota = daily_quota
+        self.refresh_after = refresh_after
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def is_off_peak(self, now):
+        start, end = self.off_peak_hours
+        if start <= end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    def refresh(self, saved):
+        """Re-run a saved search and record the diff against its last result set
+
+        Returns None without recording anything when a search could only be
+        answered from stale cached results.
+        """
+        job_ids = set()
+        for search in saved["searches"]:
+            jobs = self.fetch(**search)
+            if getattr(jobs, "stale", False):
+                return None
+            job_ids.update(job.job_id or job.fuzzy_key for job in jobs)
+        return self.store.record_results(saved["id"], job_ids)
+
+    def run_once(self, now=None):
+        """Refresh whatever is due right now; returns the number of searches refreshed"""
+        now = now or datetime.now()
+        if not self.is_off_peak(now):
+            return 0
+        refreshed = 0
+        day = now.strftime("%Y-%m-%d")
+        for saved in self.store.claim_due(time.time() - self.refresh_after, limit=self.daily_quota):
+            if not self.store.use_quota(day, len(saved["searches"]), self.daily_quota):
+                self.store.release(saved)
+                continue
+            try:
+                diff = self.refresh(saved)
+            except Exception:
+                diff = None
+            if diff is None:
+                self.store.release(saved)
+            else:
+                refreshed += 1
+        return refreshed
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="saved-search-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
@@ -0,0 +1,293 @@
+"""
+Session memory management for RecruitifyAI
+Accounts for what each Streamlit session keeps in st.session_state and spills large values to disk
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+
+from cache import CACHE_DIR
+
+
+SESSION_SPILL_DIR = os.getenv("RECRUITIFY_SESSION_SPILL_DIR", os.path.join(CACHE_DIR, "sessions"))
+SESSION_MEMORY_LIMIT_BYTES = int(os.getenv("RECRUITIFY_SESSION_MEMORY_LIMIT", 4 * 1024 * 1024))
+PROCESS_MEMORY_LIMIT_BYTES = int(os.getenv("RECRUITIFY_PROCESS_MEMORY_LIMIT", 256 * 1024 * 1024))
+SESSION_IDLE_SECONDS = 30 * 60
+SPILL_MAX_AGE_SECONDS = 24 * 3600
+MEASURE_INTERVAL_SECONDS = 1.0
+EVICT_INTERVAL_SECONDS = 60.0
+
+# Values that are rebuilt or reloaded on demand; everything else stays in memory
+SPILLABLE_KEYS = ("all_jobs", "jobs")
+
+
+class SpilledValue:
+    """Placeholder left in session state for a value moved to disk"""
+
+    __slots__ = ("path", "size")
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+    def __repr__(self):
+        return f"SpilledValue({self.size} bytes)"
+
+
+def estimate_size(value):
+    """Approximate memory held by a session value, measured by its pickled size"""
+    if isinstance(value, SpilledValue):
+        return 0
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def _state_keys(state):
+    # Streamlit's SafeSessionState lists its user keys through filtered_state
+    filtered = getattr(state, "filtered_state", None)
+    return list(filtered if filtered is not None else state)
+
+
+def process_rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _Session:
+    __slots__ = ("state", "last_seen", "measured_at", "sizes")
+
+    def __init__(self, state):
+        self.state = state
+        self.last_seen = 0.0
+        self.measured_at = float("-inf")
+        self.sizes = {}
+
+    @property
+    def total(self):
+        return sum(self.sizes.values())
+
+    def spilled(self):
+        spilled = {}
+        for key in _state_keys(self.state):
+            try:
+                value = self.state[key]
+            except KeyError:
+                continue
+            if isinstance(value, SpilledValue):
+                spilled[key] = value.size
+        return spilled
+
+
+class SessionMemoryManager:
+    """Per-session memory accounting with size caps, idle eviction and spilling to disk
+
+    Each script run calls touch() with the session's state. When a session
+    holds more than limit_bytes, or every session together more than
+    process_limit_bytes, its largest spillable values are pickled to
+    spill_dir and replaced by SpilledValue placeholders; load() brings them
+    back. Sessions idle for idle_seconds have all spillable values moved to
+    disk and are forgotten.
+    """
+
+    def __init__(self, spill_dir=SESSION_SPILL_DIR, limit_bytes=SESSION_MEMORY_LIMIT_BYTES,
+                 process_limit_bytes=PROCESS_MEMORY_LIMIT_BYTES, idle_seconds=SESSION_IDLE_SECONDS,
+                 spillable=SPILLABLE_KEYS):
+        self.spill_dir = spill_dir
+        self.limit_bytes = limit_bytes
+        self.process_limit_bytes = process_limit_bytes
+        self.idle_seconds = idle_seconds
+        self.spillable = tuple(spillable)
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._evicted = 0
+        self._evicted_at = float("-inf")
+
+    def touch(self, session_id, state, now=None):
+        """Record activity for a session, re-measure its state and enforce the caps"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.state is not state:
+                session = self._sessions[session_id] = _Session(state)
+            session.last_seen = now
+            measure = now - session.measured_at >= MEASURE_INTERVAL_SECONDS
+            if measure:
+                session.measured_at = now
+        if measure:
+            self._measure(session)
+            if session.total > self.limit_bytes:
+                self._spill_largest(session_id, session, session.total - self.limit_bytes)
+        if now - self._evicted_at >= EVICT_INTERVAL_SECONDS:
+            self._evicted_at = now
+            self.evict(now)
+
+    def _measure(self, session):
+        sizes = {}
+        for key in _state_keys(session.state):
+            try:
+                sizes[key] = estimate_size(session.state[key])
+            except KeyError:
+                continue
+        session.sizes = sizes
+
+    def _spill_path(self, session_id, key):
+        return os.path.join(self.spill_dir, f"{session_id}-{key}.pickle")
+
+    def _spill(self, session_id, session, key):
+        """Move one value to disk, returning the bytes freed"""
+        try:
+            value = session.state[key]
+        except KeyError:
+            return 0
+        if value is None or isinstance(value, SpilledValue):
+            return 0
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(session_id, key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as spill_file:
+                pickle.dump(value, spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return 0
+        size = session.sizes.pop(key, None)
+        if size is None:
+            size = estimate_size(value)
+        session.state[key] = SpilledValue(path, size)
+        return size
+
+    def _spill_largest(self, session_id, session, needed):
+        freed = 0
+        candidates = sorted(
+            (key for key in self.spillable if session.sizes.get(key)),
+            key=lambda key: -session.sizes[key],
+        )
+        for key in candidates:
+            if freed >= needed:
+                break
+            freed += self._spill(session_id, session, key)
+        return freed
+
+    def load(self, state, key, default_factory=None):
+        """Return state[key], reading it back from disk if it was spilled
+
+        A missing value, or a spill file that is gone, is replaced by
+        default_factory() when one is given.
+        """
+        value = state[key] if key in state else None
+        if isinstance(value, SpilledValue):
+            path = value.path
+            try:
+                with open(path, "rb") as spill_file:
+                    value = pickle.load(spill_file)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                value = None
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            state[key] = value
+        if value is None and default_factory is not None:
+            value = state[key] = default_factory()
+        return value
+
+    def evict(self, now=None):
+        """Spill idle sessions and, past the process cap, the least recently seen ones"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            sessions = sorted(self._sessions.items(), key=lambda item: item[1].last_seen)
+        idle = {session_id for session_id, session in sessions if now - session.last_seen >= self.idle_seconds}
+        for session_id, session in sessions:
+            if session_id not in idle:
+                continue
+            for key in self.spillable:
+                self._spill(session_id, session, key)
+            with self._lock:
+                if self._sessions.get(session_id) is session:
+                    del self._sessions[session_id]
+                    self._evicted += 1
+
+        total = sum(session.total for _, session in sessions)
+        for session_id, session in sessions:
+            if total <= self.process_limit_bytes:
+                break
+            if session_id not in idle:
+                total -= self._spill_largest(session_id, session, total - self.process_limit_bytes)
+        self._purge_spill_files()
+
+    def _purge_spill_files(self):
+        """Delete spill files left behind by sessions that never came back"""
+        try:
+            entries = list(os.scandir(self.spill_dir))
+        except OSError:
+            return
+        cutoff = time.time() - SPILL_MAX_AGE_SECONDS
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+    def forget(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def session_report(self, session_id, now=None):
+        """Bytes held per key, bytes spilled per key and idle time for one session"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            return {
+                "bytes": session.total,
+                "keys": dict(sorted(session.sizes.items(), key=lambda item: -item[1])),
+                "spilled": session.spilled(),
+                "idle_seconds": now - session.last_seen,
+            }
+
+    def report(self):
+        """Process-wide totals across every tracked session"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            evicted = self._evicted
+        return {
+            "sessions": len(sessions),
+            "bytes": sum(session.total for session in sessions),
+            "spilled_bytes": sum(sum(session.spilled().values()) for session in sessions),
+            "evicted_sessions": evicted,
+            "rss_bytes": process_rss_bytes(),
+        }
+
+
+_session_memory = None
+_session_memory_lock = threading.Lock()
+
+
+def get_session_memory():
+    """Return the process-wide session memory manager, creating it on first use"""
+    global _session_memory
+    if _session_memory is None:
+        with _session_memory_lock:
+            if _session_memory is None:
+                _session_memory = SessionMemoryManager()
+    return _session_memory
+
+
+def set_session_memory(manager):
+    """Replace the process-wide session memory manager and return the previous one"""
+    global _session_memory
+    with _session_memory_lock:
+        previous, _session_memory = _session_memory, manager
+    return previous
@@ -0,0 +1,164 @@
+"""
+Local resume-to-job skill gap analysis
+Matches job qualifications against resume skills without any network calls
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+
+
+# Canonical skill name -> spellings seen in resumes and postings. Ambiguous
+# words ("go", "excel", "rest") are only listed in unambiguous phrases.
+SKILL_SYNONYMS = {
+    "Python": ["python", "python3"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": ["typescript"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", ".net", "dotnet"],
+    "Go": ["golang"],
+    "Rust": ["rust"],
+    "Ruby": ["ruby", "ruby on rails", "rails"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "R": ["r programming", "rstudio"],
+    "SQL": ["sql", "t-sql", "pl/sql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "NoSQL": ["nosql"],
+    "React": ["react", "reactjs", "react.js"],
+    "Angular": ["angular", "angularjs"],
+    "Vue": ["vue", "vuejs", "vue.js"],
+    "Node.js": ["node.js", "nodejs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring": ["spring boot", "spring framework"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "sass", "tailwind"],
+    "REST APIs": ["restful", "rest api", "rest apis", "restful apis"],
+    "GraphQL": ["graphql"],
+    "AWS": ["aws", "amazon web services"],
+    "GCP": ["gcp", "google cloud", "google cloud platform"],
+    "Azure": ["azure", "microsoft azure"],
+    "Docker": ["docker", "containers", "containerization"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": ["jenkins"],
+    "Git": ["git", "github", "gitlab"],
+    "Linux": ["linux", "unix"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "Hadoop": ["hadoop"],
+    "Airflow": ["airflow", "apache airflow"],
+    "Machine Learning": ["machine learning", "ml"],
+    "Deep Learning": ["deep learning"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Statistics": ["statistics", "statistical analysis"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["microsoft excel", "ms excel", "excel spreadsheets"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "Project Management": ["project management"],
+    "Microservices": ["microservices", "microservice architecture"],
+    "Communication": ["communication skills", "communication"],
+    "Leadership": ["leadership", "team leadership"],
+    "Problem Solving": ["problem solving", "problem-solving"],
+}
+
+
+def _compile_synonyms(synonyms):
+    lookup = {}
+    for canonical, aliases in synonyms.items():
+        for alias in aliases:
+            lookup[alias.lower()] = canonical
+    # Longest aliases first so "google cloud platform" wins over "google cloud"
+    alternation = "|".join(re.escape(alias) for alias in sorted(lookup, key=len, reverse=True))
+    pattern = re.compile(rf"(?<![\w+#.])(?:{alternation})(?![\w+#])", re.IGNORECASE)
+    return pattern, lookup
+
+
+SKILL_PATTERN, SKILL_LOOKUP = _compile_synonyms(SKILL_SYNONYMS)
+
+# Separates jobs in the batch text; never matched by SKILL_PATTERN
+_JOB_SEPARATOR = "\n\x1e\n"
+
+
+def extract_skills(text):
+    """Canonical skills mentioned in a piece of text, in order of first mention"""
+    found = {}
+    for match in SKILL_PATTERN.finditer(text or ""):
+        found.setdefault(SKILL_LOOKUP[match.group(0).lower()], None)
+    return tuple(found)
+
+
+def extract_skills_batch(texts):
+    """Canonical skills for many texts using a single regex pass over the whole batch"""
+    if not texts:
+        return []
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + len(_JOB_SEPARATOR)
+    results = [{} for _ in texts]
+    for match in SKILL_PATTERN.finditer(_JOB_SEPARATOR.join(texts)):
+        index = bisect_right(offsets, match.start()) - 1
+        results[index].setdefault(SKILL_LOOKUP[match.group(0).lower()], None)
+    return [tuple(found) for found in results]
+
+
+@dataclass(frozen=True, slots=True)
+class SkillGap:
+    """Skills a job asks for, split into those the resume covers and those it lacks"""
+
+    matched: tuple = ()
+    missing: tuple = ()
+
+    @property
+    def required(self):
+        return self.matched + self.missing
+
+    @property
+    def match_ratio(self):
+        total = len(self.matched) + len(self.missing)
+        return len(self.matched) / total if total else None
+
+
+class SkillGapEngine:
+    """Compares a resume's key skills with job qualifications, entirely locally"""
+
+    def __init__(self, resume_skills):
+        canonical = set()
+        raw = set()
+        for skill in resume_skills:
+            raw.add(skill.strip().lower())
+            canonical.update(extract_skills(skill))
+        self.resume_skills = frozenset(canonical)
+        self._raw_skills = frozenset(raw)
+
+    def _has(self, skill):
+        return skill in self.resume_skills or skill.lower() in self._raw_skills
+
+    def analyze(self, jobs):
+        """Return {job key: SkillGap} for a page of jobs, keyed by job_id or fuzzy key"""
+        texts = ["\n".join(job.qualifications) for job in jobs]
+        gaps = {}
+        for job, required in zip(jobs, extract_skills_batch(texts)):
+            matched = tuple(skill for skill in required if self._has(skill))
+            missing = tuple(skill for skill in required if not self._has(skill))
+            gaps[job.job_id or job.fuzzy_key] = SkillGap(matched, missing)
+        return gaps
@@ -1,6 +1,7 @@
 import pytest
 import json
 import os
+import time
 from unittest.mock import Mock, patch, MagicMock
 from io import BytesIO
 import PyPDF2
@@ -348,6 +349,1829 @@ class TestRapidAPIJSearch:
         assert headers['X-RapidAPI-Host'] == 'jsearch.p.rapidapi.com'
 
 
+class TestCacheBackends:
+    """Test cases for the shared cache backends"""
+    
+    def test_memory_cache_roundtrip_and_expiry(self):
+        """Test in-memory cache stores values and honours TTL"""
+        from cache import MemoryCache
+        
+        cache = MemoryCache()
+        cache.set("key", {"data": [1, 2]})
+        cache.set("short", "value", ttl=0.01)
+        
+        assert cache.get("key") == {"data": [1, 2]}
+        time.sleep(0.02)
+        assert cache.get("short") is None
+        assert cache.get("missing") is None
+    
+    def test_sqlite_cache_shared_between_instances(self, tmp_path):
+        """Test two SQLite cache instances on one file see each other's writes"""
+        from cache import SQLiteCache
+        
+        path = str(tmp_path / "cache.sqlite3")
+        worker_a = SQLiteCache(path)
+        worker_b = SQLiteCache(path)
+        
+        worker_a.set("recruitify:jobs:abc", {"data": [{"job_id": "1"}]}, ttl=60)
+        
+        assert worker_b.get("recruitify:jobs:abc") == {"data": [{"job_id": "1"}]}
+        worker_b.delete("recruitify:jobs:abc")
+        assert worker_a.get("recruitify:jobs:abc") is None
+    
+    def test_redis_cache_with_stand_in_client(self):
+        """Test Redis cache against a local stand-in client"""
+        from cache import RedisCache
+        
+        class StandInRedis:
+            def __init__(self):
+                self.store = {}
+                self.expiry = {}
+            
+            def get(self, key):
+                value = self.store.get(key)
+                return value.encode("utf-8") if value is not None else None
+            
+            def set(self, key, value, ex=None):
+                self.store[key] = value
+                self.expiry[key] = ex
+            
+            def delete(self, *keys):
+                for key in keys:
+                    self.store.pop(key, None)
+            
+            def scan_iter(self, match=None):
+                prefix = match.rstrip("*")
+                return [key for key in self.store if key.startswith(prefix)]
+        
+        client = StandInRedis()
+        cache = RedisCache(client=client)
+        cache.set("recruitify:analysis:1", {"Primary job role": "Engineer"}, ttl=30)
+        
+        assert cache.get("recruitify:analysis:1") == {"Primary job role": "Engineer"}
+        assert client.expiry["recruitify:analysis:1"] == 30
+        cache.clear()
+        assert cache.get("recruitify:analysis:1") is None
+    
+    def test_unreachable_backends_behave_as_misses(self, tmp_path):
+        """Test that Redis or SQLite outages read as cache misses instead of raising"""
+        import sqlite3
+        from cache import RedisCache, SQLiteCache
+        
+        client = Mock()
+        client.get.side_effect = ConnectionError("redis down")
+        client.set.side_effect = ConnectionError("redis down")
+        redis_cache = RedisCache(client=client)
+        
+        assert redis_cache.get("recruitify:jobs:1") is None
+        redis_cache.set("recruitify:jobs:1", [1], ttl=30)
+        
+        sqlite_cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        locked = Mock()
+        locked.execute.side_effect = sqlite3.OperationalError("database is locked")
+        sqlite_cache._local.conn = locked
+        
+        assert sqlite_cache.get("recruitify:jobs:1") is None
+        sqlite_cache.set("recruitify:jobs:1", [1], ttl=30)
+    
+    def test_create_cache_unknown_backend(self):
+        """Test that an unknown backend name is rejected"""
+        from cache import create_cache
+        
+        with pytest.raises(ValueError):
+            create_cache("memcached")
+    
+    @patch('google.generativeai.GenerativeModel')
+    @patch('google.generativeai.configure')
+    def test_analyze_resume_uses_cache(self, mock_configure, mock_model_class, mock_streamlit_secrets):
+        """Test that a repeated analysis is served from the cache"""
+        from main import analyze_resume
+        
+        mock_response = Mock()
+        mock_response.text = json.dumps({"Primary job role": "Software Engineer", "Key skills": ["Python"]})
+        mock_model = Mock()
+        mock_model.generate_content.return_value = mock_response
+        mock_model_class.return_value = mock_model
+        
+        first = analyze_resume("Cached resume text")
+        second = analyze_resume("Cached resume text")
+        
+        assert first == second
+        mock_model.generate_content.assert_called_once()
+    
+    @patch('requests.get')
+    def test_fetch_jobs_uses_cache(self, mock_get, mock_streamlit_secrets):
+        """Test that identical job searches hit the upstream only once"""
+        from main import fetch_jobs_rapidapi
+        
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": [{"job_id": "1", "job_title": "Engineer"}]}
+        mock_get.return_value = mock_response
+        
+        fetch_jobs_rapidapi("Engineer", "Berlin")
+        result = fetch_jobs_rapidapi("Engineer", "Berlin")
+        
+        assert result["data"][0]["job_title"] == "Engineer"
+        mock_get.assert_called_once()
+
+
+class TestResumeProfile:
+    """Test cases for the structured resume profile"""
+    
+    def test_parse_model_json_with_code_fences(self, sample_resume_analysis):
+        """Test parsing fenced model output into a profile"""
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.parse(f"```json\n{json.dumps(sample_resume_analysis)}\n```")
+        
+        assert profile.primary_role == "Software Engineer"
+        assert profile.key_skills == ("Python", "JavaScript", "React")
+        assert profile.preferred_titles == ("Senior Developer", "Tech Lead")
+    
+    def test_missing_fields_default_to_empty(self):
+        """Test that an empty model response yields an empty profile instead of KeyError"""
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json({})
+        
+        assert profile.is_empty
+        assert profile.primary_role == ""
+        assert profile.key_skills == ()
+    
+    def test_invalid_field_types_rejected(self):
+        """Test that malformed structures raise ValueError"""
+        from models import ResumeProfile
+        
+        with pytest.raises(ValueError):
+            ResumeProfile.from_model_json(["not", "an", "object"])
+        with pytest.raises(ValueError):
+            ResumeProfile.from_model_json({"Key skills": 42})
+    
+    def test_cache_roundtrip_and_schema_version(self, sample_resume_analysis):
+        """Test compact cache form roundtrips and rejects other schema versions"""
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json(sample_resume_analysis)
+        restored = ResumeProfile.from_cache(json.loads(json.dumps(profile.to_cache())))
+        
+        assert restored == profile
+        assert restored.to_dict() == sample_resume_analysis
+        assert ResumeProfile.from_cache([0] + profile.to_cache()[1:]) is None
+        assert ResumeProfile.from_cache(None) is None
+    
+    def test_profile_is_immutable_and_slotted(self, sample_resume_analysis):
+        """Test that profiles are frozen and carry no per-instance dict"""
+        import dataclasses
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json(sample_resume_analysis)
+        
+        assert not hasattr(profile, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            profile.primary_role = "Other"
+    
+    @patch('google.generativeai.GenerativeModel')
+    @patch('google.generativeai.configure')
+    def test_analyze_resume_profile_failure_returns_none(self, mock_configure, mock_model_class, mock_streamlit_secrets):
+        """Test that a failed analysis returns None rather than an empty dict"""
+        from main import analyze_resume_profile
+        
+        mock_response = Mock()
+        mock_response.text = "[1, 2, 3]"
+        mock_model = Mock()
+        mock_model.generate_content.return_value = mock_response
+        mock_model_class.return_value = mock_model
+        
+        assert analyze_resume_profile("Broken resume") is None
+
+
+class TestJobModels:
+    """Test cases for slim job records and the dedup store"""
+    
+    def test_job_from_api_keeps_only_used_fields(self, sample_job_listing):
+        """Test normalization of a raw JSearch job"""
+        from models import Job
+        
+        raw = dict(sample_job_listing, job_publisher="LinkedIn", job_latitude=37.7,
+                   job_highlights={"Qualifications": ["Python"], "Responsibilities": ["Code"]})
+        job = Job.from_api(raw)
+        
+        assert job.job_title == "Senior Python Developer"
+        assert job["job_min_salary"] == 120000
+        assert job.get("job_city") == "San Francisco"
+        assert job.qualifications == ("Python",)
+        assert job.job_employment_types == ("FULLTIME",)
+        assert job.get("job_publisher") is None
+        assert not hasattr(job, "__dict__")
+    
+    def test_job_cache_roundtrip(self, sample_job_listings):
+        """Test compact cache form roundtrips through JSON"""
+        from models import jobs_from_cache, jobs_to_cache, normalize_jobs
+        
+        jobs = normalize_jobs(sample_job_listings)
+        restored = jobs_from_cache(json.loads(json.dumps(jobs_to_cache(jobs))))
+        
+        assert restored == jobs
+        assert jobs_from_cache({"v": -1, "data": []}) is None
+    
+    def test_job_display_fields_are_derived_once(self, sample_job_listing):
+        """Test that posting time, salary and location are precomputed and cached with the job"""
+        from datetime import datetime, timezone
+        from models import Job, jobs_from_cache, jobs_to_cache
+        
+        job = Job.from_api(dict(sample_job_listing, job_state=" CA ", job_country="USA"))
+        
+        assert job.posted_at == datetime(2024, 1, 20, 10, tzinfo=timezone.utc).timestamp()
+        assert job.salary_text == "$120,000 - $180,000"
+        assert job.location_text == "San Francisco, CA, USA"
+        with patch('models.parse_posted_at') as mock_parse:
+            restored = jobs_from_cache(json.loads(json.dumps(jobs_to_cache([job]))))
+        mock_parse.assert_not_called()
+        assert restored[0] == job
+        assert jobs_from_cache({"v": 1, "data": [job.to_cache()[:18]]}) is None
+    
+    def test_job_display_fields_tolerate_missing_values(self):
+        """Test derived fields for jobs without a date, a full salary range or a location"""
+        from cards import format_posted
+        from models import Job
+        
+        job = Job(job_min_salary=50000, job_posted_at_datetime_utc="last week", job_city="Remote", job_country="remote")
+        
+        assert job.posted_at is None
+        assert job.salary_text == ""
+        assert job.location_text == "Remote"
+        assert format_posted(None) == ""
+        assert format_posted(1000, now=1000 + 86400 * 3.5) == "3 days ago"
+        assert format_posted(1000, now=1000 + 86400) == "Yesterday"
+    
+    def test_job_store_dedupes_by_id_and_fuzzy_key(self):
+        """Test that the store drops repeated ids and re-syndicated postings"""
+        from models import Job, JobStore
+        
+        store = JobStore()
+        added = store.extend([
+            Job(job_id="1", job_title="Senior Python Developer", employer_name="Tech Corp"),
+            Job(job_id="1", job_title="Senior Python Developer", employer_name="Tech Corp"),
+            Job(job_id="2", job_title="Python Developer, Senior", employer_name="Tech Corp Inc."),
+            Job(job_id="3", job_title="Data Engineer", employer_name="Tech Corp"),
+        ])
+        
+        assert [job.job_id for job in added] == ["1", "3"]
+        assert len(store) == 2
+        assert "3" in store
+    
+    def test_job_store_keeps_same_role_in_other_cities(self):
+        """Test that one employer's openings in different cities are not merged"""
+        from models import Job, JobStore, normalize_jobs
+        
+        store = JobStore([
+            Job(job_id="1", job_title="Software Engineer", employer_name="Google", job_city="New York"),
+            Job(job_id="2", job_title="Software Engineer", employer_name="Google LLC", job_city="Austin"),
+            Job(job_id="3", job_title="Engineer, Software", employer_name="Google", job_city="Austin"),
+        ])
+        baristas = normalize_jobs([
+            {"job_id": "a", "job_title": "Barista", "employer_name": "Starbucks", "job_city": "Seattle", "job_state": "WA"},
+            {"job_id": "b", "job_title": "Barista", "employer_name": "Starbucks", "job_city": "Portland", "job_state": "OR"},
+        ])
+        
+        assert [job.job_id for job in store] == ["1", "2"]
+        assert len(baristas) == 2
+    
+    @patch('requests.get')
+    def test_fetch_jobs_returns_normalized_jobs(self, mock_get, mock_streamlit_secrets):
+        """Test that fetch_jobs_rapidapi normalizes and dedupes upstream results"""
+        from main import fetch_jobs_rapidapi
+        from models import Job
+        
+        raw = {"job_id": "1", "job_title": "Engineer", "employer_name": "Acme", "job_naics_code": "541511"}
+        mock_response = Mock()
+        mock_response.json.return_value = {"status": "OK", "data": [raw, dict(raw)]}
+        mock_get.return_value = mock_response
+        
+        result = fetch_jobs_rapidapi("Engineer")
+        
+        assert len(result["data"]) == 1
+        assert isinstance(result["data"][0], Job)
+    
+    def test_slim_jobs_use_less_memory_than_raw(self):
+        """Test that 1,000 slim jobs hold less memory than the raw responses"""
+        from benchmarks import bench_job_memory
+        
+        raw_bytes, slim_bytes = bench_job_memory(1000)
+        
+        assert slim_bytes < raw_bytes
+
+
+class TestStreamingSearch:
+    """Test cases for streaming job search batches"""
+    
+    def test_build_searches_uses_distinct_titles(self, sample_resume_analysis):
+        """Test that a results page fans out over distinct resume titles"""
+        from job_search import build_searches
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json(dict(
+            sample_resume_analysis,
+            **{"Preferred job titles": ["software engineer", "Tech Lead", "Architect", "Manager"]}
+        ))
+        searches = build_searches(profile, "Berlin", page=2, extra_titles=True)
+        
+        assert [s["job_title"] for s in searches] == ["Software Engineer", "Tech Lead", "Architect"]
+        assert all(s["location"] == "Berlin" and s["page"] == 2 for s in searches)
+        assert [s["job_title"] for s in build_searches(profile, "Berlin")] == ["Software Engineer"]
+    
+    def test_batches_yield_in_completion_order(self):
+        """Test that the fastest search is yielded first"""
+        from job_search import iter_job_batches
+        
+        def fetch(job_title, delay):
+            time.sleep(delay)
+            return [job_title]
+        
+        searches = [{"job_title": "slow", "delay": 0.2}, {"job_title": "fast", "delay": 0.0}]
+        start = time.time()
+        batches = iter_job_batches(fetch, searches)
+        first = next(batches)
+        first_latency = time.time() - start
+        rest = list(batches)
+        
+        assert first[1] == ["fast"]
+        assert first_latency < 0.15
+        assert rest[0][1] == ["slow"]
+    
+    def test_batch_errors_are_returned_not_raised(self):
+        """Test that one failing search does not abort the others"""
+        from job_search import iter_job_batches
+        
+        def fetch(job_title):
+            if job_title == "broken":
+                raise requests.exceptions.ConnectionError("down")
+            return [job_title]
+        
+        results = {s["job_title"]: (jobs, error) for s, jobs, error in
+                   iter_job_batches(fetch, [{"job_title": "broken"}, {"job_title": "ok"}])}
+        
+        assert results["ok"] == (["ok"], None)
+        assert isinstance(results["broken"][1], requests.exceptions.ConnectionError)
+    
+    @patch('requests.get')
+    def test_search_jobs_raises_on_error(self, mock_get, mock_streamlit_secrets):
+        """Test that the thread-safe search raises instead of calling st.error"""
+        from main import search_jobs
+        
+        mock_get.side_effect = requests.exceptions.RequestException("Connection error")
+        
+        with pytest.raises(requests.exceptions.RequestException):
+            search_jobs("Any Job")
+
+
+class TestSkillGap:
+    """Test cases for local skill gap analysis"""
+    
+    def test_extract_skills_uses_synonyms(self):
+        """Test that synonyms map onto canonical skill names"""
+        from skills import extract_skills
+        
+        skills = extract_skills("Experience with k8s, Postgres, ReactJS and C++; excel at teamwork; rest of stack")
+        
+        assert skills == ("Kubernetes", "PostgreSQL", "React", "C++")
+    
+    def test_batch_extraction_maps_matches_back_to_jobs(self):
+        """Test that a single pass over the page attributes skills to the right job"""
+        from skills import extract_skills_batch
+        
+        result = extract_skills_batch(["Python and AWS", "", "Java, not JavaScript... well, JS too"])
+        
+        assert result == [("Python", "AWS"), (), ("Java", "JavaScript")]
+    
+    def test_engine_reports_matched_and_missing(self):
+        """Test per-job gap computation against resume skills"""
+        from models import Job
+        from skills import SkillGapEngine
+        
+        jobs = [
+            Job(job_id="1", qualifications=("5+ years of Python", "Experience with Amazon Web Services and Docker")),
+            Job(job_id="2", qualifications=("Golang services",)),
+            Job(job_id="3"),
+        ]
+        engine = SkillGapEngine(["python3", "AWS", "Go"])
+        gaps = engine.analyze(jobs)
+        
+        assert gaps["1"].matched == ("Python", "AWS")
+        assert gaps["1"].missing == ("Docker",)
+        assert gaps["2"].missing == ()
+        assert gaps["3"].match_ratio is None
+    
+    def test_engine_makes_no_network_calls(self, sample_job_listings):
+        """Test that gap analysis stays local"""
+        from models import normalize_jobs
+        from skills import SkillGapEngine
+        
+        with patch('requests.get') as mock_get:
+            SkillGapEngine(["Python"]).analyze(normalize_jobs(sample_job_listings))
+        
+        mock_get.assert_not_called()
+
+
+class TestLogoCache:
+    """Test cases for the employer logo thumbnail cache"""
+    
+    @staticmethod
+    def _png_response(size=(800, 600)):
+        from PIL import Image
+        
+        buffer = BytesIO()
+        Image.new("RGB", size, (79, 70, 229)).save(buffer, format="PNG")
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [buffer.getvalue()]
+        return mock_response
+    
+    @patch('requests.get')
+    def test_logo_downloaded_once_and_downsized(self, mock_get, tmp_path):
+        """Test that a logo is fetched once and stored as a small thumbnail"""
+        from PIL import Image
+        from logos import LogoCache
+        
+        mock_get.return_value = self._png_response()
+        cache = LogoCache(directory=str(tmp_path), size=64)
+        
+        first = cache.get("https://logos.example.com/acme.png")
+        second = cache.get("https://logos.example.com/acme.png")
+        
+        assert first == second
+        mock_get.assert_called_once()
+        with Image.open(first) as image:
+            assert max(image.size) == 64
+        assert cache.data_uri("https://logos.example.com/acme.png").startswith("data:image/png;base64,")
+    
+    @patch('requests.get')
+    def test_failed_logo_not_retried(self, mock_get, tmp_path):
+        """Test that broken logo URLs are skipped on later reruns"""
+        from logos import LogoCache
+        
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        cache = LogoCache(directory=str(tmp_path))
+        
+        assert cache.get("https://logos.example.com/broken.png") is None
+        assert cache.get("https://logos.example.com/broken.png") is None
+        mock_get.assert_called_once()
+    
+    @patch('requests.get')
+    def test_failed_logo_retried_after_backoff(self, mock_get, tmp_path):
+        """Test that a transient failure does not hide a logo for the life of the process"""
+        from logos import LogoCache
+        
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        cache = LogoCache(directory=str(tmp_path), retry_after=0)
+        assert cache.get("https://logos.example.com/flaky.png") is None
+        
+        mock_get.side_effect = lambda *args, **kwargs: self._png_response()
+        assert cache.get("https://logos.example.com/flaky.png") is not None
+    
+    @patch('requests.get')
+    def test_missing_logo_downloads_in_background(self, mock_get, tmp_path):
+        """Test that wait=False returns at once and the logo is ready on a later rerun"""
+        from logos import LogoCache
+        
+        mock_get.side_effect = lambda *args, **kwargs: self._png_response()
+        cache = LogoCache(directory=str(tmp_path), size=64)
+        url = "https://logos.example.com/later.png"
+        
+        assert cache.get(url, wait=False) is None
+        deadline = time.time() + 5
+        while not os.path.exists(cache.path_for(url)) and time.time() < deadline:
+            time.sleep(0.01)
+        
+        assert cache.get(url, wait=False) == cache.path_for(url)
+        mock_get.assert_called_once()
+    
+    @patch('requests.get')
+    def test_least_recently_used_logo_evicted(self, mock_get, tmp_path):
+        """Test that the cache evicts the least recently used thumbnail"""
+        from logos import LogoCache
+        
+        mock_get.side_effect = lambda *args, **kwargs: self._png_response()
+        cache = LogoCache(directory=str(tmp_path), size=64)
+        oldest = cache.get("https://logos.example.com/a.png")
+        os.utime(oldest, (1, 1))
+        cache.max_bytes = os.path.getsize(oldest) * 1.5
+        newest = cache.get("https://logos.example.com/b.png")
+        
+        assert not os.path.exists(oldest)
+        assert os.path.exists(newest)
+
+
+class TestLazyCardDetails:
+    """Test cases for deferred job description rendering"""
+    
+    def test_truncate_preview_cuts_on_word_boundary(self):
+        """Test preview truncation"""
+        from cards import truncate_preview
+        
+        assert truncate_preview("Short text") == "Short text"
+        preview = truncate_preview("word " * 100, limit=22)
+        
+        assert preview == "word word word word…"
+        assert truncate_preview(None) == ""
+    
+    def test_details_markdown_contains_highlights(self, sample_job_listing):
+        """Test that full details include description, qualifications and benefits"""
+        from cards import job_details_markdown
+        from models import Job
+        
+        job = Job.from_api(dict(sample_job_listing, job_highlights={
+            "Qualifications": ["Python"], "Benefits": ["Health insurance"]
+        }))
+        markdown = "\n".join(job_details_markdown(job))
+        
+        assert "We are looking for..." in markdown
+        assert "- Python" in markdown
+        assert "- Health insurance" in markdown
+    
+    def test_closed_cards_send_less_payload(self):
+        """Test that closed cards send far less markdown than expanded ones"""
+        from benchmarks import bench_card_payload
+        
+        eager, lazy = bench_card_payload(10)
+        
+        assert lazy < eager / 4
+
+
+class TestResultsFragment:
+    """Test cases for the fragment-scoped results section"""
+    
+    def test_go_to_page_updates_state_without_rerun(self, mock_streamlit_secrets):
+        """Test that pagination callbacks only change state and never force a full rerun"""
+        import streamlit as st
+        from main import go_to_page
+        
+        with patch('streamlit.rerun') as mock_rerun:
+            go_to_page(3)
+        
+        assert st.session_state.current_page == 3
+        mock_rerun.assert_not_called()
+
+
+class TestMultiLocationSearch:
+    """Test cases for comma-separated multi-location fan-out"""
+    
+    def test_parse_locations_keeps_state_codes(self):
+        """Test that city/state pairs survive comma splitting"""
+        from job_search import parse_locations
+        
+        assert parse_locations("New York, NY") == ["New York, NY"]
+        assert parse_locations("New York, NY, remote; Austin, TX, Berlin") == ["New York, NY", "Remote", "Austin, TX", "Berlin"]
+        assert parse_locations("Berlin, berlin") == ["Berlin"]
+        assert parse_locations("") == []
+    
+    def test_build_searches_fans_out_over_locations(self, sample_resume_analysis):
+        """Test one search per location, with Remote mapped to a remote-only search"""
+        from job_search import build_searches
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json(dict(sample_resume_analysis, **{"Preferred job titles": []}))
+        searches = build_searches(profile, "Berlin, Remote")
+        
+        assert [(s["location"], s["work_from_home"]) for s in searches] == [("Berlin", None), (None, True)]
+        assert all(s["job_title"] == "Software Engineer" for s in searches)
+    
+    def test_build_searches_is_capped(self, sample_resume_analysis):
+        """Test that the fan-out never exceeds the search cap"""
+        from job_search import MAX_FANOUT_SEARCHES, build_searches
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json(sample_resume_analysis)
+        searches = build_searches(profile, "A; B; C; D; E", extra_titles=True)
+        
+        assert len(searches) == MAX_FANOUT_SEARCHES
+        assert [s["location"] for s in searches[:5]] == ["A", "B", "C", "D", "E"]
+    
+    def test_locations_beyond_cap_are_reported(self, sample_resume_analysis):
+        """Test that every location is searched before extra titles and the overflow is reported"""
+        from job_search import MAX_FANOUT_SEARCHES, build_searches, dropped_locations
+        from models import ResumeProfile
+        
+        profile = ResumeProfile.from_model_json(sample_resume_analysis)
+        locations = "; ".join("ABCDEFGHIJ")
+        searches = build_searches(profile, locations, extra_titles=True)
+        
+        assert [s["location"] for s in searches] == list("ABCDEFGH")
+        assert {s["job_title"] for s in searches} == {"Software Engineer"}
+        assert dropped_locations(locations) == ["I", "J"]
+        assert dropped_locations("A; Remote; " + "; ".join("BCDEFGH"), work_from_home=False) == []
+        assert len(build_searches(profile, "A; Remote; " + "; ".join("BCDEFGH"), work_from_home=False)) == MAX_FANOUT_SEARCHES
+    
+    def test_rank_jobs_prefers_fit_then_recency(self):
+        """Test merged ranking by skill fit and posting date"""
+        from datetime import datetime
+        from job_search import rank_jobs
+        from models import Job
+        from skills import SkillGap
+        
+        jobs = [
+            Job(job_id="old-fit", job_posted_at_datetime_utc="2024-01-01T00:00:00Z"),
+            Job(job_id="new-fit", job_posted_at_datetime_utc="2024-01-20T00:00:00Z"),
+            Job(job_id="no-fit", job_posted_at_datetime_utc="2024-01-20T00:00:00Z"),
+        ]
+        gaps = {
+            "old-fit": SkillGap(("Python",), ()),
+            "new-fit": SkillGap(("Python",), ()),
+            "no-fit": SkillGap((), ("Java",)),
+        }
+        
+        ranked = rank_jobs(jobs, gaps, now=datetime(2024, 1, 21))
+        
+        assert [job.job_id for job in ranked] == ["new-fit", "old-fit", "no-fit"]
+    
+    def test_fan_out_latency_bounded_by_slowest_location(self):
+        """Test that locations are queried concurrently"""
+        from job_search import iter_job_batches
+        
+        def fetch(location):
+            time.sleep(0.1)
+            return [location]
+        
+        start = time.time()
+        results = list(iter_job_batches(fetch, [{"location": str(i)} for i in range(6)]))
+        
+        assert len(results) == 6
+        assert time.time() - start < 0.3
+
+
+class TestSavedSearches:
+    """Test cases for saved searches, diffing and the off-peak scheduler"""
+    
+    def test_save_is_idempotent_per_owner(self, tmp_path):
+        """Test that saving the same search twice returns the same id"""
+        from saved_searches import SavedSearchStore
+        
+        store = SavedSearchStore(str(tmp_path / "saved.sqlite3"))
+        searches = [{"job_title": "Engineer", "location": "Berlin", "page": 1}]
+        
+        first = store.save("owner-a", "Engineer · Berlin", searches, {"location": "Berlin"})
+        second = store.save("owner-a", "Engineer · Berlin", searches)
+        
+        assert first == second
+        assert [saved["name"] for saved in store.list("owner-a")] == ["Engineer · Berlin"]
+        assert store.list("owner-b") == []
+    
+    def test_record_results_diffs_job_ids(self, tmp_path):
+        """Test new and removed job ids between refreshes and new-since-visit counts"""
+        from saved_searches import SavedSearchStore
+        
+        store = SavedSearchStore(str(tmp_path / "saved.sqlite3"))
+        search_id = store.save("owner", "Engineer", [{"job_title": "Engineer"}])
+        
+        store.record_results(search_id, ["1", "2", "3"], now=100)
+        store.mark_viewed(search_id, now=150)
+        new, removed = store.record_results(search_id, ["2", "3", "4", "5"], now=200)
+        
+        assert new == ["4", "5"]
+        assert removed == ["1"]
+        assert store.list("owner")[0]["new_count"] == 2
+        assert store.get(search_id)["last_removed"] == ["1"]
+    
+    def test_scheduler_only_refreshes_off_peak(self, tmp_path):
+        """Test that refreshes only happen inside the off-peak window"""
+        from datetime import datetime
+        from models import Job
+        from saved_searches import SavedSearchScheduler, SavedSearchStore
+        
+        store = SavedSearchStore(str(tmp_path / "saved.sqlite3"))
+        search_id = store.save("owner", "Engineer", [{"job_title": "Engineer"}])
+        fetch = Mock(return_value=[Job(job_id="1"), Job(job_id="2")])
+        scheduler = SavedSearchScheduler(store, fetch, off_peak_hours=(2, 6))
+        
+        assert scheduler.run_once(now=datetime(2024, 1, 20, 14, 0)) == 0
+        fetch.assert_not_called()
+        assert scheduler.run_once(now=datetime(2024, 1, 20, 3, 0)) == 1
+        assert store.job_ids(search_id) == {"1", "2"}
+        assert scheduler.run_once(now=datetime(2024, 1, 20, 3, 10)) == 0
+    
+    def test_scheduler_skips_stale_results(self, tmp_path):
+        """Test that a refresh answered from stale cache is released instead of recorded"""
+        from datetime import datetime
+        from models import Job, JobPage
+        from saved_searches import SavedSearchScheduler, SavedSearchStore
+        
+        store = SavedSearchStore(str(tmp_path / "saved.sqlite3"))
+        search_id = store.save("owner", "Engineer", [{"job_title": "Engineer"}])
+        store.record_results(search_id, ["1"], now=100)
+        fetch = Mock(return_value=JobPage([Job(job_id="2")], fetched_at=50, stale=True))
+        scheduler = SavedSearchScheduler(store, fetch)
+        
+        assert scheduler.run_once(now=datetime(2024, 1, 20, 3, 0)) == 0
+        assert store.job_ids(search_id) == {"1"}
+        assert store.get(search_id)["last_refreshed_at"] == 100
+        assert len(store.claim_due(older_than=time.time(), limit=10)) == 1
+    
+    def test_scheduler_respects_daily_quota(self, tmp_path):
+        """Test that refreshes stop once the daily upstream quota is used"""
+        from datetime import datetime
+        from saved_searches import SavedSearchScheduler, SavedSearchStore
+        
+        store = SavedSearchStore(str(tmp_path / "saved.sqlite3"))
+        for i in range(3):
+            store.save("owner", f"Search {i}", [{"job_title": f"Role {i}"}, {"job_title": f"Alt {i}"}])
+        scheduler = SavedSearchScheduler(store, Mock(return_value=[]), daily_quota=4)
+        
+        assert scheduler.run_once(now=datetime(2024, 1, 20, 3, 0)) == 2
+        assert len(store.claim_due(older_than=1, limit=10)) == 1
+
+
+class TestJobCorpus:
+    """Test cases for the local full-text job corpus"""
+    
+    def test_search_ranks_title_matches_first(self, isolated_job_corpus):
+        """Test keyword search across titles, descriptions and locations"""
+        from models import Job
+        
+        isolated_job_corpus.upsert([
+            Job(job_id="1", job_title="Python Developer", job_city="Berlin", job_description="Django APIs"),
+            Job(job_id="2", job_title="Data Analyst", job_city="Berlin", job_description="Some Python scripting"),
+            Job(job_id="3", job_title="Python Engineer", job_city="Paris"),
+        ])
+        
+        assert [job.job_id for job in isolated_job_corpus.search("python")][2] == "2"
+        assert [job.job_id for job in isolated_job_corpus.search("python", location="Berlin")][0] == "1"
+        assert {job.job_id for job in isolated_job_corpus.search("python", location="Berlin")} == {"1", "2"}
+        assert isolated_job_corpus.search("c++") == []
+        assert isolated_job_corpus.search("   ") == []
+    
+    def test_upsert_replaces_by_job_id(self, isolated_job_corpus):
+        """Test that refetching a job updates it instead of adding a duplicate"""
+        from models import Job
+        
+        isolated_job_corpus.upsert([Job(job_id="1", job_title="Rust Developer")])
+        isolated_job_corpus.upsert([Job(job_id="1", job_title="Senior Rust Developer")])
+        
+        assert len(isolated_job_corpus) == 1
+        assert isolated_job_corpus.search("senior rust")[0].job_title == "Senior Rust Developer"
+    
+    def test_jobs_expire_by_posting_date(self, isolated_job_corpus):
+        """Test that postings older than the maximum age are dropped"""
+        from datetime import datetime, timezone
+        from models import Job
+        
+        now = datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp()
+        isolated_job_corpus.upsert([
+            Job(job_id="old", job_title="Go Developer", job_posted_at_datetime_utc="2024-01-01T00:00:00.000Z"),
+            Job(job_id="new", job_title="Go Developer", job_posted_at_datetime_utc="2024-02-25T00:00:00.000Z"),
+        ], now=now)
+        
+        assert [job.job_id for job in isolated_job_corpus.search("go developer", now=now)] == ["new"]
+        assert isolated_job_corpus.expire(now=now + 30 * 24 * 3600) == 1
+        assert len(isolated_job_corpus) == 0
+    
+    @patch('main.requests.get')
+    def test_search_jobs_writes_corpus(self, mock_get, mock_streamlit_secrets, isolated_job_corpus):
+        """Test that live results are stored for offline search"""
+        from main import search_jobs
+        
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": [
+            {"job_id": "a1", "job_title": "Kotlin Engineer", "employer_name": "Acme", "job_city": "Oslo"}
+        ]}
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        
+        search_jobs("Kotlin Engineer", "Oslo")
+        
+        assert [job.job_id for job in isolated_job_corpus.search("kotlin", location="oslo")] == ["a1"]
+    
+    def test_search_offline_answers_fanout_searches(self, isolated_job_corpus):
+        """Test that remote-only searches match remote jobs in the corpus"""
+        from job_search import search_offline
+        from models import Job
+        
+        isolated_job_corpus.upsert([
+            Job(job_id="1", job_title="Backend Engineer", job_is_remote=True),
+            Job(job_id="2", job_title="Backend Engineer", job_city="Austin", employer_name="Other"),
+        ])
+        searches = [
+            {"job_title": "Backend Engineer", "location": None, "page": 1, "work_from_home": True},
+            {"job_title": "Backend Engineer", "location": "Austin", "page": 1, "work_from_home": None},
+        ]
+        
+        assert [job.job_id for job in search_offline(isolated_job_corpus, searches)] == ["1", "2"]
+
+
+class TestCircuitBreaker:
+    """Test cases for upstream circuit breakers and stale fallback"""
+    
+    def test_opens_on_failure_rate_and_probes_half_open(self):
+        """Test that the breaker opens, fails fast, then closes after a successful probe"""
+        from circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, UpstreamUnavailableError
+        
+        breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4, open_seconds=0.05)
+        failing = Mock(side_effect=ConnectionError("down"))
+        breaker.call(Mock(return_value="ok"))
+        breaker.call(Mock(return_value="ok"))
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(failing)
+        
+        assert breaker.state == OPEN
+        with pytest.raises(UpstreamUnavailableError):
+            breaker.call(failing)
+        assert failing.call_count == 2
+        
+        time.sleep(0.06)
+        assert breaker.state == HALF_OPEN
+        assert breaker.call(Mock(return_value="ok")) == "ok"
+        assert breaker.state == CLOSED
+    
+    def test_failed_probe_reopens(self):
+        """Test that a failing half-open probe re-opens the breaker"""
+        from circuit import OPEN, CircuitBreaker
+        
+        breaker = CircuitBreaker("test", min_calls=1, open_seconds=0.01)
+        with pytest.raises(ValueError):
+            breaker.call(Mock(side_effect=ValueError()))
+        time.sleep(0.02)
+        with pytest.raises(ValueError):
+            breaker.call(Mock(side_effect=ValueError()))
+        
+        assert breaker.state == OPEN
+    
+    def test_ignores_exceptions_outside_failure_types(self):
+        """Test that caller errors do not count against the upstream"""
+        from circuit import CLOSED, CircuitBreaker
+        
+        breaker = CircuitBreaker("test", min_calls=1)
+        with pytest.raises(KeyError):
+            breaker.call(Mock(side_effect=KeyError()), failure_types=(ConnectionError,))
+        
+        assert breaker.state == CLOSED
+    
+    def test_caps_in_flight_requests(self):
+        """Test that calls beyond max_in_flight are rejected after the acquire timeout"""
+        import threading
+        from circuit import CircuitBreaker, UpstreamUnavailableError
+        
+        breaker = CircuitBreaker("test", max_in_flight=1, acquire_timeout=0.01)
+        release = threading.Event()
+        worker = threading.Thread(target=breaker.call, args=(release.wait,))
+        worker.start()
+        time.sleep(0.02)
+        try:
+            with pytest.raises(UpstreamUnavailableError):
+                breaker.call(Mock())
+        finally:
+            release.set()
+            worker.join()
+    
+    def test_breaker_settings_from_environment(self, monkeypatch):
+        """Test RECRUITIFY_<NAME>_* overrides"""
+        from circuit import breaker_from_env
+        
+        monkeypatch.setenv("RECRUITIFY_JSEARCH_MAX_IN_FLIGHT", "2")
+        monkeypatch.setenv("RECRUITIFY_JSEARCH_OPEN_SECONDS", "not-a-number")
+        breaker = breaker_from_env("jsearch", open_seconds=45)
+        
+        assert breaker.max_in_flight == 2
+        assert breaker.open_seconds == 45
+    
+    @patch('main.requests.get')
+    def test_search_jobs_serves_stale_page_while_upstream_fails(self, mock_get, mock_streamlit_secrets):
+        """Test that an expired cached page is returned, marked stale, when JSearch fails"""
+        from main import JOBS_REVALIDATE_TTL, search_jobs
+        
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": [{"job_id": "1", "job_title": "Engineer"}]}
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+        fresh = search_jobs("Engineer")
+        assert not fresh.stale
+        
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        with patch('main.time.time', return_value=fresh.fetched_at + JOBS_REVALIDATE_TTL + 1):
+            stale = search_jobs("Engineer")
+        
+        assert stale.stale
+        assert [job.job_id for job in stale] == ["1"]
+        assert stale.fetched_at == fresh.fetched_at
+    
+    @patch('main.requests.get')
+    def test_jsearch_cap_fits_a_full_fanout(self, mock_get, mock_streamlit_secrets):
+        """Test that one user's full multi-location search never hits the in-flight cap"""
+        import threading
+        from circuit import get_breaker
+        from job_search import MAX_FANOUT_SEARCHES, iter_job_batches
+        from main import search_jobs
+        
+        started = threading.Barrier(MAX_FANOUT_SEARCHES, timeout=5)
+        
+        def slow_response(*args, **kwargs):
+            started.wait()
+            response = Mock()
+            response.json.return_value = {"data": []}
+            return response
+        
+        mock_get.side_effect = slow_response
+        searches = [{"job_title": "Engineer", "location": f"City {i}"} for i in range(MAX_FANOUT_SEARCHES)]
+        errors = [error for _, _, error in iter_job_batches(search_jobs, searches)]
+        
+        assert errors == [None] * MAX_FANOUT_SEARCHES
+        assert get_breaker("jsearch").max_in_flight >= MAX_FANOUT_SEARCHES
+    
+    @patch('main.requests.get')
+    def test_open_breaker_skips_jsearch(self, mock_get, mock_streamlit_secrets):
+        """Test that an open breaker fails fast without calling JSearch"""
+        from circuit import UpstreamUnavailableError, get_breaker
+        from main import search_jobs
+        
+        get_breaker("jsearch")._trip(time.monotonic())
+        
+        with pytest.raises(UpstreamUnavailableError):
+            search_jobs("Engineer")
+        mock_get.assert_not_called()
+    
+    @patch('main.st')
+    @patch('google.generativeai.GenerativeModel')
+    @patch('google.generativeai.configure')
+    def test_open_gemini_breaker_warns(self, mock_configure, mock_model_class, mock_st, mock_streamlit_secrets):
+        """Test that analysis shows a warning instead of calling Gemini while its breaker is open"""
+        from circuit import get_breaker
+        from main import analyze_resume
+        
+        mock_st.secrets = mock_streamlit_secrets
+        get_breaker("gemini")._trip(time.monotonic())
+        
+        assert analyze_resume("Resume text") == {}
+        mock_model_class.return_value.generate_content.assert_not_called()
+        mock_st.warning.assert_called_once()
+
+
+class TestStaleWhileRevalidate:
+    """Test cases for serving stale job pages while they refresh in the background"""
+    
+    @staticmethod
+    def _response(job_id):
+        response = Mock()
+        response.json.return_value = {"data": [{"job_id": job_id, "job_title": "Engineer"}]}
+        response.raise_for_status = Mock()
+        return response
+    
+    @patch('main.requests.get')
+    def test_stale_page_is_served_then_refreshed(self, mock_get, mock_streamlit_secrets, isolated_revalidator):
+        """Test that a page past its freshness window returns at once and is refreshed in the background"""
+        from main import JOBS_CACHE_TTL, search_jobs
+        
+        mock_get.return_value = self._response("old")
+        first = search_jobs("Engineer")
+        
+        mock_get.return_value = self._response("new")
+        later = first.fetched_at + JOBS_CACHE_TTL + 1
+        with patch('main.time.time', return_value=later):
+            served = search_jobs("Engineer")
+            assert [job.job_id for job in served] == ["old"]
+            assert served.revalidating and not served.stale
+            isolated_revalidator.wait([served.revalidating], timeout=5)
+            refreshed = search_jobs("Engineer")
+        
+        assert [job.job_id for job in refreshed] == ["new"]
+        assert refreshed.revalidating is None
+        assert mock_get.call_count == 2
+    
+    @patch('main.requests.get')
+    def test_failed_refresh_serves_stale_without_retrying(self, mock_get, mock_streamlit_secrets, isolated_revalidator):
+        """Test that a failed background refresh leaves the page marked stale instead of polling again"""
+        from main import JOBS_CACHE_TTL, search_jobs
+        
+        mock_get.return_value = self._response("old")
+        first = search_jobs("Engineer")
+        
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        with patch('main.time.time', return_value=first.fetched_at + JOBS_CACHE_TTL + 1):
+            served = search_jobs("Engineer")
+            isolated_revalidator.wait([served.revalidating], timeout=5)
+            assert isolated_revalidator.pending([served.revalidating]) == []
+            again = search_jobs("Engineer")
+        
+        assert again.stale and again.revalidating is None
+        assert [job.job_id for job in again] == ["old"]
+        assert mock_get.call_count == 2
+    
+    def test_submit_dedupes_running_refreshes(self):
+        """Test that one refresh per key runs at a time"""
+        import threading
+        from revalidate import Revalidator
+        
+        revalidator = Revalidator()
+        release = threading.Event()
+        refresh = Mock(side_effect=lambda: release.wait(5))
+        
+        assert revalidator.submit("key", refresh)
+        assert revalidator.submit("key", refresh)
+        assert revalidator.pending(["key", "other"]) == ["key"]
+        release.set()
+        revalidator.wait(["key"], timeout=5)
+        
+        assert refresh.call_count == 1
+        assert revalidator.pending(["key"]) == []
+        assert not revalidator.submit("key", refresh)
+    
+    def test_submit_does_not_deadlock_on_fast_failures(self):
+        """Test that a refresh finishing before its callback is registered does not hang submit"""
+        import threading
+        from revalidate import Revalidator
+        
+        revalidator = Revalidator(retry_after=0)
+        
+        def submit_many():
+            for _ in range(50):
+                revalidator.submit("key", Mock(side_effect=ConnectionError("down")))
+                revalidator.wait(["key"], timeout=1)
+        
+        worker = threading.Thread(target=submit_many, daemon=True)
+        worker.start()
+        worker.join(timeout=10)
+        
+        assert not worker.is_alive()
+
+
+class TestChunkedAnalysis:
+    """Test cases for map-reduce analysis of long resumes"""
+    
+    LONG_CV = "\n".join([
+        "Jane Doe, PhD",
+        "jane@example.com",
+        "SUMMARY",
+        "Machine learning researcher with 8 years of experience.",
+        "SKILLS",
+        "Python, PyTorch, Kubernetes",
+        "EXPERIENCE",
+        *[f"Role {i}: built models and pipelines for project {i}." for i in range(200)],
+        "PUBLICATIONS",
+        *[f"Paper {i}. Proceedings of a conference on learning, volume {i}." for i in range(600)],
+        "REFERENCES",
+        "Available on request.",
+    ])
+    
+    def test_split_sections_at_headings(self):
+        """Test section detection"""
+        from resume_chunks import split_sections
+        
+        sections = split_sections("Jane Doe\nSkills:\nPython\nWork Experience\nAcme 2020-2024")
+        
+        assert [name for name, _ in sections] == ["header", "skills", "experience"]
+        assert "Python" in sections[1][1]
+    
+    def test_chunks_are_bounded_and_drop_publications_first(self):
+        """Test that a very long CV becomes a bounded number of chunks keeping the key sections"""
+        from resume_chunks import chunk_resume
+        
+        chunks = chunk_resume(self.LONG_CV, target_chars=4000, max_chunks=4)
+        
+        assert len(chunks) == 4
+        assert all(len(chunk) <= 4000 for chunk in chunks)
+        assert "Jane Doe" in chunks[0] and "PyTorch" in chunks[0]
+        assert any("Role 199" in chunk for chunk in chunks)
+        assert "Paper 599" not in "".join(chunks)
+        assert chunk_resume(self.LONG_CV, target_chars=4000, max_chunks=4) == chunks
+    
+    def test_merge_profiles_is_deterministic(self):
+        """Test merging roles by agreement, skills by first mention and years by maximum"""
+        from models import ResumeProfile
+        from resume_chunks import merge_profiles
+        
+        profiles = [
+            ResumeProfile("Research Scientist", ("Python", "PyTorch"), "8 years", ("Best paper",), ("ML Engineer",)),
+            ResumeProfile("ML Engineer", ("python", "Kubernetes"), "3 years", (), ("Research Scientist", "ML Engineer")),
+            ResumeProfile("Research Scientist", ("SQL",), "", ("Led lab",), ()),
+        ]
+        
+        merged = merge_profiles(profiles)
+        
+        assert merged.primary_role == "Research Scientist"
+        assert merged.key_skills == ("Python", "PyTorch", "Kubernetes", "SQL")
+        assert merged.years_experience == "8 years"
+        assert merged.key_achievements == ("Best paper", "Led lab")
+        assert merged.preferred_titles == ("ML Engineer", "Research Scientist")
+        assert merge_profiles(list(reversed(profiles))).key_skills == ("SQL", "python", "Kubernetes", "PyTorch")
+    
+    def test_analyze_chunks_tolerates_failed_chunks(self):
+        """Test that failed chunks are left out and that all failing raises"""
+        from models import ResumeProfile
+        from resume_chunks import analyze_chunks
+        
+        def analyze(chunk, part, total):
+            if part == 2:
+                raise json.JSONDecodeError("bad", "", 0)
+            return ResumeProfile(primary_role="Engineer", key_skills=(chunk,))
+        
+        merged = analyze_chunks(analyze, ["a", "b", "c"])
+        
+        assert merged.key_skills == ("a", "c")
+        with pytest.raises(json.JSONDecodeError):
+            analyze_chunks(lambda chunk, part, total: analyze(chunk, 2, total), ["a"])
+    
+    @patch('google.generativeai.GenerativeModel')
+    @patch('google.generativeai.configure')
+    def test_long_resume_is_analyzed_in_parts(self, mock_configure, mock_model_class, mock_streamlit_secrets):
+        """Test that analyze_resume sends one bounded prompt per chunk and merges the answers"""
+        from main import analyze_resume
+        from resume_chunks import CHUNK_TARGET_CHARS, MAX_CHUNKS
+        
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text=json.dumps({
+            "Primary job role": "Research Scientist",
+            "Key skills": ["Python"],
+            "Years of experience": "8 years",
+            "Key achievements": [],
+            "Preferred job titles": ["ML Engineer"],
+        }))
+        mock_model_class.return_value = mock_model
+        
+        result = analyze_resume(self.LONG_CV)
+        
+        prompts = [call.args[0] for call in mock_model.generate_content.call_args_list]
+        assert 1 < len(prompts) <= MAX_CHUNKS
+        assert all(len(prompt) < CHUNK_TARGET_CHARS + 1000 for prompt in prompts)
+        assert all(f"of {len(prompts)} of a long resume" in prompt for prompt in prompts)
+        assert result["Primary job role"] == "Research Scientist"
+
+
+class TestHeuristicResumeParser:
+    """Test cases for the local fast-path resume parser"""
+    
+    STRUCTURED_CV = "\n".join([
+        "Alex Kim",
+        "Skills",
+        "Languages: Python, Go, SQL",
+        "Tools: Docker, Kubernetes",
+        "Experience",
+        "Senior Software Engineer | Acme Corp | Jan 2021 - Present",
+        "- Reduced API latency by 40% across 12 services",
+        "Software Engineer at Initech (Jun 2018 - Dec 2020)",
+        "- Built the billing pipeline",
+    ])
+    
+    def test_structured_resume_is_parsed_with_high_confidence(self):
+        """Test that explicit Skills and Experience sections fill every field"""
+        from datetime import datetime
+        from resume_heuristics import FAST_PATH_CONFIDENCE, parse_resume_heuristically
+        
+        profile, confidence = parse_resume_heuristically(self.STRUCTURED_CV, now=datetime(2026, 10, 1))
+        
+        assert confidence >= FAST_PATH_CONFIDENCE
+        assert profile.primary_role == "Senior Software Engineer"
+        assert profile.key_skills == ("Python", "Go", "SQL", "Docker", "Kubernetes")
+        assert profile.years_experience == "8 years"
+        assert profile.key_achievements[0] == "Reduced API latency by 40% across 12 services"
+        assert profile.preferred_titles == ("Software Engineer",)
+    
+    def test_unstructured_resume_has_low_confidence(self):
+        """Test that prose without headings is left to Gemini"""
+        from resume_heuristics import FAST_PATH_CONFIDENCE, parse_resume_heuristically
+        
+        _, confidence = parse_resume_heuristically("Python Developer with 5 years experience")
+        
+        assert confidence < FAST_PATH_CONFIDENCE
+    
+    @patch('google.generativeai.GenerativeModel')
+    def test_fast_path_skips_gemini_and_is_counted(self, mock_model_class, mock_streamlit_secrets):
+        """Test that a confident parse never calls Gemini and shows up in the stats"""
+        from main import analyze_resume
+        from resume_heuristics import get_fast_path_stats
+        
+        before = get_fast_path_stats().report()["fast_path"]
+        
+        result = analyze_resume(self.STRUCTURED_CV)
+        
+        mock_model_class.assert_not_called()
+        assert result["Primary job role"] == "Senior Software Engineer"
+        assert get_fast_path_stats().report()["fast_path"] == before + 1
+    
+    def test_stats_report_latency_saved(self):
+        """Test the fast-path share and saved latency estimate"""
+        from resume_heuristics import FastPathStats
+        
+        stats = FastPathStats()
+        stats.record(True, 0.001)
+        stats.record(True, 0.001)
+        stats.record(False, 2.001)
+        
+        report = stats.report()
+        
+        assert report["fast_path_ratio"] == pytest.approx(2 / 3)
+        assert report["estimated_saved_seconds"] == pytest.approx(4.0)
+
+
+class TestSessionMemory:
+    """Test cases for per-session memory accounting and spilling"""
+    
+    def _state(self, count=50):
+        from models import JobStore, normalize_jobs
+        
+        jobs = normalize_jobs([{"job_id": f"id-{i}", "job_title": f"Engineer {i}", "employer_name": f"Co {i}",
+                                "job_description": f"Job {i} " + "x" * 500} for i in range(count)])
+        return {"all_jobs": JobStore(jobs), "current_page": 1}
+    
+    def test_session_over_cap_spills_largest_value(self, tmp_path):
+        """Test that a session past its cap keeps small values and spills all_jobs to disk"""
+        from models import JobStore
+        from session_memory import SessionMemoryManager, SpilledValue
+        
+        manager = SessionMemoryManager(spill_dir=str(tmp_path / "spill"), limit_bytes=1000)
+        state = self._state()
+        
+        manager.touch("s1", state, now=100)
+        
+        assert isinstance(state["all_jobs"], SpilledValue)
+        assert state["current_page"] == 1
+        report = manager.session_report("s1", now=100)
+        assert report["bytes"] < 1000
+        assert report["spilled"]["all_jobs"] > 1000
+        assert len(manager.load(state, "all_jobs", JobStore)) == 50
+        assert not list((tmp_path / "spill").iterdir())
+    
+    def test_idle_sessions_are_spilled_and_forgotten(self, tmp_path):
+        """Test idle eviction and the process-wide report"""
+        from session_memory import SessionMemoryManager, SpilledValue
+        
+        manager = SessionMemoryManager(spill_dir=str(tmp_path), idle_seconds=60)
+        idle, active = self._state(), self._state()
+        manager.touch("idle", idle, now=100)
+        manager.touch("active", active, now=150)
+        
+        manager.evict(now=170)
+        
+        assert isinstance(idle["all_jobs"], SpilledValue)
+        assert not isinstance(active["all_jobs"], SpilledValue)
+        report = manager.report()
+        assert report["sessions"] == 1 and report["evicted_sessions"] == 1
+        assert manager.session_report("idle") is None
+    
+    def test_process_cap_spills_least_recent_session_first(self, tmp_path):
+        """Test that the process cap spills the oldest session before the newest"""
+        from session_memory import SessionMemoryManager, SpilledValue, estimate_size
+        
+        older, newer = self._state(), self._state()
+        one_session = estimate_size(older["all_jobs"])
+        manager = SessionMemoryManager(spill_dir=str(tmp_path), process_limit_bytes=one_session * 3 // 2)
+        manager.touch("older", older, now=100)
+        manager.touch("newer", newer, now=110)
+        
+        manager.evict(now=120)
+        
+        assert isinstance(older["all_jobs"], SpilledValue)
+        assert not isinstance(newer["all_jobs"], SpilledValue)
+    
+    def test_missing_spill_file_falls_back_to_default(self, tmp_path):
+        """Test that a purged spill file yields a fresh value instead of an error"""
+        from models import JobStore
+        from session_memory import SpilledValue, get_session_memory
+        
+        state = {"all_jobs": SpilledValue(str(tmp_path / "gone.pickle"), 10)}
+        
+        value = get_session_memory().load(state, "all_jobs", JobStore)
+        
+        assert isinstance(value, JobStore) and len(value) == 0
+        assert state["all_jobs"] is value
+
+
+class TestOCRFallback:
+    """Test cases for OCR of scanned resume pages"""
+    
+    def _scanned_page(self, data):
+        page = Mock()
+        page.images = [Mock(data=data)]
+        return page
+    
+    def test_needs_ocr_on_low_text_yield(self):
+        """Test that near-empty or symbol-only pages are sent to OCR"""
+        from ocr import needs_ocr
+        
+        assert needs_ocr("")
+        assert needs_ocr("  \n ...  ")
+        assert not needs_ocr("Senior Software Engineer with Python, Go and SQL experience")
+    
+    @patch('ocr.tesseract_available', return_value=True)
+    @patch('ocr.subprocess.run')
+    def test_only_scanned_pages_are_ocred_and_results_cached(self, mock_run, mock_available):
+        """Test that text pages are kept, scanned pages OCRed once and re-uploads hit the cache"""
+        from ocr import ocr_fallback
+        
+        mock_run.return_value = Mock(stdout=b"Data Analyst skilled in SQL, Tableau and Excel reporting")
+        text_page = Mock()
+        pages = [text_page, self._scanned_page(b"scan-1")]
+        texts = ["Software Engineer at Acme building Python services", ""]
+        
+        first = ocr_fallback(pages, texts)
+        second = ocr_fallback(pages, texts)
+        
+        assert first == second
+        assert first[0] == texts[0]
+        assert first[1].startswith("Data Analyst")
+        assert mock_run.call_count == 1
+    
+    @patch('ocr.tesseract_available', return_value=True)
+    @patch('ocr.subprocess.run')
+    def test_ocr_timeout_keeps_original_text(self, mock_run, mock_available):
+        """Test that a Tesseract timeout leaves the page as extracted"""
+        import subprocess
+        from ocr import ocr_fallback
+        
+        mock_run.side_effect = subprocess.TimeoutExpired("tesseract", 1)
+        
+        assert ocr_fallback([self._scanned_page(b"scan-2")], ["x"], timeout=1) == ["x"]
+    
+    @patch('ocr.tesseract_available', return_value=False)
+    @patch('ocr.subprocess.run')
+    def test_without_tesseract_text_is_unchanged(self, mock_run, mock_available):
+        """Test that missing Tesseract skips OCR entirely"""
+        from ocr import ocr_fallback
+        
+        assert ocr_fallback([self._scanned_page(b"scan-3")], [""]) == [""]
+        mock_run.assert_not_called()
+
+
+class TestUploadHandling:
+    """Test cases for upload checks and spooled PDF parsing"""
+    
+    def _pdf_bytes(self, password=None):
+        import io
+        
+        writer = PyPDF2.PdfWriter()
+        writer.add_blank_page(200, 200)
+        if password:
+            writer.encrypt(password)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+    
+    def test_rejects_oversized_non_pdf_and_encrypted_uploads(self):
+        """Test that unusable uploads are rejected before parsing"""
+        import io
+        from uploads import UploadRejectedError, check_upload
+        
+        check_upload(io.BytesIO(self._pdf_bytes()))
+        with pytest.raises(UploadRejectedError, match="limit"):
+            check_upload(io.BytesIO(self._pdf_bytes()), max_bytes=100)
+        with pytest.raises(UploadRejectedError, match="not a PDF"):
+            check_upload(io.BytesIO(b"PK\x03\x04 not a pdf"))
+        with pytest.raises(UploadRejectedError, match="password"):
+            check_upload(io.BytesIO(self._pdf_bytes(password="secret")))
+    
+    def test_large_upload_is_parsed_from_memory_map(self):
+        """Test that uploads over the threshold are read through an mmap spool"""
+        import io
+        import mmap
+        from uploads import pdf_source
+        
+        upload = io.BytesIO(self._pdf_bytes())
+        
+        with pdf_source(upload, spool_threshold=10) as source:
+            assert isinstance(source, mmap.mmap)
+            assert len(PyPDF2.PdfReader(source).pages) == 1
+        with pdf_source(upload) as source:
+            assert source is upload
+    
+    def test_upload_digest_matches_content_hash(self):
+        """Test hashing an upload without copying it"""
+        import hashlib
+        import io
+        from uploads import upload_digest
+        
+        data = self._pdf_bytes()
+        
+        assert upload_digest(io.BytesIO(data)) == hashlib.sha256(data).hexdigest()
+
+
+class TestJobSources:
+    """Test cases for pluggable job sources and their aggregation"""
+    
+    class StaticSource:
+        def __init__(self, name, jobs=(), delay=0, error=None, timeout=5):
+            self.name = name
+            self.jobs = jobs
+            self.delay = delay
+            self.error = error
+            self.timeout = timeout
+        
+        def search(self, job_title, location=None, page=1, date_posted=None, work_from_home=None):
+            from models import JobPage
+            
+            time.sleep(self.delay)
+            if self.error:
+                raise self.error
+            return JobPage(self.jobs, fetched_at=1000.0)
+    
+    def _fixture(self, tmp_path):
+        path = tmp_path / "jobs.json"
+        path.write_text(json.dumps({"data": [
+            {"job_id": "1", "job_title": "Senior Python Developer", "employer_name": "Acme", "job_city": "Austin", "job_state": "TX"},
+            {"job_id": "2", "job_title": "Python Developer", "employer_name": "Globex", "job_is_remote": True},
+            {"job_id": "3", "job_title": "Java Developer", "employer_name": "Initech", "job_city": "Austin"},
+        ]}))
+        return str(path)
+    
+    def test_file_source_filters_by_title_location_and_remote(self, tmp_path):
+        """Test the fixture source's matching and paging"""
+        from job_sources import FileJobSource
+        
+        source = FileJobSource(self._fixture(tmp_path), page_size=1)
+        
+        assert [job.job_id for job in source.search("python developer", page=1)] == ["1"]
+        assert [job.job_id for job in source.search("python developer", page=2)] == ["2"]
+        assert [job.job_id for job in source.search("developer", location="Austin, TX")] == ["1"]
+        assert [job.job_id for job in source.search("developer", work_from_home=True)] == ["2"]
+    
+    def test_aggregator_merges_and_dedupes_in_source_order(self, tmp_path):
+        """Test that duplicates across sources keep the first source's copy"""
+        from job_sources import FileJobSource, JobAggregator
+        from models import normalize_jobs
+        
+        first = self.StaticSource("jsearch", normalize_jobs([
+            {"job_id": "a", "job_title": "Python Developer", "employer_name": "Globex", "job_is_remote": True},
+        ]))
+        aggregator = JobAggregator([first, FileJobSource(self._fixture(tmp_path))])
+        
+        jobs = aggregator.search("python developer")
+        
+        assert [job.job_id for job in jobs] == ["a", "1"]
+        assert jobs.fetched_at is not None
+    
+    def test_slow_source_is_dropped_at_its_deadline(self):
+        """Test that a source past its timeout does not delay the page"""
+        from job_sources import JobAggregator
+        from models import normalize_jobs
+        
+        fast = self.StaticSource("fast", normalize_jobs([{"job_id": "f", "job_title": "Engineer", "employer_name": "A"}]))
+        slow = self.StaticSource("slow", normalize_jobs([{"job_id": "s", "job_title": "Engineer", "employer_name": "B"}]),
+                                 delay=1, timeout=0.1)
+        
+        start = time.perf_counter()
+        jobs = JobAggregator([fast, slow]).search("engineer")
+        
+        assert time.perf_counter() - start < 0.5
+        assert [job.job_id for job in jobs] == ["f"]
+    
+    def test_all_sources_failing_raises(self):
+        """Test that the first error surfaces when no source answers"""
+        from job_sources import JobAggregator
+        
+        aggregator = JobAggregator([
+            self.StaticSource("a", error=requests.exceptions.ConnectionError("down")),
+            self.StaticSource("b", delay=1, timeout=0.05),
+        ])
+        
+        with pytest.raises(requests.exceptions.ConnectionError):
+            aggregator.search("engineer")
+    
+    def test_sources_from_env(self, tmp_path):
+        """Test building sources from the comma-separated setting"""
+        from job_sources import sources_from_env
+        
+        sources = sources_from_env(Mock(), names="jsearch, file", fixture_path=self._fixture(tmp_path))
+        
+        assert [source.name for source in sources] == ["jsearch", "file"]
+        with pytest.raises(ValueError):
+            sources_from_env(Mock(), names="indeed")
+
+
+class TestCacheWarmer:
+    """Test cases for popular-query tracking and cache warming"""
+    
+    def test_tracker_ranks_normalized_queries_and_decays(self):
+        """Test that counts merge case variants and older traffic fades"""
+        from warmer import QueryTracker
+        
+        tracker = QueryTracker(half_life=3600)
+        for _ in range(3):
+            tracker.record("Data Analyst", "Austin", now=0)
+        tracker.record("data analyst ", "Austin", now=0)
+        tracker.record("Nurse", now=0)
+        tracker.record("Nurse", now=7200)
+        tracker.record("Nurse", now=7200)
+        
+        top = tracker.top(2, now=7200)
+        
+        assert [search["job_title"] for search in top] == ["Nurse", "data analyst"]
+        assert top[0]["location"] is None
+    
+    def test_warmer_respects_hourly_quota(self):
+        """Test that only upstream requests count and the quota caps them"""
+        from warmer import CacheWarmer, QueryTracker
+        
+        tracker = QueryTracker()
+        for title in ("A", "B", "C", "D"):
+            tracker.record(title)
+        warm = Mock(side_effect=lambda **search: search["job_title"] != "A")
+        warmer = CacheWarmer(tracker, warm, quota_per_hour=2)
+        
+        assert warmer.run_once(now=0) == 2
+        assert warmer.run_once(now=60) == 0
+        assert warmer.run_once(now=3601) == 2
+    
+    @patch('requests.get')
+    def test_warm_jobs_only_calls_jsearch_near_expiry(self, mock_get, mock_streamlit_secrets):
+        """Test that a fresh first page is left alone and a missing one is fetched"""
+        from main import warm_jobs
+        
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"data": [
+            {"job_id": "w1", "job_title": "Nurse", "employer_name": "Clinic"},
+        ]}))
+        
+        assert warm_jobs("Nurse", "Boston") is True
+        assert warm_jobs("Nurse", "Boston") is False
+        assert mock_get.call_count == 1
+    
+    @patch('requests.get')
+    def test_fetch_records_first_page_queries(self, mock_get, mock_streamlit_secrets):
+        """Test that first-page fetches feed the tracker"""
+        from main import fetch_jobs_rapidapi
+        from warmer import get_query_tracker
+        
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"data": []}))
+        
+        fetch_jobs_rapidapi("Welder", "Tulsa")
+        fetch_jobs_rapidapi("Welder", "Tulsa", page=2)
+        
+        assert get_query_tracker().top() == [
+            {"job_title": "Welder", "location": "Tulsa", "date_posted": None, "work_from_home": None}
+        ]
+
+
+class TestDeadline:
+    """Test cases for per-rerun time budgets"""
+    
+    def test_stages_take_shares_of_what_is_left(self):
+        """Test stage budgets and shared skip records with a fake clock"""
+        from deadline import Deadline
+        
+        now = [0.0]
+        deadline = Deadline(10, clock=lambda: now[0])
+        extract = deadline.stage(0.2)
+        now[0] = 9.0
+        analyze = deadline.stage(0.4)
+        analyze.skip("analysis")
+        
+        assert extract.budget == 2
+        assert analyze.budget == 1
+        assert deadline.skipped == ["analysis"]
+        now[0] = 11.0
+        assert deadline.expired and deadline.remaining() == 0
+    
+    def test_searches_past_the_deadline_are_skipped(self):
+        """Test that a slow search is yielded as a timeout without holding the page"""
+        from deadline import Deadline
+        from job_search import iter_job_batches
+        
+        def fetch(job_title, delay):
+            time.sleep(delay)
+            return [job_title]
+        
+        deadline = Deadline(0.2)
+        start = time.perf_counter()
+        results = list(iter_job_batches(fetch, [
+            {"job_title": "fast", "delay": 0}, {"job_title": "slow", "delay": 1},
+        ], deadline=deadline))
+        
+        assert time.perf_counter() - start < 0.6
+        assert results[0] == ({"job_title": "fast", "delay": 0}, ["fast"], None)
+        assert isinstance(results[1][2], TimeoutError)
+        assert deadline.skipped == ["1 of 2 job searches that were still running"]
+    
+    @patch('google.generativeai.GenerativeModel')
+    def test_analysis_degrades_to_local_parse_when_out_of_time(self, mock_model_class, mock_streamlit_secrets):
+        """Test that an almost spent budget skips Gemini and records it"""
+        from deadline import Deadline
+        from main import analyze_resume_profile
+        
+        deadline = Deadline(0.5)
+        
+        profile = analyze_resume_profile("Skills\nPython, SQL, Excel\nExperience\nData Analyst at Acme", deadline)
+        
+        mock_model_class.assert_not_called()
+        assert profile.key_skills == ("Python", "SQL", "Excel")
+        assert deadline.skipped == ["the full AI resume analysis"]
+    
+    @patch('PyPDF2.PdfReader')
+    def test_extraction_stops_at_the_deadline(self, mock_pdf_reader, mock_streamlit_secrets):
+        """Test that pages past the deadline are skipped and reported"""
+        from deadline import Deadline
+        from main import extract_text_from_pdf
+        
+        first = Mock()
+        first.extract_text.side_effect = lambda: time.sleep(0.1) or "Experienced nurse and team lead in Boston hospitals"
+        second = Mock()
+        mock_pdf_reader.return_value.pages = [first, second]
+        deadline = Deadline(0.05)
+        
+        text = extract_text_from_pdf(Mock(), deadline)
+        
+        assert text.startswith("Experienced nurse")
+        second.extract_text.assert_not_called()
+        assert deadline.skipped == ["reading pages 2-2 of your PDF"]
+
+
+class TestFacetEngine:
+    """Test cases for local sorting and facet counts over fetched jobs"""
+    
+    def _jobs(self):
+        from models import Job
+        
+        return [
+            Job(job_id="a", job_city="Austin", job_employment_types=("FULLTIME",), job_min_salary=40000,
+                job_max_salary=50000, job_posted_at_datetime_utc="2024-01-10T00:00:00Z"),
+            Job(job_id="b", job_city="Boston", job_employment_types=("FULLTIME", "CONTRACTOR"), job_is_remote=True,
+                job_min_salary=120000, job_max_salary=160000, job_posted_at_datetime_utc="2024-01-20T00:00:00Z"),
+            Job(job_id="c", job_city="Austin", job_employment_types=("CONTRACTOR",), job_is_remote=True),
+        ]
+    
+    def test_counts_ignore_their_own_facet(self):
+        """Test that each facet counts the jobs matching the other facets' selections"""
+        from facets import FacetIndex
+        
+        index = FacetIndex()
+        index.extend(self._jobs())
+        
+        counts = index.counts(employment_type=None, remote="Remote", city="Austin", salary_band=None)
+        
+        assert counts["city"] == {"Austin": 1, "Boston": 1}
+        assert counts["remote"] == {"On-site": 1, "Remote": 1}
+        assert counts["employment_type"] == {"CONTRACTOR": 1, "FULLTIME": 0}
+        assert counts["salary_band"] == {"Under $50k": 0, "$100k-$150k": 0, "Not listed": 1}
+    
+    def test_sorts_put_unknown_values_last(self):
+        """Test salary, recency and fit sorts, filtered by a facet"""
+        from facets import FacetIndex
+        
+        index = FacetIndex()
+        index.extend(self._jobs(), {"a": 0.9, "b": 0.2})
+        index.extend(self._jobs())
+        
+        assert len(index) == 3
+        assert index.view("Highest salary") == ["b", "a", "c"]
+        assert index.view("Newest") == ["b", "a", "c"]
+        assert index.view("Best fit") == ["a", "b", "c"]
+        assert index.view("Relevance", employment_type="CONTRACTOR") == ["b", "c"]
+        assert index.view("Newest", city="Denver") == []
+    
+    def test_refaceting_a_thousand_jobs_is_sub_millisecond(self):
+        """Test that re-sorting and re-counting 1,000 fetched jobs stays under a millisecond"""
+        from benchmarks import bench_facets
+        
+        counts, view = bench_facets(1000, runs=50)
+        
+        assert counts < 0.001
+        assert view < 0.001
+
+
+class TestResponseArchive:
+    """Test cases for the compressed response archive"""
+    
+    def test_records_are_indexed_by_query_and_time(self, tmp_path):
+        """Test lookups by query, replay order and query counts"""
+        from archive import GEMINI, JSEARCH, ResponseArchive
+        
+        archive = ResponseArchive(str(tmp_path), flush_seconds=0.01)
+        archive.record(JSEARCH, "nurse in Boston", {"data": [1]}, now=100)
+        archive.record(JSEARCH, "data analyst", {"data": [2]}, now=200)
+        archive.record(JSEARCH, "nurse in Boston", {"data": [3]}, now=300)
+        archive.record(GEMINI, "recruitify:analysis:abc", {"response": "{}"}, now=250)
+        archive.flush()
+        
+        assert [item["data"]["data"] for item in archive.find(query="nurse in Boston")] == [[3], [1]]
+        assert [item["ts"] for item in archive.replay(JSEARCH, since=150)] == [200, 300]
+        assert archive.query_counts() == [("nurse in Boston", 2), ("data analyst", 1)]
+        assert len(archive) == 4
+        archive.close()
+    
+    def test_segments_roll_over_and_oldest_are_pruned(self, tmp_path):
+        """Test segment rotation and the archive size cap"""
+        import random
+        from archive import JSEARCH, ResponseArchive
+        
+        archive = ResponseArchive(str(tmp_path), segment_max_bytes=2000, max_bytes=5000, flush_seconds=0)
+        noise = random.Random(0)
+        for index in range(12):
+            # Random text keeps each batch from compressing to almost nothing
+            archive.record(JSEARCH, f"query {index}", {"noise": "".join(noise.choices("abcdef0123", k=3000))}, now=index)
+            archive.flush()
+        
+        segments = [name for name in os.listdir(tmp_path) if name.endswith(".jsonl.gz")]
+        assert 1 < len(segments) < 12
+        assert archive.size_bytes() <= 5000 + 2000
+        assert archive.find(query="query 0") == []
+        assert archive.find(query="query 11")[0]["ts"] == 11
+        archive.close()
+    
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        """Test that a stalled writer never slows down record()"""
+        import threading
+        from archive import JSEARCH, ResponseArchive
+        
+        release = threading.Event()
+        archive = ResponseArchive(str(tmp_path), queue_size=1, flush_seconds=0)
+        with patch.object(archive, "_write", side_effect=lambda batch: release.wait(5)):
+            archive.record(JSEARCH, "first", {})
+            time.sleep(0.05)
+            archive.record(JSEARCH, "second", {})
+            start = time.perf_counter()
+            dropped = not archive.record(JSEARCH, "third", {})
+            elapsed = time.perf_counter() - start
+            release.set()
+            archive.flush()
+        
+        assert dropped and archive.dropped == 1
+        assert elapsed < 0.05
+        archive.close()
+    
+    @patch('requests.get')
+    def test_jsearch_responses_are_archived_raw(self, mock_get, mock_streamlit_secrets, isolated_archive, sample_job_listing):
+        """Test that search_jobs archives the full upstream response under its query"""
+        from main import search_jobs
+        
+        raw = dict(sample_job_listing, job_publisher="LinkedIn")
+        mock_response = Mock()
+        mock_response.json.return_value = {"status": "OK", "data": [raw]}
+        mock_get.return_value = mock_response
+        
+        search_jobs("Python Developer", "Austin")
+        isolated_archive.flush()
+        
+        [item] = isolated_archive.find(kind="jsearch")
+        assert item["query"] == "Python Developer in Austin"
+        assert item["data"]["response"]["data"][0]["job_publisher"] == "LinkedIn"
+
+
+class TestGeminiMetrics:
+    """Test cases for Gemini call instrumentation"""
+    
+    def test_histograms_report_and_export(self):
+        """Test bucket counts, quantiles and the Prometheus export"""
+        from gemini_metrics import GeminiCall, GeminiMetrics
+        
+        metrics = GeminiMetrics(slowest=2)
+        for latency in (0.3, 1.5, 1.8, 12.0):
+            call = GeminiCall("x" * 3000)
+            call.latency = latency
+            call.parsed = latency < 10
+            metrics.record(call)
+        
+        report = metrics.report()
+        latency = report["histograms"]["latency_seconds"]
+        assert report["outcomes"]["parsed"] == 3 and report["outcomes"]["parse_failed"] == 1
+        assert report["parse_success_rate"] == 0.75
+        assert latency["buckets"]["0.5"] == 1 and latency["buckets"]["2"] == 2 and latency["buckets"]["16"] == 1
+        assert latency["p50"] == 2 and latency["max"] == 12.0
+        assert [call["latency"] for call in report["slowest"]] == [12.0, 1.8]
+        assert report["histograms"]["input_tokens"]["count"] == 0
+        text = metrics.to_prometheus()
+        assert 'recruitify_gemini_latency_seconds_bucket{le="2"} 3' in text
+        assert 'recruitify_gemini_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'recruitify_gemini_calls_total{outcome="parse_failed"} 1' in text
+        assert json.loads(metrics.to_json())["calls"] == 4
+    
+    @patch('google.generativeai.GenerativeModel')
+    @patch('google.generativeai.configure')
+    def test_analysis_records_sizes_tokens_and_parse_outcome(self, mock_configure, mock_model_class,
+                                                             mock_streamlit_secrets, sample_resume_analysis,
+                                                             isolated_gemini_metrics):
+        """Test that each analysis records prompt size, token usage and whether the JSON parsed"""
+        from main import analyze_resume_profile
+        
+        mock_model = Mock()
+        usage = Mock(prompt_token_count=420, candidates_token_count=85)
+        mock_model.generate_content.side_effect = [
+            Mock(text=json.dumps(sample_resume_analysis), usage_metadata=usage),
+            Mock(text="Sure! Here is the analysis you asked for", usage_metadata=usage),
+        ]
+        mock_model_class.return_value = mock_model
+        
+        analyze_resume_profile("I am a curious person who likes computers and teams.")
+        analyze_resume_profile("I am a different person who also likes computers.")
+        
+        report = isolated_gemini_metrics.report()
+        assert report["outcomes"] == {"parsed": 1, "parse_failed": 1, "error": 0, "rejected": 0}
+        assert report["histograms"]["input_tokens"]["mean"] == 420
+        assert report["histograms"]["output_tokens"]["max"] == 85
+        assert report["histograms"]["input_chars"]["count"] == 2
+        assert "retry" in mock_model.generate_content.call_args.kwargs["request_options"]
+    
+    def test_retries_are_counted(self):
+        """Test that the request retry counts each retried error on the call"""
+        from google.api_core import exceptions
+        from gemini_metrics import GeminiCall, gemini_retry
+        
+        call = GeminiCall("prompt")
+        attempts = iter([exceptions.ServiceUnavailable("busy"), exceptions.ServiceUnavailable("busy"), None])
+        
+        def generate():
+            error = next(attempts)
+            if error is not None:
+                raise error
+            return "ok"
+        
+        with patch('time.sleep'):
+            assert gemini_retry(call, timeout=30)(generate)() == "ok"
+        assert call.retries == 2
+
+
 class TestIntegration:
     """Integration tests for complete workflow"""
     
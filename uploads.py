@@ -0,0 +1,93 @@
+"""
+Resume upload handling for RecruitifyAI
+Rejects unusable PDFs before parsing and parses large ones from a memory-mapped spool file
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+MAX_UPLOAD_BYTES = int(os.getenv("RECRUITIFY_MAX_UPLOAD_BYTES", 64 * 1024 * 1024))
+SPOOL_THRESHOLD_BYTES = int(os.getenv("RECRUITIFY_SPOOL_THRESHOLD_BYTES", 16 * 1024 * 1024))
+SPOOL_CHUNK_BYTES = 1024 * 1024
+# The PDF header may follow a little junk, but must start within the first KiB
+PDF_HEADER_WINDOW = 1024
+
+
+class UploadRejectedError(ValueError):
+    """Raised for an upload that cannot be parsed; the message is shown to the user"""
+
+
+def _buffer(upload):
+    """A zero-copy view of the upload's bytes
+
+    BytesIO.getvalue() returns the bytes the upload was created from as long
+    as nothing wrote to it, while getbuffer() would force a private copy.
+    """
+    return memoryview(upload.getvalue())
+
+
+def upload_size(upload):
+    size = getattr(upload, "size", None)
+    if isinstance(size, int):
+        return size
+    with _buffer(upload) as view:
+        return view.nbytes
+
+
+def upload_digest(upload):
+    """SHA-256 of the upload, hashed from a view instead of a copy of its bytes"""
+    with _buffer(upload) as view:
+        return hashlib.sha256(view).hexdigest()
+
+
+def check_upload(upload, max_bytes=MAX_UPLOAD_BYTES):
+    """Reject oversized, non-PDF or encrypted uploads before any parsing
+
+    Encryption is detected by the /Encrypt key that every encrypted PDF
+    carries in its trailer or cross-reference stream dictionary.
+    """
+    size = upload_size(upload)
+    if size > max_bytes:
+        raise UploadRejectedError(
+            f"This PDF is {size / 1024 / 1024:.0f} MB; the limit is {max_bytes / 1024 / 1024:.0f} MB."
+        )
+    with _buffer(upload) as view:
+        if b"%PDF-" not in bytes(view[:PDF_HEADER_WINDOW]):
+            raise UploadRejectedError("This file is not a PDF.")
+        if _contains(view, b"/Encrypt"):
+            raise UploadRejectedError("This PDF is password-protected. Please upload an unprotected copy.")
+
+
+def _contains(view, needle):
+    """Search a memoryview one overlapping chunk at a time instead of copying it whole"""
+    overlap = len(needle) - 1
+    for start in range(0, view.nbytes, SPOOL_CHUNK_BYTES):
+        if needle in bytes(view[max(start - overlap, 0):start + SPOOL_CHUNK_BYTES]):
+            return True
+    return False
+
+
+@contextmanager
+def pdf_source(upload, spool_threshold=SPOOL_THRESHOLD_BYTES):
+    """Yield a seekable stream to hand to PyPDF2.PdfReader
+
+    Small uploads are parsed in place. Larger ones are copied to a temporary
+    file in chunks and parsed from a read-only memory map, so PyPDF2's reads
+    are served from the page cache instead of the upload's heap buffer.
+    """
+    if upload_size(upload) <= spool_threshold:
+        upload.seek(0)
+        yield upload
+        return
+    with tempfile.TemporaryFile(prefix="recruitify-upload-") as spool:
+        with _buffer(upload) as view:
+            for start in range(0, view.nbytes, SPOOL_CHUNK_BYTES):
+                spool.write(view[start:start + SPOOL_CHUNK_BYTES])
+        spool.flush()
+        with mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
@@ -0,0 +1,152 @@
+"""
+Popular-query cache warming for RecruitifyAI
+Counts which searches users run and keeps the first page of the most popular ones fresh
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+WARM_TOP_K = int(os.getenv("RECRUITIFY_WARM_TOP_K", 20))
+WARM_QUOTA_PER_HOUR = int(os.getenv("RECRUITIFY_WARM_QUOTA_PER_HOUR", 60))
+WARM_INTERVAL_SECONDS = 300
+QUERY_HALF_LIFE_SECONDS = 24 * 3600
+MIN_QUERY_SCORE = 0.1
+
+
+def query_key(job_title, location=None, date_posted=None, work_from_home=None):
+    """Normalized identity of a first-page search, so "Data Analyst" and "data analyst " count together"""
+    return (
+        " ".join((job_title or "").lower().split()),
+        " ".join((location or "").lower().split()),
+        date_posted or "All",
+        work_from_home,
+    )
+
+
+class QueryTracker:
+    """Decaying per-query counts of first-page searches across every session in the process
+
+    Each search adds one to its query's score and scores halve every
+    half_life seconds, so yesterday's burst fades behind today's traffic.
+    """
+
+    def __init__(self, half_life=QUERY_HALF_LIFE_SECONDS):
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._scores = {}
+
+    def _decayed(self, score, updated_at, now):
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, job_title, location=None, date_posted=None, work_from_home=None, now=None):
+        if not (job_title or "").strip():
+            return
+        now = time.time() if now is None else now
+        key = query_key(job_title, location, date_posted, work_from_home)
+        search = {"job_title": job_title.strip(), "location": location or None,
+                  "date_posted": date_posted, "work_from_home": work_from_home}
+        with self._lock:
+            score, updated_at, _ = self._scores.get(key, (0.0, now, None))
+            self._scores[key] = (self._decayed(score, updated_at, now) + 1, now, search)
+
+    def top(self, k=WARM_TOP_K, now=None):
+        """The k most popular searches as search_jobs keyword arguments, most popular first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            scored = []
+            for key, (score, updated_at, search) in list(self._scores.items()):
+                score = self._decayed(score, updated_at, now)
+                if score < MIN_QUERY_SCORE:
+                    del self._scores[key]
+                else:
+                    scored.append((score, search))
+        scored.sort(key=lambda item: -item[0])
+        return [dict(search) for _, search in scored[:k]]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class CacheWarmer:
+    """Background thread that refreshes the top queries' first pages within an hourly request quota
+
+    warm(**search) must refresh the cached first page when it is close to
+    expiring and return True only when it made an upstream request, so
+    fresh pages cost nothing against the quota.
+    """
+
+    def __init__(self, tracker, warm, top_k=WARM_TOP_K, quota_per_hour=WARM_QUOTA_PER_HOUR,
+                 interval=WARM_INTERVAL_SECONDS):
+        self.tracker = tracker
+        self.warm = warm
+        self.top_k = top_k
+        self.quota_per_hour = quota_per_hour
+        self.interval = interval
+        self._requests = deque()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _quota_left(self, now):
+        while self._requests and now - self._requests[0] >= 3600:
+            self._requests.popleft()
+        return self.quota_per_hour - len(self._requests)
+
+    def run_once(self, now=None):
+        """Warm the current top queries; returns the number of upstream requests made"""
+        now = time.monotonic() if now is None else now
+        made = 0
+        for search in self.tracker.top(self.top_k):
+            if self._quota_left(now) <= 0:
+                break
+            try:
+                requested = self.warm(**search)
+            except Exception:
+                # A failed request still spent quota
+                requested = True
+            if requested:
+                self._requests.append(now)
+                made += 1
+        return made
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+
+_query_tracker = None
+_query_tracker_lock = threading.Lock()
+
+
+def get_query_tracker():
+    """Return the process-wide query tracker, creating it on first use"""
+    global _query_tracker
+    if _query_tracker is None:
+        with _query_tracker_lock:
+            if _query_tracker is None:
+                _query_tracker = QueryTracker()
+    return _query_tracker
+
+
+def set_query_tracker(tracker):
+    """Replace the process-wide query tracker and return the previous one"""
+    global _query_tracker
+    with _query_tracker_lock:
+        previous, _query_tracker = _query_tracker, tracker
+    return previous